@@ -0,0 +1,211 @@
+"""Index of exported files allowing to skip exports of unchanged source files.
+
+The index is stored as a JSON Lines file, each line describing one export -
+the source file path, its size, modification time and content hash, export
+options and the output file path, size and modification time. Later lines take
+precedence over earlier lines for the same source file and options or the same
+output file. Once superseded or invalid lines outnumber the valid ones, the
+file is compacted when loaded.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+from typing import Any, Dict, Optional
+
+
+_TEXT_ENCODING = 'utf-8'
+_HASH_CHUNK_SIZE = 1024 * 1024
+_TEMP_FILE_SUFFIX = '.tmp'
+
+
+class ExportIndex:
+  """Index of exported files stored in the file at ``filepath``.
+
+  The file is created on the first call to `add()` if it does not exist.
+  """
+
+  def __init__(self, filepath: str):
+    self.filepath = filepath
+
+    self._entries = {}
+    self._output_keys = {}
+    self._load()
+
+  def find_output(self, source_filepath: str, options: Dict[str, Any]) -> Optional[str]:
+    """Returns the path to an existing output file exported from
+    ``source_filepath`` with the same ``options``, or ``None`` if the source
+    file changed since the export or the output file no longer contains the
+    output of the export.
+
+    The source file is considered unchanged if its size and modification time
+    are the same as during the export. If only the modification time differs,
+    the content hash is compared. The output file is considered unchanged if
+    its size and modification time are the same as after the export.
+    """
+    entry = self._entries.get(_get_key(source_filepath, options))
+    if entry is None:
+      return None
+
+    try:
+      source_stat = os.stat(source_filepath)
+    except OSError:
+      return None
+
+    if source_stat.st_size != entry['size']:
+      return None
+
+    if (source_stat.st_mtime_ns != entry['mtime_ns']
+        and _get_file_hash(source_filepath) != entry['sha256']):
+      return None
+
+    try:
+      output_stat = os.stat(entry['output'])
+    except OSError:
+      return None
+
+    if (output_stat.st_size != entry.get('output_size')
+        or output_stat.st_mtime_ns != entry.get('output_mtime_ns')):
+      return None
+
+    return entry['output']
+
+  def reuse_output(
+        self, source_filepath: str, options: Dict[str, Any], output_filepath: str) -> bool:
+    """Makes ``output_filepath`` contain the output of a previous export of an
+    unchanged ``source_filepath`` with the same ``options``.
+
+    If the previous output is located at a different path, a hard link (or a
+    copy if hard links are not supported) is created at ``output_filepath``.
+
+    Returns ``True`` if the previous output could be reused, ``False``
+    otherwise.
+    """
+    existing_output_filepath = self.find_output(source_filepath, options)
+    if existing_output_filepath is None:
+      return False
+
+    if os.path.abspath(existing_output_filepath) != os.path.abspath(output_filepath):
+      try:
+        if os.path.lexists(output_filepath):
+          os.remove(output_filepath)
+        os.link(existing_output_filepath, output_filepath)
+      except OSError:
+        try:
+          shutil.copy2(existing_output_filepath, output_filepath)
+        except OSError:
+          return False
+
+      self.add(source_filepath, options, output_filepath)
+
+    return True
+
+  def add(self, source_filepath: str, options: Dict[str, Any], output_filepath: str):
+    """Records an export of ``source_filepath`` with ``options`` to
+    ``output_filepath``.
+
+    Previous exports to ``output_filepath`` are no longer considered, as the
+    output file was overwritten.
+    """
+    source_stat = os.stat(source_filepath)
+    output_stat = os.stat(output_filepath)
+
+    entry = {
+      'source': os.path.abspath(source_filepath),
+      'size': source_stat.st_size,
+      'mtime_ns': source_stat.st_mtime_ns,
+      'sha256': _get_file_hash(source_filepath),
+      'options': options,
+      'output': os.path.abspath(output_filepath),
+      'output_size': output_stat.st_size,
+      'output_mtime_ns': output_stat.st_mtime_ns,
+    }
+
+    self._set_entry(_get_key(source_filepath, options), entry)
+
+    with open(self.filepath, 'a', encoding=_TEXT_ENCODING) as f:
+      f.write(json.dumps(entry, sort_keys=True) + '\n')
+
+  def _load(self):
+    line_count = 0
+
+    try:
+      with open(self.filepath, 'r', encoding=_TEXT_ENCODING) as f:
+        for line in f:
+          line_count += 1
+
+          try:
+            entry = json.loads(line)
+            key = _get_key(entry['source'], entry['options'])
+            self._set_entry(key, entry)
+          except (ValueError, KeyError, TypeError):
+            continue
+    except FileNotFoundError:
+      return
+
+    if line_count - len(self._entries) > len(self._entries):
+      self._compact()
+
+  def _set_entry(self, key, entry):
+    output_filepath = os.path.abspath(entry['output'])
+
+    previous_key = self._output_keys.pop(output_filepath, None)
+    if previous_key is not None:
+      del self._entries[previous_key]
+
+    previous_entry = self._entries.pop(key, None)
+    if previous_entry is not None:
+      del self._output_keys[os.path.abspath(previous_entry['output'])]
+
+    self._entries[key] = entry
+    self._output_keys[output_filepath] = key
+
+  def _compact(self):
+    """Rewrites the index file to contain only the latest entry for each source
+    file and options and each output file.
+
+    The file is replaced only after the compacted file is written completely.
+    If that fails, the file is left as is.
+    """
+    temp_filepath = self.filepath + _TEMP_FILE_SUFFIX
+
+    try:
+      with open(temp_filepath, 'w', encoding=_TEXT_ENCODING) as f:
+        for entry in self._entries.values():
+          f.write(json.dumps(entry, sort_keys=True) + '\n')
+
+      os.replace(temp_filepath, self.filepath)
+    except OSError:
+      with contextlib.suppress(OSError):
+        os.remove(temp_filepath)
+
+
+def unlink_hard_link(filepath: str):
+  """Removes ``filepath`` if it is one of multiple hard links to the same
+  file.
+
+  Call this function before overwriting an output file, as outputs reused by
+  `ExportIndex.reuse_output()` may be hard links, and overwriting one in place
+  would also modify the others.
+  """
+  try:
+    if os.stat(filepath).st_nlink > 1:
+      os.remove(filepath)
+  except FileNotFoundError:
+    pass
+
+
+def _get_key(source_filepath, options):
+  return os.path.abspath(source_filepath), json.dumps(options, sort_keys=True)
+
+
+def _get_file_hash(filepath):
+  file_hash = hashlib.sha256()
+
+  with open(filepath, 'rb') as f:
+    for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b''):
+      file_hash.update(chunk)
+
+  return file_hash.hexdigest()
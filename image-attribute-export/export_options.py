@@ -0,0 +1,33 @@
+"""Export options shared by the export procedures and
+``tools/parallel-export.py``.
+
+Both must agree on the default values of the options, as the options
+(including those left at their default values) identify exports in the export
+index (see `export_index`).
+"""
+
+from typing import Any, Dict, Optional
+
+
+# Default values of export procedure arguments affecting the output.
+DEFAULTS = {
+  'field-mask': '',
+  'max-depth': -1,
+  'root-layer-path': '',
+  'visible-only': False,
+  'color-tags': '',
+  'name-pattern': '',
+  'stroke-points-encoding': 'list',
+  'float-precision': '',
+  'compression-level': -1,
+}
+
+
+def get_index_options(
+      options: Dict[str, Any], file_format: str, compression: Optional[str]) -> Dict[str, Any]:
+  """Returns options identifying an export in the export index.
+
+  ``options`` contains values of all arguments in `DEFAULTS`. ``compression``
+  is the compressed file extension (e.g. ``gz``) or ``None``.
+  """
+  return {**options, 'file-format': file_format, 'compression': compression or ''}
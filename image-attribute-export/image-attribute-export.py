@@ -1,264 +1,3186 @@
 #!/usr/bin/env python
 
+# Modules required only by some output formats or export options (`csv`,
+# compression modules, `queue` and `threading` for pipelined export,
+# `export_index`, `Babl` and `Gegl`) are imported where used to shorten the
+# plug-in startup.
+
+import abc
+import array
+import base64
+from collections.abc import Iterable, Iterator, Mapping
+import contextlib
+import fnmatch
+import functools
+import io
+import itertools
 import json
-from xml.etree import ElementTree as ET
+from json.encoder import encode_basestring_ascii as _encode_json_string
+import os
+import struct
+import sys
+from typing import Optional
+
+import gi
+gi.require_version('Babl', '0.1')
+gi.require_version('Gegl', '0.4')
+gi.require_version('Gimp', '3.0')
+from gi.repository import Gimp
+from gi.repository import Gio
+from gi.repository import GLib
+from gi.repository import GObject
+
+import export_options
+import procedure
+import profiling
+
+
+_TEXT_ENCODING = 'utf-8'
+_INDENT = 4
+_WRITE_BUFFER_SIZE = 1024 * 1024
+
+_PIPELINE_BATCH_SIZE = 1024
+_PIPELINE_MAX_BATCHES = 16
+
+_NO_VALUE = object()
+
+_FILTER_PROPERTY_NAMES_PER_OPERATION = {}
+
+_STROKE_POINTS_ENCODINGS = {
+  'list': None,
+  'base64-float64': 'd',
+  'base64-float32': 'f',
+}
+
+_FLOAT_PRECISION_CLASSES = ['coordinates', 'colors', 'opacity', 'other']
+_FLOAT_PRECISION_CLASSES_PER_FIELD = {
+  'points': 'coordinates',
+  'color_rgba': 'colors',
+  'opacity': 'opacity',
+}
+
+_COMPRESSIONS = ['gz', 'bz2', 'xz']
+
+_INCREMENTAL_MODES = ['full', 'delta', 'full-and-delta']
+_CACHE_VERSION = 3
+_CACHE_ARRAY_KEY = '__array__'
+_CACHE_ITEM_KEY = '__item__'
+_CACHE_FILE_SUFFIX = '.cache.json'
+_PATCH_FILE_SUFFIX = '.patch.json'
+_STROKE_SIGNATURE_PRECISION = 0.1
+_PROFILE_FILE_SUFFIX = '.profile.json'
+_BATCH_PROFILE_FILENAME = 'image-attribute-export-profile.json'
+_RESIDENT_PROCEDURE_SUFFIX = '-resident'
+
+# Cache files of incremental exports kept in memory if the plug-in runs as a
+# resident process.
+_EXPORT_CACHES: Optional['_ExportCaches'] = None
+
+
+def file_xml_export(_proc, _run_mode, image, file, _options, _metadata, config, _data):
+  return _export_image(image, file, config, 'xml')
+
+
+def _write_xml(attributes, file, format_options=None):
+  _write_formats(attributes, {'xml': file}, format_options)
+
+
+class _XmlSink:
+  """Writes events from `_traverse()` as XML text.
+
+  The root dictionary itself is not written, its only entry (``image``) becomes
+  the root element. List entries are written as ``item`` elements.
+
+  Each stack entry holds the tag of an open element and, for lists, the
+  function formatting floats in the list (``None`` for dictionaries).
+  """
+
+  file_open_kwargs = {'encoding': _TEXT_ENCODING, 'errors': 'xmlcharrefreplace'}
+
+  def __init__(self, f, format_options):
+    self._write = f.write
+
+    self._packed_float_typecode = format_options.packed_float_typecode
+    self._float_formatters = format_options.float_formatters
+    self._default_float_formatter = format_options.default_float_formatter
+
+    self._stack = []
+
+  def start_map(self, key, _length):
+    if not self._stack:
+      self._stack.append((None, None))
+    elif len(self._stack) == 1:
+      self._write('<{}>'.format(key))
+      self._stack.append((key, None))
+    else:
+      start_tag, tag, _float_formatter = self._get_start_tag(key)
+      self._write(start_tag)
+      self._stack.append((tag, None))
+
+  def start_list(self, key, _length):
+    start_tag, tag, float_formatter = self._get_start_tag(key)
+    self._write(start_tag)
+    self._stack.append((tag, float_formatter))
+
+  def end_map(self):
+    tag, _float_formatter = self._stack.pop()
+    if self._stack:
+      self._write('\n' + ' ' * (len(self._stack) - 1) * _INDENT + '</{}>'.format(tag))
+
+  end_list = end_map
+
+  def scalar(self, key, value):
+    start_tag, tag, float_formatter = self._get_start_tag(key)
+
+    if isinstance(value, str):
+      text = _escape_xml_text(value)
+    elif isinstance(value, float):
+      text = float_formatter(value)
+    elif isinstance(value, array.array):
+      if self._packed_float_typecode is not None:
+        text = _encode_base64_float_array(value, self._packed_float_typecode)
+      else:
+        format_func = float_formatter if value.typecode in 'fd' else str
+        depth = len(self._stack) - 1
+        item_start_tag = '\n' + ' ' * (depth + 1) * _INDENT + '<item>'
+        text = (
+          ''.join([item_start_tag + format_func(item) + '</item>' for item in value])
+          + '\n' + ' ' * depth * _INDENT)
+    elif value is not None:
+      text = _escape_xml_text(str(value))
+    else:
+      text = ''
+
+    self._write(start_tag + text + '</{}>'.format(tag))
+
+  def _get_start_tag(self, key):
+    _parent_tag, list_float_formatter = self._stack[-1]
+
+    if list_float_formatter is None:
+      tag = key
+      float_formatter = self._float_formatters.get(key, self._default_float_formatter)
+    else:
+      tag = 'item'
+      float_formatter = list_float_formatter
+
+    return '\n' + ' ' * (len(self._stack) - 1) * _INDENT + '<{}>'.format(tag), tag, float_formatter
+
+
+def _escape_xml_text(text):
+  if '&' in text:
+    text = text.replace('&', '&amp;')
+  if '<' in text:
+    text = text.replace('<', '&lt;')
+  if '>' in text:
+    text = text.replace('>', '&gt;')
+
+  return text
+
+
+def file_json_export(_proc, _run_mode, image, file, _options, _metadata, config, _data):
+  return _export_image(image, file, config, 'json')
+
+
+def _write_json(attributes, file, format_options=None):
+  _write_formats(attributes, {'json': file}, format_options)
+
+
+class _JsonSink:
+  """Writes events from `_traverse()` as JSON text.
+
+  The output is identical to `json.dump` with the indentation set to
+  `_INDENT`.
+
+  Each stack entry holds the closing character of an open dictionary or list,
+  the number of entries written so far and, for lists, the function formatting
+  floats in the list (``None`` for dictionaries).
+  """
+
+  file_open_kwargs = {'encoding': _TEXT_ENCODING}
+
+  def __init__(self, f, format_options):
+    self._write = f.write
+
+    self._packed_float_typecode = format_options.packed_float_typecode
+    self._float_formatters = format_options.float_formatters
+    self._default_float_formatter = format_options.default_float_formatter
+
+    self._stack = []
+
+  def start_map(self, key, _length):
+    prefix, _float_formatter = self._get_prefix(key)
+    self._write(prefix + '{')
+    self._stack.append(['}', 0, None])
+
+  def start_list(self, key, _length):
+    prefix, float_formatter = self._get_prefix(key)
+    self._write(prefix + '[')
+    self._stack.append([']', 0, float_formatter])
+
+  def end_map(self):
+    closing_str, num_entries, _float_formatter = self._stack.pop()
+
+    if num_entries == 0:
+      self._write(closing_str)
+    else:
+      self._write('\n' + ' ' * len(self._stack) * _INDENT + closing_str)
+
+  end_list = end_map
+
+  def scalar(self, key, value):
+    prefix, float_formatter = self._get_prefix(key)
+
+    if isinstance(value, str):
+      text = _encode_json_string(value)
+    elif value is None:
+      text = 'null'
+    elif value is True:
+      text = 'true'
+    elif value is False:
+      text = 'false'
+    elif isinstance(value, int):
+      text = int.__repr__(value)
+    elif isinstance(value, float):
+      text = _encode_json_float(value, float_formatter)
+    elif isinstance(value, array.array):
+      if self._packed_float_typecode is not None:
+        text = '"' + _encode_base64_float_array(value, self._packed_float_typecode) + '"'
+      elif not value:
+        text = '[]'
+      else:
+        if value.typecode in 'fd':
+          texts = [_encode_json_float(item, float_formatter) for item in value]
+        else:
+          texts = [int.__repr__(item) for item in value]
+
+        indent = ' ' * (len(self._stack) + 1) * _INDENT
+        text = (
+          '[\n' + indent + (',\n' + indent).join(texts)
+          + '\n' + ' ' * len(self._stack) * _INDENT + ']')
+    else:
+      raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+    self._write(prefix + text)
+
+  def _get_prefix(self, key):
+    """Returns the text preceding a value with the given ``key`` and the
+    function formatting floats in the value.
+    """
+    if not self._stack:
+      return '', self._default_float_formatter
+
+    frame = self._stack[-1]
+
+    prefix = ('\n' if frame[1] == 0 else ',\n') + ' ' * len(self._stack) * _INDENT
+    frame[1] += 1
+
+    if key is not None:
+      return (
+        prefix + _encode_json_string(key) + ': ',
+        self._float_formatters.get(key, self._default_float_formatter))
+    else:
+      return prefix, frame[2]
+
+
+def _encode_json_float(value, float_formatter=float.__repr__):
+  if value != value:
+    return 'NaN'
+  elif value == float('inf'):
+    return 'Infinity'
+  elif value == -float('inf'):
+    return '-Infinity'
+  else:
+    return float_formatter(value)
+
+
+def _get_float_formatter(significant_digits):
+  """Returns a function converting a float to text rounded to
+  ``significant_digits``, or `float.__repr__` (the shortest text preserving
+  the value) if ``significant_digits`` is ``None``.
+
+  The text is always recognizable as a float in the same notation as
+  `float.__repr__`, i.e. ``5.0`` rather than ``5`` and ``300.0`` rather than
+  ``3e+02``. Special values are formatted as ``nan``, ``inf`` and ``-inf``.
+  """
+  if significant_digits is None:
+    return float.__repr__
+
+  format_str = f'%.{significant_digits}g'
+
+  def _format_float(value):
+    text = format_str % value
+    if 'e' in text:
+      return float.__repr__(float(text))
+    # 'n' is present in "nan" and "inf".
+    elif '.' in text or 'n' in text:
+      return text
+    else:
+      return text + '.0'
+
+  return _format_float
+
+
+def _encode_base64_float_array(values, typecode):
+  """Returns ``values`` as Base64-encoded little-endian floats of the given
+  `array.array` type (``'d'`` for float64, ``'f'`` for float32).
+  """
+  if values.typecode != typecode or sys.byteorder == 'big':
+    values = array.array(typecode, values)
+
+  if sys.byteorder == 'big':
+    values.byteswap()
+
+  return base64.b64encode(values).decode('ascii')
+
+
+def file_yaml_export(_proc, _run_mode, image, file, _options, _metadata, config, _data):
+  return _export_image(image, file, config, 'yaml')
+
+
+def _write_yaml(attributes, file, format_options=None):
+  _write_formats(attributes, {'yaml': file}, format_options)
+
+
+class _YamlSink:
+  """Writes events from `_traverse()` as YAML text.
+
+  The root dictionary and its only entry (``image``) are not written, the
+  entries of ``image`` are written at the top level.
+
+  Each stack entry holds the depth of the entries of an open dictionary or
+  list, the function formatting floats in the list (``None`` for
+  dictionaries), and the ``key:`` line not yet written as it is not known yet
+  whether the dictionary or list is empty (``key: {}`` or ``key: []``), along
+  with the text written for an empty dictionary or list.
+  """
+
+  file_open_kwargs = {'encoding': _TEXT_ENCODING}
+
+  def __init__(self, f, format_options):
+    self._write = f.write
+
+    self._packed_float_typecode = format_options.packed_float_typecode
+    self._float_formatters = format_options.float_formatters
+    self._default_float_formatter = format_options.default_float_formatter
+
+    self._stack = []
+
+  def start_map(self, key, _length):
+    if len(self._stack) < 2:
+      self._stack.append([0, None, None, None])
+      return
+
+    depth, indent, _float_formatter = self._start_entry(key)
+
+    if key is not None:
+      self._stack.append([depth + 1, None, indent + key, '{}'])
+    else:
+      self._write(indent + '- item:\n')
+      self._stack.append([depth + 1, None, None, None])
+
+  def start_list(self, key, _length):
+    depth, indent, float_formatter = self._start_entry(key)
+
+    if key is not None:
+      self._stack.append([depth, float_formatter, indent + key, '[]'])
+    else:
+      self._write(indent + '- item:\n')
+      self._stack.append([depth, float_formatter, None, None])
+
+  def end_map(self):
+    _depth, _float_formatter, pending_line, empty_str = self._stack.pop()
+
+    if pending_line is not None:
+      self._write(pending_line + ': ' + empty_str + '\n')
+
+  end_list = end_map
+
+  def scalar(self, key, value):
+    _depth, indent, float_formatter = self._start_entry(key)
+
+    if isinstance(value, str):
+      text = "'" + value + "'"
+    elif isinstance(value, bool):
+      text = 'true' if value else 'false'
+    elif isinstance(value, float):
+      text = float_formatter(value)
+    elif isinstance(value, array.array):
+      if self._packed_float_typecode is not None:
+        text = "'" + _encode_base64_float_array(value, self._packed_float_typecode) + "'"
+      else:
+        self._write_array(key, value, indent, float_formatter)
+        return
+    elif isinstance(value, int):
+      text = str(value)
+    elif value is not None:
+      text = "'" + str(value) + "'"
+    else:
+      text = 'null'
+
+    if key is not None:
+      self._write(indent + key + ': ' + text + '\n')
+    else:
+      self._write(indent + '- ' + text + '\n')
+
+  def _write_array(self, key, value, indent, float_formatter):
+    if key is not None:
+      if not value:
+        self._write(indent + key + ': []\n')
+        return
+
+      header = indent + key + ':\n'
+    else:
+      header = indent + '- item:\n'
+
+    format_func = float_formatter if value.typecode in 'fd' else str
+    item_prefix = indent + '- '
+
+    self._write(header + ''.join([item_prefix + format_func(item) + '\n' for item in value]))
+
+  def _start_entry(self, key):
+    """Writes the pending ``key:`` line of the enclosing dictionary or list and
+    returns the depth and indentation of the entry with the given ``key`` and
+    the function formatting floats in the entry.
+    """
+    frame = self._stack[-1]
+
+    if frame[2] is not None:
+      self._write(frame[2] + ':\n')
+      frame[2] = None
+
+    if key is not None:
+      float_formatter = self._float_formatters.get(key, self._default_float_formatter)
+    else:
+      float_formatter = frame[1]
+
+    return frame[0], ' ' * frame[0] * _INDENT, float_formatter
+
+
+def file_cbor_export(_proc, _run_mode, image, file, _options, _metadata, config, _data):
+  return _export_image(image, file, config, 'cbor')
+
+
+def _write_cbor(attributes, file, format_options=None):
+  _write_formats(attributes, {'cbor': file}, format_options)
+
+
+class _CborSink:
+  """Writes events from `_traverse()` as CBOR (RFC 8949).
+
+  Dictionaries and lists of known length are encoded with their length up
+  front, others (`_LazyAttributes` instances and iterators) as indefinite-length
+  maps and arrays, so that they are consumed only as the output is written.
+  Arrays of floats (`array.array` of type ``'d'``, e.g. stroke points) are
+  encoded as little-endian float64 typed arrays (RFC 8746, tag 86), or float32
+  typed arrays (tag 85) if ``format_options`` specify float32 stroke points.
+
+  Each stack entry indicates whether an open map or array has indefinite length
+  and must be terminated.
+  """
+
+  file_open_kwargs = {}
+
+  def __init__(self, f, format_options):
+    self._write = f.write
+
+    self._float_array_typecode = 'f' if format_options.packed_float_typecode == 'f' else 'd'
+
+    self._stack = []
+
+  def start_map(self, key, length):
+    if length is None:
+      head = _CBOR_INDEFINITE_MAP
+    else:
+      head = _encode_cbor_head(_CBOR_MAJOR_MAP, length)
+
+    self._write(self._get_prefix(key) + head)
+    self._stack.append(length is None)
+
+  def start_list(self, key, length):
+    if length is None:
+      head = _CBOR_INDEFINITE_ARRAY
+    else:
+      head = _encode_cbor_head(_CBOR_MAJOR_ARRAY, length)
+
+    self._write(self._get_prefix(key) + head)
+    self._stack.append(length is None)
+
+  def end_map(self):
+    if self._stack.pop():
+      self._write(_CBOR_BREAK)
+
+  end_list = end_map
+
+  def scalar(self, key, value):
+    self._write(self._get_prefix(key) + _encode_cbor_scalar(value, self._float_array_typecode))
+
+  @staticmethod
+  def _get_prefix(key):
+    return _encode_cbor_string(key) if key is not None else b''
+
+
+def _encode_cbor_scalar(value, float_array_typecode='d'):
+  if isinstance(value, str):
+    return _encode_cbor_string(value)
+  elif value is None:
+    return _CBOR_NULL
+  elif value is True:
+    return _CBOR_TRUE
+  elif value is False:
+    return _CBOR_FALSE
+  elif isinstance(value, int):
+    if value >= 0:
+      return _encode_cbor_head(_CBOR_MAJOR_UNSIGNED_INT, value)
+    else:
+      return _encode_cbor_head(_CBOR_MAJOR_NEGATIVE_INT, -1 - value)
+  elif isinstance(value, float):
+    return _pack_cbor_float(_CBOR_FLOAT64, value)
+  elif isinstance(value, (bytes, bytearray)):
+    return _encode_cbor_head(_CBOR_MAJOR_BYTES, len(value)) + bytes(value)
+  elif isinstance(value, array.array):
+    if value.typecode == 'd':
+      return _encode_cbor_float_array(value, float_array_typecode)
+    else:
+      return _encode_cbor_head(_CBOR_MAJOR_ARRAY, len(value)) + b''.join(
+        _encode_cbor_scalar(item) for item in value)
+  else:
+    raise TypeError(f'Object of type {type(value).__name__} is not CBOR serializable')
+
+
+def _encode_cbor_head(major_type, argument):
+  initial_byte = major_type << 5
+
+  if argument < 24:
+    return bytes([initial_byte | argument])
+  elif argument < 0x100:
+    return bytes([initial_byte | 24, argument])
+  elif argument < 0x10000:
+    return struct.pack('>BH', initial_byte | 25, argument)
+  elif argument < 0x100000000:
+    return struct.pack('>BI', initial_byte | 26, argument)
+  elif argument < 0x10000000000000000:
+    return struct.pack('>BQ', initial_byte | 27, argument)
+  else:
+    raise TypeError(f'integer {argument} is too large to be CBOR serialized')
+
+
+def _encode_cbor_string(value):
+  encoded_value = value.encode(_TEXT_ENCODING, errors='surrogatepass')
+  return _encode_cbor_head(_CBOR_MAJOR_TEXT, len(encoded_value)) + encoded_value
+
+
+def _encode_cbor_float_array(value, typecode):
+  if value.typecode != typecode or sys.byteorder == 'big':
+    value = array.array(typecode, value)
+
+  if sys.byteorder == 'big':
+    value.byteswap()
+
+  data = value.tobytes()
+
+  return (
+    _encode_cbor_head(_CBOR_MAJOR_TAG, _CBOR_FLOAT_ARRAY_TAGS[typecode])
+    + _encode_cbor_head(_CBOR_MAJOR_BYTES, len(data))
+    + data)
+
+
+_CBOR_MAJOR_UNSIGNED_INT = 0
+_CBOR_MAJOR_NEGATIVE_INT = 1
+_CBOR_MAJOR_BYTES = 2
+_CBOR_MAJOR_TEXT = 3
+_CBOR_MAJOR_ARRAY = 4
+_CBOR_MAJOR_MAP = 5
+_CBOR_MAJOR_TAG = 6
+
+_CBOR_FLOAT_ARRAY_TAGS = {
+  'f': 85,
+  'd': 86,
+}
+
+_CBOR_FALSE = b'\xf4'
+_CBOR_TRUE = b'\xf5'
+_CBOR_NULL = b'\xf6'
+_CBOR_FLOAT64 = 0xfb
+_CBOR_INDEFINITE_ARRAY = b'\x9f'
+_CBOR_INDEFINITE_MAP = b'\xbf'
+_CBOR_BREAK = b'\xff'
+
+_pack_cbor_float = struct.Struct('>Bd').pack
+
+
+def file_ndjson_export(_proc, _run_mode, image, file, _options, _metadata, config, _data):
+  return _export_image(image, file, config, 'ndjson')
+
+
+def _write_ndjson(attributes, file, format_options=None):
+  _write_formats(attributes, {'ndjson': file}, format_options)
+
+
+def file_csv_export(_proc, _run_mode, image, file, _options, _metadata, config, _data):
+  return _export_image(image, file, config, 'csv')
+
+
+def _write_csv(attributes, file, format_options=None):
+  _write_formats(attributes, {'csv': file}, format_options)
+
+
+class _RowSink(abc.ABC):
+  """Assembles events from `_traverse()` into a flat dictionary (row) for each
+  layer, channel, path, layer mask and filter, in depth-first order, and passes
+  each row to `_write_row()`, implemented by subclasses.
+
+  Each row contains the image name, the kind of the item (``'layer'``,
+  ``'channel'``, ``'path'``, ``'mask'`` or ``'filter'``), the dot-separated path
+  of the row and its parent row in the attribute tree (empty for top-level
+  items), the number of ancestor rows (depth) and the index among its siblings,
+  followed by the attributes of the item. Attributes of children, masks and
+  filters are written as separate rows following the row of the item.
+
+  Filters and masks precede some attributes of their item, hence their rows
+  are held back until the row of the item is complete. The row of a group
+  layer is complete once its children start, as children are the last
+  attribute of an item, so that rows of children are never held back.
+
+  Each stack entry is a `_RowSinkFrame` describing an open dictionary or list.
+  """
+
+  def __init__(self, f, format_options):
+    self._format_options = format_options
+
+    self._image_name = None
+    self._stack = []
+
+  def start_map(self, key, _length):
+    parent = self._stack[-1] if self._stack else None
+
+    if parent is None:
+      self._stack.append(_RowSinkFrame(_ROW_FRAME_ROOT))
+    elif parent.type == _ROW_FRAME_ROOT:
+      self._stack.append(_RowSinkFrame(_ROW_FRAME_IMAGE))
+    elif parent.type == _ROW_FRAME_ITEMS:
+      index = parent.num_entries
+      parent.num_entries += 1
+      self._stack.append(
+        self._create_item_frame(
+          parent.kind, parent.path + (str(index),), index, parent.parent_item))
+    elif parent.type == _ROW_FRAME_ITEM and key == 'mask':
+      self._stack.append(
+        self._create_item_frame(_ROW_KINDS[key], parent.path + (key,), 0, parent))
+    elif parent.type in [_ROW_FRAME_ITEM, _ROW_FRAME_VALUE]:
+      self._stack.append(_RowSinkFrame(_ROW_FRAME_VALUE, key=key, value={}))
+    else:
+      self._stack.append(_RowSinkFrame(_ROW_FRAME_IGNORED))
+
+  def start_list(self, key, _length):
+    parent = self._stack[-1]
+
+    if parent.type == _ROW_FRAME_IMAGE and key in _ROW_KINDS:
+      self._stack.append(_RowSinkFrame(_ROW_FRAME_ITEMS, kind=_ROW_KINDS[key], path=(key,)))
+    elif parent.type == _ROW_FRAME_ITEM and key in _ROW_KINDS:
+      if key == 'children':
+        self._complete_item(parent)
+
+      self._stack.append(
+        _RowSinkFrame(
+          _ROW_FRAME_ITEMS, kind=_ROW_KINDS[key], path=parent.path + (key,), parent_item=parent))
+    elif parent.type in [_ROW_FRAME_ITEM, _ROW_FRAME_VALUE]:
+      self._stack.append(_RowSinkFrame(_ROW_FRAME_VALUE, key=key, value=[]))
+    else:
+      self._stack.append(_RowSinkFrame(_ROW_FRAME_IGNORED))
+
+  def end_map(self):
+    frame = self._stack.pop()
+
+    if frame.type == _ROW_FRAME_ITEM:
+      if not frame.is_complete:
+        self._complete_item(frame)
+    elif frame.type == _ROW_FRAME_VALUE:
+      self._add_value(frame.key, frame.value)
+
+  end_list = end_map
+
+  def scalar(self, key, value):
+    frame = self._stack[-1]
+
+    if frame.type == _ROW_FRAME_IMAGE:
+      if key == 'name':
+        self._image_name = value
+    elif frame.type in [_ROW_FRAME_ITEM, _ROW_FRAME_VALUE]:
+      self._add_value(key, value)
+
+  def _create_item_frame(self, kind, path, index, parent_item):
+    if parent_item is not None:
+      parent_path = parent_item.path
+      depth = parent_item.depth + 1
+    else:
+      parent_path = ()
+      depth = 0
+
+    row = {
+      'image': self._image_name,
+      'kind': kind,
+      'path': '.'.join(path),
+      'parent_path': '.'.join(parent_path),
+      'depth': depth,
+      'index': index,
+    }
+
+    return _RowSinkFrame(
+      _ROW_FRAME_ITEM, kind=kind, path=path, parent_item=parent_item, depth=depth, value=row)
+
+  def _add_value(self, key, value):
+    frame = self._stack[-1]
+
+    if frame.type == _ROW_FRAME_ITEM:
+      frame.value[key] = value
+    elif frame.type == _ROW_FRAME_VALUE:
+      if key is not None:
+        frame.value[key] = value
+      else:
+        frame.value.append(value)
+
+  def _complete_item(self, item_frame):
+    item_frame.is_complete = True
+
+    rows = [item_frame.value]
+    rows.extend(item_frame.held_rows)
+    item_frame.held_rows = []
+
+    parent_item = item_frame.parent_item
+    while parent_item is not None and parent_item.is_complete:
+      parent_item = parent_item.parent_item
+
+    if parent_item is not None:
+      parent_item.held_rows.extend(rows)
+    else:
+      for row in rows:
+        self._write_row(row)
+
+  @abc.abstractmethod
+  def _write_row(self, row):
+    """Writes ``row`` to the output file."""
+
+
+_ROW_FRAME_ROOT = 0
+_ROW_FRAME_IMAGE = 1
+_ROW_FRAME_ITEMS = 2
+_ROW_FRAME_ITEM = 3
+_ROW_FRAME_VALUE = 4
+_ROW_FRAME_IGNORED = 5
+
+
+class _RowSinkFrame:
+  """Open dictionary or list in `_RowSink`.
+
+  ``type`` determines what the dictionary or list represents:
+  * `_ROW_FRAME_ROOT` - the root dictionary,
+  * `_ROW_FRAME_IMAGE` - image attributes,
+  * `_ROW_FRAME_ITEMS` - a list of items of ``kind``, located at ``path``,
+  * `_ROW_FRAME_ITEM` - an item (row) at ``path`` stored in ``value``,
+  * `_ROW_FRAME_VALUE` - a nested attribute value (a dictionary or a list)
+    assembled in ``value``, stored under ``key`` in its parent,
+  * `_ROW_FRAME_IGNORED` - any other value, not written.
+
+  ``parent_item`` is the frame of the item containing a list of items or an
+  item, or ``None`` for top-level items.
+  """
+
+  __slots__ = (
+    'type', 'kind', 'path', 'parent_item', 'depth', 'key', 'value', 'num_entries', 'held_rows',
+    'is_complete')
+
+  def __init__(
+        self, type_, kind=None, path=(), parent_item=None, depth=0, key=None, value=None):
+    self.type = type_
+    self.kind = kind
+    self.path = path
+    self.parent_item = parent_item
+    self.depth = depth
+    self.key = key
+    self.value = value
+
+    self.num_entries = 0
+    self.held_rows = []
+    self.is_complete = False
+
+
+class _NdjsonSink(_RowSink):
+
+  file_open_kwargs = {'encoding': _TEXT_ENCODING}
+
+  def __init__(self, f, format_options):
+    super().__init__(f, format_options)
+
+    self._write = f.write
+
+  def _write_row(self, row):
+    if self._format_options.rounds_floats:
+      row = _round_floats(row, self._format_options)
+
+    self._write(_encode_compact_json(row, self._format_options) + '\n')
+
+
+class _CsvSink(_RowSink):
+
+  file_open_kwargs = {'encoding': _TEXT_ENCODING, 'newline': ''}
+
+  def __init__(self, f, format_options):
+    super().__init__(f, format_options)
+
+    self._columns = _get_row_columns()
+
+    import csv
+    self._writer = csv.writer(f)
+    self._writer.writerow(self._columns)
+
+  def _write_row(self, row):
+    if self._format_options.rounds_floats:
+      row = _round_floats(row, self._format_options)
+
+    self._writer.writerow(
+      [_get_csv_value(row.get(column), self._format_options) for column in self._columns])
+
+
+def _get_row_columns():
+  columns = {name: None for name in ['image', 'kind', 'path', 'parent_path', 'depth', 'index']}
+
+  for getters in [
+        _ITEM_ATTRIBUTES,
+        _DRAWABLE_ATTRIBUTES,
+        _LAYER_ATTRIBUTES,
+        _CHANNEL_ATTRIBUTES,
+        _FILTER_ATTRIBUTES,
+  ]:
+    columns.update((name, None) for name, _getter in getters)
+
+  columns['parameters'] = None
+  columns['strokes'] = None
+
+  return list(columns)
+
+
+def _get_csv_value(value, format_options):
+  if value is None:
+    return ''
+  elif isinstance(value, bool):
+    return 'true' if value else 'false'
+  elif isinstance(value, (str, int, float)):
+    return value
+  else:
+    return _encode_compact_json(value, format_options)
+
+
+def _encode_compact_json(value, format_options):
+  return json.dumps(
+    value,
+    separators=(',', ':'),
+    default=lambda value_: _get_json_compatible_value(value_, format_options.packed_float_typecode),
+  )
+
+
+def _get_json_compatible_value(value, packed_float_typecode=None):
+  if isinstance(value, (_LazyAttributes, _AttributeRecord)):
+    return dict(value.items())
+  elif packed_float_typecode is not None and isinstance(value, array.array):
+    return _encode_base64_float_array(value, packed_float_typecode)
+  elif isinstance(value, (array.array, Iterator)):
+    return list(value)
+  else:
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def _round_floats(value, format_options, float_formatter=None):
+  """Returns a copy of ``value`` with floats rounded according to
+  ``format_options``.
+
+  Arrays written as packed floats are left intact.
+  """
+  if isinstance(value, float):
+    return float(float_formatter(value))
+  elif isinstance(value, (dict, _LazyAttributes, _AttributeRecord)):
+    return {
+      key: _round_floats(
+        value_,
+        format_options,
+        format_options.float_formatters.get(key, format_options.default_float_formatter))
+      for key, value_ in value.items()}
+  elif isinstance(value, array.array) and format_options.packed_float_typecode is not None:
+    return value
+  elif isinstance(value, (list, tuple, array.array, Iterator)):
+    return [_round_floats(value_, format_options, float_formatter) for value_ in value]
+  else:
+    return value
+
+
+_ROW_KINDS = {
+  'layers': 'layer',
+  'channels': 'channel',
+  'paths': 'path',
+  'children': 'layer',
+  'mask': 'mask',
+  'filters': 'filter',
+}
+
+
+def _write_formats(attributes, files, format_options=None, pipelined=False):
+  """Writes ``attributes`` to multiple files in a single traversal.
+
+  ``files`` maps file formats (keys of `_SINK_TYPES`) to files to write to
+  (`Gio.File` instances or file paths). Attributes are hence fetched from GIMP
+  only once regardless of the number of formats.
+
+  If ``pipelined`` is ``True``, attributes are serialized and written in a
+  background thread while the next attributes are fetched (see
+  `_PipelinedSink`).
+
+  If obtaining attributes fails, none of the files are replaced.
+  """
+  if format_options is None:
+    format_options = _DEFAULT_FORMAT_OPTIONS
+
+  with contextlib.ExitStack() as exit_stack:
+    sinks = []
+
+    for file_format, file in files.items():
+      sink_type = _SINK_TYPES[file_format]
+      f = exit_stack.enter_context(
+        _open_output_file(file, format_options, **sink_type.file_open_kwargs))
+      sinks.append(sink_type(f, format_options))
+
+    sink = sinks[0] if len(sinks) == 1 else _SinkGroup(sinks)
+
+    if pipelined:
+      with _PipelinedSink(sink) as pipelined_sink:
+        _traverse(attributes, pipelined_sink)
+    else:
+      _traverse(attributes, sink)
+
+
+def _traverse(attributes, sink):
+  """Walks ``attributes`` depth-first, reporting each value to ``sink`` as
+  events.
+
+  ``sink`` must provide the following methods, ``key`` being the dictionary
+  key of the value, or ``None`` for list entries and the root value:
+  * ``start_map(key, length)`` and ``end_map()`` enclosing the entries of a
+    dictionary, a `_LazyAttributes` or an `_AttributeRecord` instance,
+  * ``start_list(key, length)`` and ``end_list()`` enclosing the entries of a
+    list, a tuple or an iterator,
+  * ``scalar(key, value)`` for any other value. Arrays (`array.array`, e.g.
+    stroke points) are reported as a single value so that sinks can encode
+    them in bulk.
+
+  ``length`` is the number of entries, or ``None`` if unknown in advance
+  (`_LazyAttributes` instances and iterators).
+
+  Each stack entry holds an iterator over ``(key, value)`` pairs of a
+  dictionary or a list and the method to call once the iterator is exhausted.
+  """
+  start_map = sink.start_map
+  end_map = sink.end_map
+  start_list = sink.start_list
+  end_list = sink.end_list
+  scalar = sink.scalar
+
+  stack = [(iter([(None, attributes)]), None)]
+
+  while stack:
+    entries, end_func = stack[-1]
+
+    entry = next(entries, None)
+
+    if entry is None:
+      stack.pop()
+      if end_func is not None:
+        end_func()
+      continue
+
+    key, value = entry
+
+    # Most values are scalars, hence checked first without `isinstance()`,
+    # which is slow for abstract base classes.
+    if type(value) in _SCALAR_TYPES:
+      scalar(key, value)
+    elif isinstance(value, (dict, _AttributeRecord)):
+      start_map(key, len(value))
+      stack.append((iter(value.items()), end_map))
+    elif isinstance(value, _LazyAttributes):
+      start_map(key, None)
+      stack.append((iter(value.items()), end_map))
+    elif isinstance(value, (list, tuple)):
+      start_list(key, len(value))
+      stack.append((zip(itertools.repeat(None), value), end_list))
+    elif isinstance(value, Iterator):
+      start_list(key, None)
+      stack.append((zip(itertools.repeat(None), value), end_list))
+    else:
+      scalar(key, value)
+
+
+_SCALAR_TYPES = frozenset([str, int, float, bool, type(None)])
+
+
+class _SinkGroup:
+  """Forwards events from `_traverse()` to each of ``sinks``."""
+
+  def __init__(self, sinks):
+    self._sinks = sinks
+
+  def start_map(self, key, length):
+    for sink in self._sinks:
+      sink.start_map(key, length)
+
+  def end_map(self):
+    for sink in self._sinks:
+      sink.end_map()
+
+  def start_list(self, key, length):
+    for sink in self._sinks:
+      sink.start_list(key, length)
+
+  def end_list(self):
+    for sink in self._sinks:
+      sink.end_list()
+
+  def scalar(self, key, value):
+    for sink in self._sinks:
+      sink.scalar(key, value)
+
+
+class _PipelinedSink:
+  """Forwards events from `_traverse()` to ``sink`` in a background (writer)
+  thread.
+
+  Obtaining attributes from GIMP takes a round-trip to the GIMP core per call,
+  during which the writer thread serializes and writes attributes obtained so
+  far, hiding (most of) the serialization and writing time.
+
+  Events are passed to the writer thread in batches of `_PIPELINE_BATCH_SIZE`
+  events via a queue holding at most `_PIPELINE_MAX_BATCHES` batches. Once the
+  queue is full, the traversal waits for the writer thread to catch up, so
+  that memory usage stays bounded regardless of the number of attributes.
+
+  An exception raised in the writer thread is re-raised in the calling thread
+  by the next event or on exiting the ``with`` block. Remaining events are
+  discarded.
+  """
+
+  def __init__(self, sink):
+    import queue
+    import threading
+
+    self._sink = sink
+
+    self._batch = []
+    self._queue = queue.Queue(maxsize=_PIPELINE_MAX_BATCHES)
+    self._error = None
+
+    self._thread = threading.Thread(target=self._write_batches, name='writer', daemon=True)
+
+  def __enter__(self):
+    self._thread.start()
+    return self
+
+  def __exit__(self, exc_type, _exc_value, _traceback):
+    try:
+      if exc_type is None and self._error is None and self._batch:
+        self._queue.put(self._batch)
+        self._batch = []
+    finally:
+      self._queue.put(None)
+      self._thread.join()
+
+    if exc_type is None and self._error is not None:
+      raise self._error
+
+  def start_map(self, key, length):
+    self._add_event(self._sink.start_map, (key, length))
+
+  def end_map(self):
+    self._add_event(self._sink.end_map, ())
+
+  def start_list(self, key, length):
+    self._add_event(self._sink.start_list, (key, length))
+
+  def end_list(self):
+    self._add_event(self._sink.end_list, ())
+
+  def scalar(self, key, value):
+    self._add_event(self._sink.scalar, (key, value))
+
+  def _add_event(self, func, args):
+    self._batch.append((func, args))
+
+    if len(self._batch) >= _PIPELINE_BATCH_SIZE:
+      if self._error is not None:
+        raise self._error
+
+      self._queue.put(self._batch)
+      self._batch = []
+
+  def _write_batches(self):
+    while True:
+      batch = self._queue.get()
+      if batch is None:
+        return
+
+      # Keep consuming batches after an error so that the traversal is never
+      # blocked on a full queue.
+      if self._error is not None:
+        continue
+
+      try:
+        for func, args in batch:
+          func(*args)
+      except Exception as e:
+        self._error = e
+
+
+_SINK_TYPES = {
+  'xml': _XmlSink,
+  'json': _JsonSink,
+  'yaml': _YamlSink,
+  'cbor': _CborSink,
+  'ndjson': _NdjsonSink,
+  'csv': _CsvSink,
+}
+
+
+@contextlib.contextmanager
+def _open_output_file(file, format_options=None, encoding=None, errors=None, newline=None):
+  """Opens ``file`` (a `Gio.File` or a file path) for buffered writing, in
+  text mode if ``encoding`` is not ``None`` and in binary mode otherwise.
+
+  The output is written via `Gio.File.replace()`, hence ``file`` may also be a
+  remote location supported by GIO. ``file`` is replaced only after the
+  ``with`` block completes without an exception. Otherwise, ``file`` is left
+  intact and no partially written file remains.
+
+  If the file extension is one of `_COMPRESSIONS` (e.g. ``image.json.gz``),
+  the output is compressed on the fly with the compression level from
+  ``format_options``.
+  """
+  if format_options is None:
+    format_options = _DEFAULT_FORMAT_OPTIONS
+
+  if isinstance(file, str):
+    file = Gio.File.new_for_path(file)
+
+  raw_file = _GioOutputFile(file)
+  binary_file = io.BufferedWriter(raw_file, buffer_size=_WRITE_BUFFER_SIZE)
+
+  try:
+    f = binary_file
+
+    compression = _get_compression(file.get_basename())
+    if compression is not None:
+      # Compressing many small chunks separately is slow, hence the buffering.
+      f = io.BufferedWriter(
+        _COMPRESSED_FILE_OPENERS[compression](f, format_options.compression_level),
+        buffer_size=_WRITE_BUFFER_SIZE)
+
+    if encoding is not None:
+      f = io.TextIOWrapper(f, encoding=encoding, errors=errors, newline=newline)
+
+    yield f
+
+    f.close()
+    # Compressed files do not close the file they write to.
+    binary_file.close()
+  except BaseException:
+    raw_file.abort()
+    raise
+
+
+class _GioOutputFile(io.RawIOBase):
+  """Raw binary file writing to a `Gio.File` via `Gio.File.replace()`.
+
+  The contents are written to a temporary file replacing ``file`` when this
+  file is closed. Calling `abort()` discards the contents instead.
+
+  Errors from GIO are raised as `OSError`.
+  """
+
+  def __init__(self, file):
+    super().__init__()
+
+    self._cancellable = Gio.Cancellable()
+    self._aborted = False
+
+    try:
+      self._output_stream = file.replace(
+        None, False, Gio.FileCreateFlags.REPLACE_DESTINATION, self._cancellable)
+    except GLib.Error as e:
+      raise OSError(f'{file.get_parse_name()}: {e.message}') from e
+
+  def writable(self):
+    return True
+
+  def write(self, data):
+    if not self._aborted:
+      profile = profiling.get_active()
+
+      try:
+        if profile is None:
+          self._output_stream.write_all(bytes(data), self._cancellable)
+        else:
+          with profile.phase('file write'):
+            self._output_stream.write_all(bytes(data), self._cancellable)
+          profile.count('bytes written', len(data))
+      except GLib.Error as e:
+        raise OSError(e.message) from e
+
+    return len(data)
+
+  def close(self):
+    if self.closed:
+      return
+
+    try:
+      if not self._aborted:
+        profile = profiling.get_active()
+        with profile.phase('file write') if profile is not None else contextlib.nullcontext():
+          self._output_stream.close(self._cancellable)
+    except GLib.Error as e:
+      raise OSError(e.message) from e
+    finally:
+      super().close()
+
+  def abort(self):
+    """Closes the file without replacing the target file."""
+    if self.closed or self._aborted:
+      return
+
+    self._aborted = True
+    # Closing a cancelled stream removes the temporary file.
+    self._cancellable.cancel()
+
+    try:
+      self._output_stream.close(self._cancellable)
+    except GLib.Error:
+      pass
+
+
+def _get_compression(filename):
+  extension = os.path.splitext(filename)[1][1:].lower()
+  return extension if extension in _COMPRESSIONS else None
+
+
+def _open_gzip_file(fileobj, compression_level):
+  import gzip
+
+  # Setting the modification time to zero makes the output reproducible.
+  if compression_level >= 0:
+    return gzip.GzipFile(fileobj=fileobj, mode='wb', compresslevel=compression_level, mtime=0)
+  else:
+    return gzip.GzipFile(fileobj=fileobj, mode='wb', mtime=0)
+
+
+def _open_bz2_file(fileobj, compression_level):
+  import bz2
+
+  if compression_level >= 0:
+    return bz2.BZ2File(fileobj, 'wb', compresslevel=max(compression_level, 1))
+  else:
+    return bz2.BZ2File(fileobj, 'wb')
+
+
+def _open_xz_file(fileobj, compression_level):
+  import lzma
+
+  if compression_level >= 0:
+    return lzma.LZMAFile(fileobj, 'wb', preset=compression_level)
+  else:
+    return lzma.LZMAFile(fileobj, 'wb')
+
+
+_COMPRESSED_FILE_OPENERS = {
+  'gz': _open_gzip_file,
+  'bz2': _open_bz2_file,
+  'xz': _open_xz_file,
+}
+
+
+def _export_image(image, file, config, file_format):
+  profile_file = Gio.File.new_for_uri(file.get_uri() + _PROFILE_FILE_SUFFIX)
+
+  with _profile_run(config, file.get_basename(), profile_file):
+    return _export_image_unprofiled(image, file, config, file_format)
+
+
+def _export_image_unprofiled(image, file, config, file_format):
+  try:
+    field_mask, item_filter, format_options = _get_export_options(image, config)
+  except ValueError as e:
+    return Gimp.PDBStatusType.CALLING_ERROR, str(e)
+
+  incremental_mode = config.get_property('incremental-mode')
+
+  if incremental_mode and incremental_mode not in _INCREMENTAL_MODES:
+    return (
+      Gimp.PDBStatusType.CALLING_ERROR,
+      (f'invalid incremental mode "{incremental_mode}",'
+       f' must be one of: {", ".join(_INCREMENTAL_MODES)}'))
+
+  index_filepath = config.get_property('export-index')
+
+  # Cache files and the export index are stored as local files only.
+  filepath = file.get_path()
+  if filepath is None and (incremental_mode or index_filepath):
+    return (
+      Gimp.PDBStatusType.CALLING_ERROR,
+      'incremental export and export index require the output file to be a local file')
+
+  if index_filepath and incremental_mode != 'delta':
+    source_filepath = _get_image_source_filepath(image)
+  else:
+    source_filepath = None
+
+  if source_filepath is not None:
+    import export_index
+    index = export_index.ExportIndex(index_filepath)
+    options = _get_index_options(config, file_format, _get_compression(file.get_basename()))
+
+    if index.reuse_output(source_filepath, options, filepath):
+      return
+  else:
+    index = None
+    options = None
+
+  try:
+    if not incremental_mode:
+      _write_formats(
+        _get_image_attributes(image, field_mask, item_filter),
+        {file_format: file},
+        format_options,
+        pipelined=config.get_property('pipelined'))
+    else:
+      _export_image_incrementally(
+        image, filepath, config, file_format, field_mask, item_filter, format_options,
+        incremental_mode)
+  except OSError as e:
+    return Gimp.PDBStatusType.EXECUTION_ERROR, str(e)
+
+  if index is not None:
+    index.add(source_filepath, options, filepath)
+
+
+@contextlib.contextmanager
+def _profile_run(config, name, profile_file):
+  """Profiles the ``with`` block if enabled via the ``profile`` argument in
+  ``config`` or the `profiling.ENVIRONMENT_VARIABLE` environment variable, and
+  saves the profile as JSON to ``profile_file``.
+
+  Besides the initialization phases measured by `procedure`, the profile
+  contains the following phases: ``'export'`` (the whole ``with`` block),
+  ``'attribute gathering'`` (total duration of calls obtaining attributes),
+  ``'file write'`` (writing to output files) and ``'serialization'`` (the
+  remaining time of ``'export'`` except ``'gegl init'``, including
+  compression).
+
+  Failing to save the profile does not fail the export, a message is displayed
+  instead.
+  """
+  if not config.get_property('profile') and not profiling.is_enabled_by_environment():
+    yield
+    return
+
+  profile = profiling.start(name)
+
+  try:
+    with profile.phase('export'):
+      yield
+  finally:
+    profiling.stop()
+
+    # GEGL is initialized during the export if needed, hence the timings are
+    # obtained afterwards.
+    run_timings = procedure.get_run_timings()
+    for phase_name, seconds in run_timings.items():
+      profile.add_phase_time(phase_name, seconds)
+
+    profile.add_phase_time('attribute gathering', profile.get_calls_seconds())
+    profile.add_phase_time('file write', 0.0)
+    profile.add_phase_time(
+      'serialization',
+      max(
+        profile.phases['export']
+        - profile.phases['attribute gathering']
+        - profile.phases['file write']
+        - run_timings.get('gegl init', 0.0),
+        0.0))
+
+    try:
+      with _open_output_file(profile_file, encoding=_TEXT_ENCODING) as f:
+        json.dump(profile.to_dict(), f, indent=_INDENT)
+    except OSError as e:
+      Gimp.message(f'Failed to save profile to "{profile_file.get_parse_name()}": {e}')
+
+
+def _get_image_source_filepath(image):
+  """Returns the path to the file ``image`` was loaded from, or ``None`` if
+  the image has no file or has unsaved changes.
+  """
+  if image.is_dirty():
+    return None
+
+  image_file = image.get_file()
+  if image_file is None:
+    return None
+
+  return image_file.get_path()
+
+
+def _export_image_incrementally(
+      image, filepath, config, file_format, field_mask, item_filter, format_options,
+      incremental_mode):
+  """Exports image attributes, reusing attributes of items unchanged since the
+  previous export.
+
+  Attributes from the previous export are stored in a cache file next to
+  ``filepath``. Depending on ``incremental_mode``, the full attributes, a delta
+  against the previous export in the JSON Patch format (RFC 6902), or both are
+  written.
+  """
+  cache_filepath = filepath + _CACHE_FILE_SUFFIX
+  options = _get_cache_options(config, file_format)
+
+  cache = _load_export_cache(cache_filepath, options)
+  item_cache = _ItemCache(cache['items'] if cache is not None else None)
+
+  skeleton = _materialize(
+    _get_image_attributes(image, field_mask, item_filter, item_cache), item_cache.names_cache)
+
+  if incremental_mode in ['full', 'full-and-delta']:
+    _WRITE_FUNCS[file_format](
+      _build_cached_attributes(skeleton, item_cache.items, item_cache.names_cache),
+      filepath,
+      format_options)
+
+  if incremental_mode in ['delta', 'full-and-delta']:
+    _write_json(
+      list(
+        _iter_cache_patch(
+          cache['skeleton'] if cache is not None else {},
+          skeleton,
+          cache['items'] if cache is not None else {},
+          item_cache.items,
+          item_cache.names_cache)),
+      filepath + _PATCH_FILE_SUFFIX,
+      format_options)
+
+  with _open_output_file(cache_filepath, encoding=_TEXT_ENCODING) as f:
+    f.write(
+      json.dumps(
+        {'version': _CACHE_VERSION, 'options': options, 'skeleton': skeleton},
+        separators=(',', ':'),
+        default=_encode_cache_value))
+    f.write('\n')
+
+    for tattoo, entry in item_cache.items.items():
+      f.write(f'{tattoo}\t{entry.path}\t{entry.signature}\t{entry.get_attributes_json()}\n')
+
+  if _EXPORT_CACHES is not None:
+    _EXPORT_CACHES.add(
+      cache_filepath, {'options': options, 'skeleton': skeleton, 'items': item_cache.items})
+
+
+def _get_cache_options(config, file_format):
+  options = {arg[1]: config.get_property(arg[1]) for arg in _EXPORT_ARGUMENTS}
+  options['file-format'] = file_format
+
+  return options
+
+
+def _get_index_options(config, file_format, compression):
+  """Returns options identifying exports in the export index."""
+  return export_options.get_index_options(
+    {arg[1]: config.get_property(arg[1]) for arg in _EXPORT_ARGUMENTS}, file_format, compression)
+
+
+def _load_export_cache(cache_filepath, options):
+  """Returns the contents of the cache file, or ``None`` if the file does not
+  exist, is not valid or was created with different export options.
+
+  The first line of the cache file is a JSON object holding the cache version,
+  export options and the skeleton of image attributes, where attributes of each
+  item are replaced with the item tattoo (see `_get_image_attributes()`). Each
+  following line describes one item - its tattoo, position in the attribute
+  tree, signature and attributes (except for its children) as JSON, separated
+  by tabs. Item attributes are parsed only when needed (see `_CachedItem`).
+
+  If the plug-in runs as a resident process, the contents are taken from
+  memory if the cache file has not changed since it was written.
+  """
+  if _EXPORT_CACHES is not None:
+    cache = _EXPORT_CACHES.get(cache_filepath)
+    if cache is not None:
+      return cache if cache['options'] == options else None
+
+  names_cache = {}
+  items = {}
+
+  try:
+    with open(cache_filepath, 'r', encoding=_TEXT_ENCODING) as f:
+      header = json.loads(
+        f.readline(), object_hook=lambda value: _decode_cache_value(value, names_cache))
+
+      if (not isinstance(header, _AttributeRecord)
+          or header.get('version') != _CACHE_VERSION
+          or header.get('options') != options
+          or not isinstance(header.get('skeleton'), _AttributeRecord)):
+        return None
+
+      for line in f:
+        tattoo, path, signature, attributes_json = line.rstrip('\n').split('\t', 3)
+        items[tattoo] = _CachedItem(path, signature, attributes_json=attributes_json)
+  except (OSError, ValueError):
+    return None
+
+  return {
+    'options': options,
+    'skeleton': header['skeleton'],
+    'items': items,
+  }
+
+
+def _encode_cache_value(value):
+  if isinstance(value, array.array):
+    return {_CACHE_ARRAY_KEY: value.typecode, 'values': value.tolist()}
+  elif isinstance(value, _AttributeRecord):
+    return dict(value.items())
+  else:
+    return str(value)
+
+
+def _decode_cache_value(value, names_cache):
+  if _CACHE_ARRAY_KEY in value:
+    return array.array(value[_CACHE_ARRAY_KEY], value['values'])
+  else:
+    return _AttributeRecord.from_items(value.items(), names_cache)
+
+
+def _build_cached_attributes(skeleton, items, names_cache):
+  """Builds image attributes from ``skeleton`` (image attributes obtained with
+  an `_ItemCache`) and `_CachedItem` instances in ``items``.
+  """
+  if isinstance(skeleton, Mapping):
+    if _CACHE_ITEM_KEY in skeleton:
+      record_items = list(items[skeleton[_CACHE_ITEM_KEY]].get_attributes(names_cache).items())
+      if 'children' in skeleton:
+        record_items.append(
+          ('children', _build_cached_attributes(skeleton['children'], items, names_cache)))
+    else:
+      record_items = [
+        (key, _build_cached_attributes(value, items, names_cache))
+        for key, value in skeleton.items()]
+
+    return _AttributeRecord.from_items(record_items, names_cache)
+  elif isinstance(skeleton, list):
+    return [_build_cached_attributes(element, items, names_cache) for element in skeleton]
+  else:
+    return skeleton
+
+
+def _iter_cache_patch(old_skeleton, new_skeleton, old_items, new_items, names_cache, path=''):
+  """Yields JSON Patch (RFC 6902) operations transforming image attributes of
+  the previous export into image attributes of the current export, both given
+  as skeletons and `_CachedItem` instances (see `_build_cached_attributes()`).
+
+  Attributes of items whose `_CachedItem` instance was reused by the current
+  export are not compared (nor parsed), only their children are.
+  """
+  if (isinstance(old_skeleton, Mapping) and isinstance(new_skeleton, Mapping)
+      and (_CACHE_ITEM_KEY in old_skeleton) == (_CACHE_ITEM_KEY in new_skeleton)):
+    if _CACHE_ITEM_KEY in new_skeleton:
+      old_entry = old_items[old_skeleton[_CACHE_ITEM_KEY]]
+      new_entry = new_items[new_skeleton[_CACHE_ITEM_KEY]]
+      if old_entry is not new_entry:
+        yield from _iter_json_patch(
+          old_entry.get_attributes(names_cache), new_entry.get_attributes(names_cache), path)
+
+    for key in old_skeleton:
+      if key not in new_skeleton:
+        yield {'op': 'remove', 'path': path + '/' + _escape_json_pointer(key)}
+
+    for key, value in new_skeleton.items():
+      if key == _CACHE_ITEM_KEY:
+        continue
+
+      key_path = path + '/' + _escape_json_pointer(key)
+      if key in old_skeleton:
+        yield from _iter_cache_patch(
+          old_skeleton[key], value, old_items, new_items, names_cache, key_path)
+      else:
+        yield {
+          'op': 'add',
+          'path': key_path,
+          'value': _build_cached_attributes(value, new_items, names_cache),
+        }
+  elif isinstance(old_skeleton, list) and isinstance(new_skeleton, list):
+    for index, (old_element, new_element) in enumerate(zip(old_skeleton, new_skeleton)):
+      yield from _iter_cache_patch(
+        old_element, new_element, old_items, new_items, names_cache, f'{path}/{index}')
+
+    for index in range(len(old_skeleton), len(new_skeleton)):
+      yield {
+        'op': 'add',
+        'path': f'{path}/{index}',
+        'value': _build_cached_attributes(new_skeleton[index], new_items, names_cache),
+      }
+
+    for index in reversed(range(len(new_skeleton), len(old_skeleton))):
+      yield {'op': 'remove', 'path': f'{path}/{index}'}
+  else:
+    yield from _iter_json_patch(
+      _build_cached_attributes(old_skeleton, old_items, names_cache),
+      _build_cached_attributes(new_skeleton, new_items, names_cache),
+      path)
+
+
+class _ExportCaches:
+  """Contents of cache files of incremental exports kept in memory, keyed by
+  the cache file path.
+
+  An entry is returned only if its cache file has not changed since the entry
+  was added, as determined by the file size and modification time. Once the
+  total memory occupied by the contents of all entries (see
+  `_get_cache_memory()`) exceeds ``max_memory`` bytes, the least recently used
+  entries are evicted.
+  """
+
+  def __init__(self, max_memory):
+    self.max_memory = max_memory
+    self.memory = 0
+
+    # Entries are ordered from the least to the most recently used.
+    self._entries = {}
+
+  def get(self, cache_filepath):
+    entry = self._entries.pop(cache_filepath, None)
+    if entry is None:
+      return None
+
+    cache, memory, file_size, mtime_ns = entry
+
+    try:
+      cache_stat = os.stat(cache_filepath)
+    except OSError:
+      cache_stat = None
+
+    if (cache_stat is None
+        or cache_stat.st_size != file_size
+        or cache_stat.st_mtime_ns != mtime_ns):
+      self.memory -= memory
+      return None
+
+    self._entries[cache_filepath] = entry
+
+    return cache
+
+  def add(self, cache_filepath, cache):
+    previous_entry = self._entries.pop(cache_filepath, None)
+    if previous_entry is not None:
+      self.memory -= previous_entry[1]
+
+    try:
+      cache_stat = os.stat(cache_filepath)
+    except OSError:
+      return
+
+    memory = _get_cache_memory(cache)
+    if memory > self.max_memory:
+      return
+
+    self._entries[cache_filepath] = (cache, memory, cache_stat.st_size, cache_stat.st_mtime_ns)
+    self.memory += memory
+
+    while self.memory > self.max_memory:
+      _cache, evicted_memory, _file_size, _mtime_ns = self._entries.pop(next(iter(self._entries)))
+      self.memory -= evicted_memory
+
+
+def _get_cache_memory(cache):
+  """Returns the approximate number of bytes occupied by ``cache`` as returned
+  by `_load_export_cache()`.
+  """
+  return (
+    _get_memory(cache['options'])
+    + _get_memory(cache['skeleton'])
+    + sys.getsizeof(cache['items'])
+    + sum(
+      sys.getsizeof(tattoo) + entry.get_memory() for tattoo, entry in cache['items'].items()))
+
+
+def _get_memory(value):
+  """Returns the approximate number of bytes occupied by ``value`` and the
+  attributes, elements or values it references.
+
+  Attribute names of `_AttributeRecord` instances are not counted, as they are
+  shared between records (see `_materialize()`). Neither are ``None`` and
+  booleans, which are singletons.
+  """
+  if value is None or isinstance(value, bool):
+    return 0
+
+  memory = sys.getsizeof(value)
+
+  if isinstance(value, _AttributeRecord):
+    memory += sys.getsizeof(value._values) + sum(_get_memory(element) for element in value._values)
+  elif isinstance(value, dict):
+    memory += sum(_get_memory(key) + _get_memory(element) for key, element in value.items())
+  elif isinstance(value, (list, tuple)):
+    memory += sum(_get_memory(element) for element in value)
+
+  return memory
+
+
+class _CachedItem:
+  """Position in the attribute tree, signature and attributes (except for
+  children) of an item from an incremental export.
+
+  Attributes are kept as JSON as read from a cache file and parsed only when
+  requested. Conversely, attributes are converted to JSON only once when
+  written to cache files. Attributes of items unchanged between exports are
+  hence neither parsed nor serialized again unless required.
+  """
+
+  __slots__ = ('path', 'signature', '_attributes', '_attributes_json', '_memory')
+
+  def __init__(self, path, signature, attributes=None, attributes_json=None):
+    self.path = path
+    self.signature = signature
+    self._attributes = attributes
+    self._attributes_json = attributes_json
+    self._memory = None
+
+  def get_attributes(self, names_cache):
+    if self._attributes is None:
+      self._attributes = json.loads(
+        self._attributes_json,
+        object_hook=lambda value: _decode_cache_value(value, names_cache))
+      self._memory = None
+
+    return self._attributes
+
+  def get_attributes_json(self):
+    if self._attributes_json is None:
+      self._attributes_json = json.dumps(
+        self._attributes, separators=(',', ':'), default=_encode_cache_value)
+      self._memory = None
+
+    return self._attributes_json
+
+  def is_empty(self):
+    if self._attributes is not None:
+      return not self._attributes
+    else:
+      return self._attributes_json == '{}'
+
+  def get_memory(self):
+    """Returns the approximate number of bytes occupied by this instance,
+    including parsed attributes and their JSON, whichever are present.
+    """
+    if self._memory is None:
+      self._memory = (
+        sys.getsizeof(self)
+        + _get_memory(self.path)
+        + _get_memory(self.signature)
+        + _get_memory(self._attributes)
+        + _get_memory(self._attributes_json))
+
+    return self._memory
+
+
+class _ItemCache:
+  """Attributes of items from the previous export, keyed by item tattoo.
+
+  Attributes of an item are reused if its position in the attribute tree and
+  its signature are the same as in the previous export. The signature consists
+  of attributes that are cheap to obtain and likely to change when an item is
+  edited (e.g. name, visibility, offsets, size, number of filters, lengths of
+  path strokes). Changes to other attributes of an item only (e.g. filter
+  parameters) are therefore not detected.
+
+  ``items`` contains `_CachedItem` instances for all items visited during the
+  current export. ``names_cache`` holds attribute names shared by
+  `_AttributeRecord` instances created during the current export.
+  """
+
+  def __init__(self, previous_items=None):
+    self._previous_items = previous_items if previous_items is not None else {}
+    self.items = {}
+    self.names_cache = {}
+
+  def add_item(self, item, field_mask, path, included):
+    """Adds an entry for ``item`` to ``items`` and returns the item tattoo.
+
+    Attributes of ``item`` except for its children are obtained only if the
+    item changed since the previous export.
+    """
+    tattoo = str(item.get_tattoo())
+    path_str = '.'.join(path)
+    signature = json.dumps(_get_item_signature(item), separators=(',', ':'))
+
+    entry = self._previous_items.get(tattoo)
+
+    if entry is None or entry.path != path_str or entry.signature != signature:
+      entry = _CachedItem(
+        path_str,
+        signature,
+        attributes=_materialize(
+          _LazyAttributes(_iter_item_own_attributes, item, field_mask, path, included),
+          self.names_cache))
+
+    self.items[tattoo] = entry
+
+    return tattoo
+
+
+def _get_item_signature(item):
+  signature = [
+    item.__class__.__qualname__, item.get_name(), item.get_visible(), item.get_color_tag().name]
+
+  if isinstance(item, Gimp.Drawable):
+    signature.extend(item.get_offsets()[1:])
+    signature.append(item.get_width())
+    signature.append(item.get_height())
+    signature.append(len(item.get_filters()))
+
+  if isinstance(item, Gimp.Layer):
+    signature.append(item.get_opacity())
+    signature.append(item.get_mode().name)
+    mask = item.get_mask()
+    signature.append(mask.get_id() if mask is not None else None)
+
+  if isinstance(item, Gimp.Channel):
+    signature.append(item.get_opacity())
+    signature.append(list(item.get_color().get_rgba()))
+
+  if isinstance(item, Gimp.Path):
+    # The length and the starting point of a stroke change when its anchors
+    # are moved, added or removed, without obtaining all of its points.
+    for stroke_id in item.get_strokes():
+      x, y, _slope, _valid = item.stroke_get_point_at_dist(
+        stroke_id, 0.0, _STROKE_SIGNATURE_PRECISION)
+      signature.append([
+        stroke_id,
+        item.stroke_get_length(stroke_id, _STROKE_SIGNATURE_PRECISION),
+        x,
+        y,
+      ])
+
+  return signature
+
+
+class _ItemProxies:
+  """Creates `_ItemProxy` instances memoizing calls to GIMP objects (the image,
+  items and filters) during a single export.
+
+  The same proxy is returned for the same object, as libgimp returns the same
+  object for the same ID. Results are hence shared between all places
+  obtaining the same fact, e.g. names of selected layers and of the traversed
+  layers, or the signature and the attributes of an item (see `_ItemCache`).
+
+  ``hits`` is the number of calls answered from memoized results and
+  ``misses`` the number of calls made to GIMP.
+
+  If ``enabled`` is ``False``, objects are returned as is without memoizing,
+  avoiding the overhead of proxies where each fact is obtained only once.
+  """
+
+  def __init__(self, enabled=True):
+    self.enabled = enabled
+    self._proxies = {}
+
+    self.hits = 0
+    self.misses = 0
+
+  def get(self, obj):
+    if not self.enabled:
+      return obj
+
+    try:
+      return self._proxies[obj]
+    except KeyError:
+      proxy = self._proxies[obj] = _ItemProxy(obj, self)
+      return proxy
+
+  def release(self, proxy):
+    """Discards memoized results of ``proxy`` and of proxies obtained through
+    it (e.g. filters or a layer mask).
+
+    Subsequent calls to ``proxy`` are made to GIMP again.
+    """
+    if not self.enabled:
+      return
+
+    self._proxies.pop(proxy._obj, None)
+
+    values = proxy._results.values()
+    proxy._results = {}
+
+    for value in values:
+      if isinstance(value, _ItemProxy):
+        self.release(value)
+      elif isinstance(value, _ProxyList):
+        for obj in value.objects:
+          element_proxy = self._proxies.get(obj)
+          if element_proxy is not None:
+            self.release(element_proxy)
+
+
+class _ItemProxy:
+  """Wraps a GIMP object, memoizing the results of its methods.
+
+  Methods are memoized per arguments, except for `_UNMEMOIZED_METHODS`. Objects
+  returned by `_PROXIED_RESULT_METHODS` are wrapped in proxies as well.
+
+  ``isinstance()`` checks against GIMP types work as for the wrapped object.
+  """
+
+  __slots__ = ('_obj', '_proxies', '_results')
+
+  def __init__(self, obj, proxies):
+    self._obj = obj
+    self._proxies = proxies
+    self._results = {}
+
+  @property
+  def __class__(self):
+    return self._obj.__class__
+
+  def __getattr__(self, name):
+    # Fail for attributes the wrapped object does not have.
+    getattr(self._obj, name)
+
+    # The method is added to the class on first access so that subsequent
+    # accesses (for any object) are regular attribute lookups.
+    if name in _UNMEMOIZED_METHODS:
+      setattr(_ItemProxy, name, _create_delegating_method(name))
+    else:
+      setattr(_ItemProxy, name, _create_memoized_method(name))
+
+    return getattr(self, name)
+
+  def __repr__(self):
+    return f'<_ItemProxy of {self._obj!r}>'
+
+
+def _create_memoized_method(name):
+  proxies_results = name in _PROXIED_RESULT_METHODS
+
+  def memoized_method(self, *args):
+    key = (name, args) if args else name
+
+    value = self._results.get(key, _NO_VALUE)
+    if value is not _NO_VALUE:
+      self._proxies.hits += 1
+      return value
+
+    self._proxies.misses += 1
+    value = getattr(self._obj, name)(*args)
+
+    if proxies_results and value is not None:
+      if isinstance(value, (list, tuple)):
+        value = _ProxyList(value, self._proxies)
+      else:
+        value = self._proxies.get(value)
+
+    self._results[key] = value
+
+    return value
+
+  memoized_method.__name__ = name
+
+  return memoized_method
+
+
+def _create_delegating_method(name):
+
+  def delegating_method(self, *args):
+    return getattr(self._obj, name)(*args)
+
+  delegating_method.__name__ = name
+
+  return delegating_method
+
+
+class _ProxyList:
+  """Sequence of GIMP objects returned as `_ItemProxy` instances.
+
+  Proxies are created only when elements are accessed, so that proxies of
+  released items are not kept alive by the sequence.
+  """
+
+  __slots__ = ('objects', '_proxies')
+
+  def __init__(self, objects, proxies):
+    self.objects = objects
+    self._proxies = proxies
+
+  def __getitem__(self, index):
+    return self._get_proxy(self.objects[index])
+
+  def __iter__(self):
+    for obj in self.objects:
+      yield self._get_proxy(obj)
+
+  def __len__(self):
+    return len(self.objects)
+
+  def _get_proxy(self, obj):
+    return self._proxies.get(obj) if obj is not None else None
+
+
+_PROXIED_RESULT_METHODS = frozenset([
+  'get_channels',
+  'get_children',
+  'get_filters',
+  'get_layers',
+  'get_mask',
+  'get_paths',
+  'get_selected_channels',
+  'get_selected_drawables',
+  'get_selected_layers',
+  'get_selected_paths',
+])
+
+# Results of these methods are bulky and obtained only once per object.
+_UNMEMOIZED_METHODS = frozenset([
+  'get_config',
+  'stroke_get_points',
+])
+
+
+def _materialize(attributes, names_cache=None):
+  """Returns a copy of ``attributes`` with dictionaries and `_LazyAttributes`
+  instances converted to `_AttributeRecord` instances and iterators to lists.
+
+  Records sharing the same attribute names share a single tuple of names stored
+  in ``names_cache``. Existing records are immutable and hence returned as is.
+  """
+  if isinstance(attributes, _AttributeRecord):
+    return attributes
+  elif isinstance(attributes, (dict, _LazyAttributes)):
+    return _AttributeRecord.from_items(
+      ((key, _materialize(value, names_cache)) for key, value in attributes.items()),
+      names_cache)
+  elif isinstance(attributes, (list, tuple, Iterator)):
+    return [_materialize(value, names_cache) for value in attributes]
+  else:
+    return attributes
+
+
+def _to_builtins(attributes):
+  """Returns a copy of ``attributes`` with dictionaries, `_LazyAttributes` and
+  `_AttributeRecord` instances converted to dictionaries and iterators to
+  lists.
+  """
+  if isinstance(attributes, (dict, _LazyAttributes, _AttributeRecord)):
+    return {key: _to_builtins(value) for key, value in attributes.items()}
+  elif isinstance(attributes, (list, tuple, Iterator)):
+    return [_to_builtins(value) for value in attributes]
+  else:
+    return attributes
+
+
+def _iter_json_patch(old_value, new_value, path=''):
+  """Yields JSON Patch (RFC 6902) operations transforming ``old_value`` into
+  ``new_value``.
+
+  NaN values are considered equal to each other.
+  """
+  if old_value is new_value:
+    return
+
+  if (isinstance(old_value, (dict, _AttributeRecord))
+      and isinstance(new_value, (dict, _AttributeRecord))):
+    for key in old_value:
+      if key not in new_value:
+        yield {'op': 'remove', 'path': path + '/' + _escape_json_pointer(key)}
+
+    for key, value in new_value.items():
+      key_path = path + '/' + _escape_json_pointer(key)
+      if key in old_value:
+        yield from _iter_json_patch(old_value[key], value, key_path)
+      else:
+        yield {'op': 'add', 'path': key_path, 'value': value}
+  elif isinstance(old_value, list) and isinstance(new_value, list):
+    for index, (old_element, new_element) in enumerate(zip(old_value, new_value)):
+      yield from _iter_json_patch(old_element, new_element, f'{path}/{index}')
+
+    for index in range(len(old_value), len(new_value)):
+      yield {'op': 'add', 'path': f'{path}/{index}', 'value': new_value[index]}
+
+    for index in reversed(range(len(new_value), len(old_value))):
+      yield {'op': 'remove', 'path': f'{path}/{index}'}
+  elif type(old_value) is not type(new_value) or not _are_values_equal(old_value, new_value):
+    yield {'op': 'replace', 'path': path, 'value': new_value}
+
+
+def _are_values_equal(old_value, new_value):
+  if old_value == new_value:
+    return True
+  elif isinstance(old_value, float):
+    # NaN is the only value not equal to itself.
+    return old_value != old_value and new_value != new_value
+  elif isinstance(old_value, array.array):
+    return (
+      old_value.typecode == new_value.typecode
+      and len(old_value) == len(new_value)
+      and all(
+        _are_values_equal(old_element, new_element)
+        for old_element, new_element in zip(old_value, new_value)))
+  else:
+    return False
+
+
+def _escape_json_pointer(key):
+  return key.replace('~', '~0').replace('/', '~1')
+
+
+def plug_in_image_attribute_export_batch(_proc, config, _data):
+  images = config.get_property('images')
+  if not images:
+    images = Gimp.get_images()
+
+  output_dirpath = config.get_property('output-directory')
+  if not output_dirpath:
+    return Gimp.PDBStatusType.CALLING_ERROR, 'output directory must be specified'
+
+  file_formats = list(dict.fromkeys(
+    file_format.strip() for file_format in config.get_property('file-format').lower().split(',')))
+  for file_format in file_formats:
+    if not file_format:
+      return (
+        Gimp.PDBStatusType.CALLING_ERROR,
+        f'empty file format in "{config.get_property("file-format")}"')
+
+    if file_format not in _WRITE_FUNCS:
+      return (
+        Gimp.PDBStatusType.CALLING_ERROR,
+        f'unsupported file format "{file_format}", must be one of: {", ".join(_WRITE_FUNCS)}')
+
+  filename_pattern = config.get_property('filename-pattern')
+  try:
+    filename_pattern.format(name='', id=0)
+  except (KeyError, IndexError, ValueError):
+    return Gimp.PDBStatusType.CALLING_ERROR, f'invalid filename pattern "{filename_pattern}"'
+
+  compression = config.get_property('compression').lower()
+  if compression and compression not in _COMPRESSIONS:
+    return (
+      Gimp.PDBStatusType.CALLING_ERROR,
+      f'unsupported compression "{compression}", must be one of: {", ".join(_COMPRESSIONS)}')
+
+  try:
+    os.makedirs(output_dirpath, exist_ok=True)
+  except OSError as e:
+    return Gimp.PDBStatusType.EXECUTION_ERROR, str(e)
+
+  index_filepath = config.get_property('export-index')
+  if index_filepath:
+    import export_index
+    index = export_index.ExportIndex(index_filepath)
+    options = {
+      file_format: _get_index_options(config, file_format, compression)
+      for file_format in file_formats}
+  else:
+    index = None
+    options = None
+
+  profile_file = Gio.File.new_for_path(os.path.join(output_dirpath, _BATCH_PROFILE_FILENAME))
+
+  with _profile_run(config, 'batch', profile_file):
+    failures = _export_images(
+      images, output_dirpath, file_formats, filename_pattern, compression, config, index, options)
+
+  if failures:
+    return Gimp.PDBStatusType.EXECUTION_ERROR, 'Failed to export images:\n' + '\n'.join(failures)
+
+
+def plug_in_image_attribute_export_resident(proc, config, _data):
+  global _EXPORT_CACHES
+
+  temp_proc_names = {
+    proc_name: proc_name + _RESIDENT_PROCEDURE_SUFFIX
+    for proc_name in [
+      *(f'file-{file_format}-export' for file_format in _WRITE_FUNCS),
+      'plug-in-image-attribute-export-batch',
+    ]
+  }
+
+  if Gimp.get_pdb().procedure_exists(next(iter(temp_proc_names.values()))):
+    # Another resident process is already running.
+    return
+
+  _EXPORT_CACHES = _ExportCaches(config.get_property('max-cache-memory') * 1024 * 1024)
+
+  plug_in = proc.get_plug_in()
+
+  for proc_name, temp_proc_name in temp_proc_names.items():
+    procedure.install_temp_procedure(plug_in, proc_name, temp_proc_name)
+
+  proc.persistent_ready()
+
+  # Process calls to the temporary procedures until GIMP quits.
+  while True:
+    plug_in.persistent_process(0)
+
+
+def _export_images(
+      images, output_dirpath, file_formats, filename_pattern, compression, config, index, options):
+  """Exports attributes of each of ``images`` to a file per format in
+  ``file_formats``.
+
+  Attributes of an image are obtained only once for all formats (see
+  `_write_formats()`).
+  """
+  failures = []
+  output_names = set()
+
+  for image in images:
+    output_name = _get_batch_output_name(image, filename_pattern, output_names)
+    output_names.add(output_name)
+
+    try:
+      field_mask, item_filter, format_options = _get_export_options(image, config)
+
+      source_filepath = _get_image_source_filepath(image) if index is not None else None
+
+      output_filepaths = {}
+      for file_format in file_formats:
+        extension = file_format if not compression else f'{file_format}.{compression}'
+        output_filepath = os.path.join(output_dirpath, f'{output_name}.{extension}')
+
+        if not (source_filepath is not None
+                and index.reuse_output(source_filepath, options[file_format], output_filepath)):
+          output_filepaths[file_format] = output_filepath
+
+      if not output_filepaths:
+        continue
+
+      _write_formats(
+        _get_image_attributes(image, field_mask, item_filter),
+        output_filepaths,
+        format_options,
+        pipelined=config.get_property('pipelined'))
+
+      if source_filepath is not None:
+        for file_format, output_filepath in output_filepaths.items():
+          index.add(source_filepath, options[file_format], output_filepath)
+    except (ValueError, OSError) as e:
+      failures.append(f'{image.get_name()}: {e}')
+
+  return failures
+
+
+def _get_batch_output_name(image, filename_pattern, used_output_names=()):
+  """Returns the output filename without the file extension for ``image``
+  from ``filename_pattern``.
+
+  The pattern may contain the ``{name}`` field (image name without the file
+  extension) and the ``{id}`` field (image ID). If the resulting name is in
+  ``used_output_names`` (e.g. for two opened images with the same name), the
+  image ID is appended to prevent overwriting the output of another image.
+  """
+  image_file = image.get_file()
+  if image_file is not None and image_file.get_basename() is not None:
+    image_name = os.path.splitext(image_file.get_basename())[0]
+  else:
+    image_name = f'Untitled-{image.get_id()}'
+
+  output_name = filename_pattern.format(name=image_name, id=image.get_id())
+
+  unique_output_name = output_name
+  number = 1
+  while unique_output_name in used_output_names:
+    unique_output_name = f'{output_name}-{image.get_id()}'
+    if number > 1:
+      unique_output_name += f'-{number}'
+    number += 1
+
+  return unique_output_name
+
+
+class _LazyAttributes:
+  """Dictionary-like view of attributes fetched only when iterated over.
+
+  Calling `items()` returns a generator of ``(name, value)`` pairs which calls
+  ``func`` with ``args`` and fetches each attribute from GIMP only when the
+  generator reaches it. Nothing is cached, so attributes are released as soon
+  as they are consumed.
+  """
+
+  __slots__ = ('_func', '_args')
+
+  def __init__(self, func, *args):
+    self._func = func
+    self._args = args
+
+  def items(self):
+    return self._func(*self._args)
+
+  def to_dict(self):
+    """Fetches all attributes and returns them as a dictionary, with nested
+    attributes converted to dictionaries and lists.
+    """
+    return _to_builtins(self)
+
+
+class _AttributeRecord(Mapping):
+  """Compact read-only mapping of attribute names to values.
+
+  Names and values are stored in two tuples of the same length. Records with
+  the same names (e.g. all layers exported with the same field mask, or all
+  filters of the same operation) can share a single tuple of names, so that a
+  record takes a fraction of the memory of a dictionary with the same entries
+  and creates no hash table. Lookups by name are linear, which is fast for the
+  few dozen attributes an item has.
+  """
+
+  __slots__ = ('_names', '_values')
+
+  def __init__(self, names: tuple, values: tuple):
+    self._names = names
+    self._values = values
+
+  @classmethod
+  def from_items(cls, items, names_cache=None):
+    """Creates a record from an iterable of ``(name, value)`` pairs.
+
+    If ``names_cache`` is not ``None``, the tuple of names is replaced with an
+    equal tuple from ``names_cache``, or added to ``names_cache`` if missing.
+    """
+    names = []
+    values = []
+    for name, value in items:
+      names.append(name)
+      values.append(value)
 
-import gi
-gi.require_version('Babl', '0.1')
-from gi.repository import Babl
-gi.require_version('Gegl', '0.4')
-from gi.repository import Gegl
-gi.require_version('Gimp', '3.0')
-from gi.repository import Gimp
-from gi.repository import GObject
+    names = tuple(names)
+    if names_cache is not None:
+      names = names_cache.setdefault(names, names)
 
-import procedure
+    return cls(names, tuple(values))
 
+  def __getitem__(self, name):
+    try:
+      return self._values[self._names.index(name)]
+    except ValueError:
+      raise KeyError(name) from None
 
-_TEXT_ENCODING = 'utf-8'
-_INDENT = 4
+  def __contains__(self, name):
+    return name in self._names
 
+  def __iter__(self):
+    return iter(self._names)
 
-def file_xml_export(_proc, _run_mode, image, file, _options, _metadata, _config, _data):
-  image_attributes = _get_image_attributes(image)
-
-  root = ET.Element('image')
-  root.text = '\n' + ' ' * _INDENT
-  
-  elements = [[key, value, root, 1, False] for key, value in image_attributes['image'].items()]
-  elements[-1][-1] = True
-  
-  while elements:
-    key, value, parent, depth, is_last = elements.pop(0)
-    
-    if isinstance(value, (tuple, list, dict)):
-      element = ET.SubElement(parent, key)
-      
-      child_depth = depth + 1
-      
-      if not value:
-        element.text = '\n' + ' ' * (child_depth - 1) * _INDENT
-      else:
-        element.text = '\n' + ' ' * child_depth * _INDENT
-      
-      if not is_last:
-        element.tail = '\n' + ' ' * depth * _INDENT
-      else:
-        element.tail = '\n' + ' ' * (depth - 1) * _INDENT
-      
-      if isinstance(value, dict):
-        for child_key, child_value in value.items():
-          elements.append([child_key, child_value, element, child_depth, False])
+  def __len__(self):
+    return len(self._names)
+
+  def __repr__(self):
+    return f'{type(self).__qualname__}({dict(self.items())!r})'
+
+  def keys(self):
+    return self._names
+
+  def values(self):
+    return self._values
+
+  def items(self):
+    return zip(self._names, self._values)
+
+  def to_dict(self):
+    """Returns the attributes as a dictionary, with nested attributes
+    converted to dictionaries and lists.
+    """
+    return _to_builtins(self)
+
+
+class _FieldMask:
+  """Rules determining which attributes are fetched from GIMP.
+
+  A field mask is a comma-separated list of ``pattern=true`` or
+  ``pattern=false`` rules (``pattern`` alone is equivalent to ``pattern=true``).
+  A pattern is a dot-separated attribute path relative to the image, e.g.
+  ``layers.*.filters``. List entries are addressed by their index. Each path
+  component may contain `fnmatch` wildcards, ``*`` matching exactly one
+  component. ``**`` matches any number of components. A pattern without a dot
+  matches an attribute of that name at any depth, e.g. ``strokes=false``.
+
+  If multiple rules match an attribute, the last one wins. Attributes not
+  matching any rule inherit the state of the enclosing attribute. An excluded
+  attribute containing other attributes is still traversed if a subsequent
+  rule may include any of its descendants, e.g. ``*=false,layers.*.name``.
+
+  ``**`` does not match attributes below filter parameters
+  (`_FILTER_PARAMETERS_FIELD`), as their names are not known in advance.
+  Individual filter parameters are matched only by patterns naming the
+  parameters explicitly, e.g. ``**.parameters.radius``.
+  """
+
+  def __init__(self, rules=()):
+    self._rules = [(tuple(pattern.split('.')), included) for pattern, included in rules]
+
+  @classmethod
+  def from_string(cls, mask_str: str):
+    rules = []
+
+    for rule_str in mask_str.split(','):
+      rule_str = rule_str.strip()
+      if not rule_str:
+        continue
+
+      pattern, separator, value_str = rule_str.partition('=')
+      pattern = pattern.strip()
+      value_str = value_str.strip().lower()
+
+      if not separator or value_str == 'true':
+        included = True
+      elif value_str == 'false':
+        included = False
       else:
-        for child_value in value:
-          elements.append(['item', child_value, element, child_depth, False])
-      elements[-1][-1] = True
+        raise ValueError(f'invalid value "{value_str}" for field "{pattern}", must be true or false')
+
+      if not pattern:
+        raise ValueError(f'missing field name in rule "{rule_str}"')
+
+      if '.' not in pattern and pattern != '**':
+        pattern = '**.' + pattern
+
+      rules.append((pattern, included))
+
+    return cls(rules)
+
+  def check(self, path, parent_included, fields=None):
+    """Returns a tuple of (included, traversed) for the attribute at ``path``.
+
+    ``included`` indicates whether the attribute is fetched. ``traversed``
+    indicates whether an attribute containing other attributes (a list or a
+    dictionary) is fetched so that its descendants can be checked as well.
+    ``parent_included`` is the ``included`` state of the enclosing attribute.
+
+    ``fields`` describes the descendants the attribute may have as a
+    dictionary of attribute names (`_LIST_ENTRY` for list entries) mapped to
+    the descendants of each attribute in the same form. An empty dictionary
+    means no descendants, ``None`` means any descendants. An excluded attribute
+    is traversed only if a subsequent rule may include one of its descendants.
+    """
+    if not self._rules:
+      return parent_included, parent_included
+
+    included = parent_included
+    last_matching_rule_index = -1
+
+    for index, (pattern_parts, rule_included) in enumerate(self._rules):
+      if _match_path(pattern_parts, path):
+        included = rule_included
+        last_matching_rule_index = index
+
+    if included:
+      return True, True
+
+    traversed = any(
+      rule_included and _match_path(pattern_parts, path, prefix=True, fields=fields)
+      for pattern_parts, rule_included in self._rules[last_matching_rule_index + 1:])
+
+    return False, traversed
+
+
+# Key of `_FieldMask` fields standing for any entry of a list.
+_LIST_ENTRY = object()
+_FILTER_PARAMETERS_FIELD = 'parameters'
+
+
+def _match_path(pattern_parts, path, prefix=False, fields=None):
+  """Returns ``True`` if ``path`` matches the pattern components.
+
+  If ``prefix`` is ``True``, ``True`` is also returned if a descendant of
+  ``path`` may match the pattern. ``fields`` describes the possible
+  descendants (see `_FieldMask.check()`).
+  """
+  if not pattern_parts:
+    return not path
+
+  if not path:
+    if prefix:
+      return fields is None or _match_fields(pattern_parts, fields, set())
     else:
-      element = ET.SubElement(parent, key)
-      element.text = str(value) if value is not None else ''
-      
-      if not is_last:
-        element.tail = '\n' + ' ' * depth * _INDENT
-      else:
-        element.tail = '\n' + ' ' * (depth - 1) * _INDENT
+      return all(part == '**' for part in pattern_parts)
 
-  filepath = file.get_path() if file.get_path() is not None else ''
+  if pattern_parts[0] == '**':
+    if _match_path(pattern_parts[1:], path, prefix, fields):
+      return True
 
-  tree = ET.ElementTree(root)
-  tree.write(filepath, encoding=_TEXT_ENCODING, method='html')
+    if path[0] == _FILTER_PARAMETERS_FIELD:
+      # ``**`` may match filter parameters, but nothing below them.
+      return len(path) == 1 and all(part == '**' for part in pattern_parts)
 
+    return _match_path(pattern_parts, path[1:], prefix, fields)
 
-def file_json_export(_proc, _run_mode, image, file, _options, _metadata, _config, _data):
-  attributes = _get_image_attributes(image)
+  return (
+    fnmatch.fnmatchcase(path[0], pattern_parts[0])
+    and _match_path(pattern_parts[1:], path[1:], prefix, fields))
 
-  filepath = file.get_path() if file.get_path() is not None else ''
 
-  with open(filepath, 'w', encoding=_TEXT_ENCODING) as f:
-    json.dump(attributes, f, indent=_INDENT, separators=(',', ': '))
+def _match_fields(pattern_parts, fields, visited):
+  """Returns ``True`` if the pattern components match a path to any of the
+  descendants described by ``fields`` (see `_FieldMask.check()`).
 
+  ``visited`` holds the combinations of remaining pattern components and
+  ``fields`` already checked, as ``fields`` may be recursive (e.g. children of
+  group layers).
+  """
+  if not pattern_parts or fields is None:
+    return True
 
-def file_yaml_export(_proc, _run_mode, image, file, _options, _metadata, _config, _data):
-  list_item_str = '- '
-  
-  attributes = _get_image_attributes(image)
-  data = ''
-  
-  elements = [[key, value, 0] for key, value in attributes['image'].items()]
-  
-  while elements:
-    key, value, depth = elements.pop(0)
-    
-    if isinstance(value, (tuple, list, dict)):
-      indent = ' ' * depth * _INDENT
-      
-      if key is not None:
-        text = indent + '{}:'.format(key)
-        
-        if len(value) < 1:
-          if isinstance(value, dict):
-            text += ' {}'
-          else:
-            text += ' []'
-        
-        text += '\n'
-        
-        data += text
-      else:
-        data += indent + '{}item:\n'.format(list_item_str)
-      
-      if isinstance(value, dict):
-        for child_key, child_value in reversed(value.items()):
-          elements.insert(0, [child_key, child_value, depth + 1])
-      else:
-        for child_value in reversed(value):
-          elements.insert(0, [None, child_value, depth])
+  state = (len(pattern_parts), id(fields))
+  if state in visited:
+    return False
+  visited.add(state)
+
+  if pattern_parts[0] == '**':
+    return (
+      _match_fields(pattern_parts[1:], fields, visited)
+      or any(
+        _match_fields(pattern_parts, child_fields, visited)
+        if name != _FILTER_PARAMETERS_FIELD
+        else all(part == '**' for part in pattern_parts)
+        for name, child_fields in fields.items()))
+
+  return any(
+    _match_field_name(pattern_parts[0], name)
+    and _match_fields(pattern_parts[1:], child_fields, visited)
+    for name, child_fields in fields.items())
+
+
+def _match_field_name(pattern_part, name):
+  if name is _LIST_ENTRY:
+    # Any index may match a pattern containing wildcards.
+    return pattern_part.isdigit() or any(char in pattern_part for char in '*?[')
+  else:
+    return fnmatch.fnmatchcase(name, pattern_part)
+
+
+class _ItemFilter:
+  """Options limiting which layers, channels and paths are traversed.
+
+  Items not matching any of the predicates (``visible_only``, ``color_tags``,
+  ``name_pattern``) are skipped along with their children. ``color_tags`` and
+  ``name_pattern`` do not apply to children of matching items, i.e. all
+  children of a matching group layer are traversed regardless of their color
+  tags and names (but still subject to ``visible_only``). Children of group
+  layers deeper than ``max_depth`` (top-level items having depth 0) are not
+  traversed. A negative ``max_depth`` means no limit. If ``root_layer`` is not
+  ``None``, only ``root_layer`` and its children are traversed instead of all
+  layers in the image.
+  """
+
+  def __init__(
+        self,
+        max_depth: int = -1,
+        root_layer: Optional[Gimp.Layer] = None,
+        visible_only: bool = False,
+        color_tags: Optional[Iterable[str]] = None,
+        name_pattern: Optional[str] = None,
+  ):
+    self.max_depth = max_depth
+    self.root_layer = root_layer
+    self.visible_only = visible_only
+    self.color_tags = frozenset(color_tags) if color_tags else None
+    self.name_pattern = name_pattern if name_pattern else None
+
+    self.has_predicates = (
+      self.visible_only or self.color_tags is not None or self.name_pattern is not None)
+
+    if self.color_tags is None and self.name_pattern is None:
+      self.children_filter = self
     else:
-      if isinstance(value, bool):
-        text = 'true' if value else 'false'
-      else:
-        if value is not None:
-          text = str(value)
-          
-          if not isinstance(value, (int, float)):
-            text = "'" + text + "'"
-        else:
-          text = 'null'
-      
-      indent = ' ' * depth * _INDENT
-      
-      if key is not None:
-        text = indent + '{}: {}\n'.format(key, text)
-      else:
-        text = indent + '{}{}\n'.format(list_item_str, text)
-      
-      data += text
-
-  filepath = file.get_path() if file.get_path() is not None else ''
-
-  with open(filepath, 'w', encoding=_TEXT_ENCODING) as f:
-    f.write(data)
-
-
-def _get_image_attributes(image: Gimp.Image):
-  attributes = {}
-  
-  attributes['image'] = {}
-  attributes['image']['name'] = image.get_name()
-  attributes['image']['width'] = image.get_width()
-  attributes['image']['height'] = image.get_height()
-  attributes['image']['base_type'] = image.get_base_type().name
-  attributes['image']['precision'] = image.get_precision().name
-  attributes['image']['resolution'] = list(image.get_resolution()[1:])
-  attributes['image']['unit'] = image.get_unit().get_name()
-  
-  if image.get_palette() is not None:
-    attributes['image']['colormap'] = image.get_palette().get_colormap(Babl.format('RGB u8'))
-  
-  attributes['image']['selected_channels'] = _get_item_names(image.get_selected_channels())
-  attributes['image']['selected_drawables'] = _get_item_names(image.get_selected_drawables())
-  attributes['image']['selected_layers'] = _get_item_names(image.get_selected_layers())
-  attributes['image']['selected_paths'] = _get_item_names(image.get_selected_paths())
-  
-  _fill_attributes_from_items(attributes, image, 'layers', lambda image_: image_.get_layers())
-  _fill_attributes_from_items(attributes, image, 'channels', lambda image_: image_.get_channels())
-  _fill_attributes_from_items(attributes, image, 'paths', lambda image_: image_.get_paths())
-  
-  return attributes
-
-
-def _fill_attributes_from_items(attributes, image, item_type, get_items_func):
-  attributes['image'][item_type] = []
-  items_and_item_attributes = []
-  
-  for item in get_items_func(image):
-    item_attributes = {}
-    attributes['image'][item_type].append(item_attributes)
-    items_and_item_attributes.append((item, item_attributes))
-  
-  while items_and_item_attributes:
-    item, item_attributes = items_and_item_attributes.pop(0)
-    
-    item_attributes.update(_get_item_attributes(item, item_attributes))
-    
-    if item.is_group():
-      item_attributes['children'] = []
-      
-      for item in item.get_children():
-        child_attributes = {}
-        item_attributes['children'].append(child_attributes)
-        items_and_item_attributes.append((item, child_attributes))
-
-
-def _get_item_attributes(item, attributes_dict=None):
-  if attributes_dict is None:
-    attributes_dict = {}
-
-  attributes_dict['color_tag'] = item.get_color_tag().name
-  attributes_dict['expanded'] = item.get_expanded()
-  attributes_dict['is_group'] = item.is_group()
-  attributes_dict['lock_content'] = item.get_lock_content()
-  attributes_dict['lock_position'] = item.get_lock_position()
-  attributes_dict['lock_visibility'] = item.get_lock_visibility()
-  attributes_dict['name'] = item.get_name()
-  attributes_dict['visible'] = item.get_visible()
-  attributes_dict['type'] = type(item).__qualname__
+      self.children_filter = _ItemFilter(
+        max_depth=self.max_depth, root_layer=self.root_layer, visible_only=self.visible_only)
+
+  def matches(self, item):
+    if self.visible_only and not item.get_visible():
+      return False
+
+    if self.color_tags is not None and item.get_color_tag().name not in self.color_tags:
+      return False
+
+    if self.name_pattern is not None and not fnmatch.fnmatchcase(item.get_name(), self.name_pattern):
+      return False
+
+    return True
+
+  def traverses_children(self, depth):
+    return self.max_depth < 0 or depth < self.max_depth
+
+
+class _FormatOptions:
+  """Options affecting how attribute values are written, independent of
+  which attributes are exported.
+
+  If ``stroke_points_encoding`` is not ``'list'``, arrays of floats (stroke
+  points) are written as a single Base64-encoded string of little-endian
+  float64 (``'base64-float64'``) or float32 (``'base64-float32'``) values
+  instead of a list of numbers.
+
+  ``float_precision`` maps classes of float attributes (see
+  `_FLOAT_PRECISION_CLASSES`) to the number of significant digits floats are
+  rounded to when written as text. Classes not present are written with full
+  precision. ``float_formatters`` maps attribute names to the functions
+  formatting their floats (including floats in lists nested under them), with
+  ``default_float_formatter`` used for all other attributes.
+
+  ``compression_level`` applies to output files with a compressed file
+  extension. -1 means the default level of the compression method.
+  """
+
+  def __init__(self, stroke_points_encoding='list', float_precision=None, compression_level=-1):
+    if stroke_points_encoding not in _STROKE_POINTS_ENCODINGS:
+      raise ValueError(
+        (f'invalid stroke points encoding "{stroke_points_encoding}",'
+         f' must be one of: {", ".join(_STROKE_POINTS_ENCODINGS)}'))
+
+    self.stroke_points_encoding = stroke_points_encoding
+    self.packed_float_typecode = _STROKE_POINTS_ENCODINGS[stroke_points_encoding]
+
+    self.float_precision = dict(float_precision) if float_precision is not None else {}
+    self.rounds_floats = bool(self.float_precision)
+
+    self.float_formatters = {
+      field_name: _get_float_formatter(self.float_precision.get(precision_class))
+      for field_name, precision_class in _FLOAT_PRECISION_CLASSES_PER_FIELD.items()}
+    self.default_float_formatter = _get_float_formatter(self.float_precision.get('other'))
+
+    self.compression_level = compression_level
+
+  @staticmethod
+  def parse_float_precision(precision_str: str):
+    """Returns a dictionary of float precision classes and significant digits
+    from a comma-separated list of ``class=digits`` pairs, e.g.
+    ``coordinates=6,opacity=3``.
+    """
+    float_precision = {}
+
+    for pair_str in precision_str.split(','):
+      pair_str = pair_str.strip()
+      if not pair_str:
+        continue
+
+      precision_class, _separator, digits_str = pair_str.partition('=')
+      precision_class = precision_class.strip()
+
+      if precision_class not in _FLOAT_PRECISION_CLASSES:
+        raise ValueError(
+          (f'invalid float precision class "{precision_class}",'
+           f' must be one of: {", ".join(_FLOAT_PRECISION_CLASSES)}'))
+
+      try:
+        digits = int(digits_str)
+      except ValueError:
+        digits = 0
+
+      if not 1 <= digits <= 17:
+        raise ValueError(
+          f'invalid number of significant digits "{digits_str.strip()}" for "{precision_class}",'
+          ' must be between 1 and 17')
+
+      float_precision[precision_class] = digits
+
+    return float_precision
+
+
+_ALL_FIELDS = _FieldMask()
+_ALL_ITEMS = _ItemFilter()
+_DEFAULT_FORMAT_OPTIONS = _FormatOptions()
+
+
+def _get_export_options(image, config):
+  """Returns a `_FieldMask`, an `_ItemFilter` and a `_FormatOptions` instance
+  created from the procedure arguments in ``config``.
+
+  `ValueError` is raised if any of the arguments are not valid.
+  """
+  field_mask = _FieldMask.from_string(config.get_property('field-mask'))
+
+  root_layer_path = config.get_property('root-layer-path')
+  if root_layer_path:
+    root_layer = _find_layer_by_path(image, root_layer_path)
+    if root_layer is None:
+      raise ValueError(f'layer "{root_layer_path}" not found')
+  else:
+    root_layer = None
+
+  color_tags = [
+    color_tag.strip().upper() for color_tag in config.get_property('color-tags').split(',')
+    if color_tag.strip()]
+  for color_tag in color_tags:
+    if not isinstance(getattr(Gimp.ColorTag, color_tag, None), Gimp.ColorTag):
+      raise ValueError(f'invalid color tag "{color_tag}"')
+
+  item_filter = _ItemFilter(
+    max_depth=config.get_property('max-depth'),
+    root_layer=root_layer,
+    visible_only=config.get_property('visible-only'),
+    color_tags=color_tags,
+    name_pattern=config.get_property('name-pattern'),
+  )
+
+  format_options = _FormatOptions(
+    stroke_points_encoding=config.get_property('stroke-points-encoding'),
+    float_precision=_FormatOptions.parse_float_precision(config.get_property('float-precision')),
+    compression_level=config.get_property('compression-level'),
+  )
+
+  return field_mask, item_filter, format_options
+
+
+def _find_layer_by_path(image, layer_path):
+  """Returns the layer whose names of itself and its parent group layers,
+  separated by ``/``, match ``layer_path``, or ``None`` if there is no such
+  layer.
+  """
+  layers = image.get_layers()
+  layer = None
+
+  for name in layer_path.strip('/').split('/'):
+    layer = next((layer_ for layer_ in layers if layer_.get_name() == name), None)
+    if layer is None:
+      return None
+
+    layers = layer.get_children() if layer.is_group() else []
+
+  return layer
+
+
+def _get_image_attributes(
+      image: Gimp.Image,
+      field_mask: _FieldMask = _ALL_FIELDS,
+      item_filter: _ItemFilter = _ALL_ITEMS,
+      item_cache: Optional['_ItemCache'] = None,
+):
+  """Returns a lazy view of image attributes, including the attributes of all
+  layers, channels and paths in the image.
+
+  Nested attributes are represented as `_LazyAttributes` instances and lists of
+  items, filters and strokes as generators. Attributes are hence fetched only
+  as the returned view is traversed by a serializer. Strokes and filter
+  parameters are yielded as `_AttributeRecord` instances. Use
+  `_LazyAttributes.to_dict()` to obtain the attributes as dictionaries.
+
+  Attributes excluded by ``field_mask`` are omitted without calling GIMP to
+  obtain them. Items pruned by ``item_filter`` are not visited at all.
+
+  If ``item_cache`` is not ``None``, attributes of each item except for its
+  children are replaced with the item tattoo, and the attributes are stored in
+  ``item_cache`` (if not taken from the previous export). Use
+  `_build_cached_attributes()` to obtain the full attributes.
+
+  If ``item_cache`` is not ``None`` or ``item_filter`` has predicates, i.e.
+  when the same facts are needed repeatedly, calls to GIMP are memoized via
+  `_ItemProxies` so that each fact is obtained at most once per item. Memoized
+  results of an item are discarded once all of its attributes (including
+  children) are obtained.
+  """
+  item_proxies = _ItemProxies(enabled=item_cache is not None or item_filter.has_predicates)
+
+  return {
+    'image': _LazyAttributes(
+      _iter_image_attributes,
+      item_proxies.get(image), field_mask, (), True, item_filter, item_cache, item_proxies)}
+
+
+def _get_colormap(image):
+  palette = image.get_palette()
+  if palette is not None:
+    from gi.repository import Babl
+    return palette.get_colormap(Babl.format('RGB u8'))
+  else:
+    return _NO_VALUE
+
+
+_IMAGE_ATTRIBUTES = (
+  ('name', lambda image: image.get_name()),
+  ('width', lambda image: image.get_width()),
+  ('height', lambda image: image.get_height()),
+  ('base_type', lambda image: image.get_base_type().name),
+  ('precision', lambda image: image.get_precision().name),
+  ('resolution', lambda image: list(image.get_resolution()[1:])),
+  ('unit', lambda image: image.get_unit().get_name()),
+  ('colormap', _get_colormap),
+  ('selected_channels', lambda image: _get_item_names(image.get_selected_channels())),
+  ('selected_drawables', lambda image: _get_item_names(image.get_selected_drawables())),
+  ('selected_layers', lambda image: _get_item_names(image.get_selected_layers())),
+  ('selected_paths', lambda image: _get_item_names(image.get_selected_paths())),
+)
+
+_ITEM_ATTRIBUTES = (
+  ('color_tag', lambda item: item.get_color_tag().name),
+  ('expanded', lambda item: item.get_expanded()),
+  ('is_group', lambda item: item.is_group()),
+  ('lock_content', lambda item: item.get_lock_content()),
+  ('lock_position', lambda item: item.get_lock_position()),
+  ('lock_visibility', lambda item: item.get_lock_visibility()),
+  ('name', lambda item: item.get_name()),
+  ('visible', lambda item: item.get_visible()),
+  ('type', lambda item: item.__class__.__qualname__),
+)
+
+_DRAWABLE_ATTRIBUTES = (
+  ('bpp', lambda item: item.get_bpp()),
+  ('width', lambda item: item.get_width()),
+  ('height', lambda item: item.get_height()),
+  ('offsets', lambda item: list(item.get_offsets()[1:])),
+  ('has_alpha', lambda item: item.has_alpha()),
+  ('image_type', lambda item: item.type().name),
+)
+
+_LAYER_ATTRIBUTES = (
+  ('apply_mask', lambda item: item.get_apply_mask()),
+  ('blend_space', lambda item: item.get_blend_space().name),
+  ('composite_mode', lambda item: item.get_composite_mode().name),
+  ('composite_space', lambda item: item.get_composite_space().name),
+  ('edit_mask', lambda item: item.get_edit_mask()),
+  ('is_floating_sel', lambda item: item.is_floating_sel()),
+  ('lock_alpha', lambda item: item.get_lock_alpha()),
+  ('mode', lambda item: item.get_mode().name),
+  ('opacity', lambda item: item.get_opacity()),
+  ('show_mask', lambda item: item.get_show_mask()),
+)
+
+_CHANNEL_ATTRIBUTES = (
+  ('color_rgba', lambda item: list(item.get_color().get_rgba())),
+  ('opacity', lambda item: item.get_opacity()),
+  ('show_masked', lambda item: item.get_show_masked()),
+)
+
+_FILTER_ATTRIBUTES = (
+  ('blend_mode', lambda drawable_filter: drawable_filter.get_blend_mode().name),
+  ('name', lambda drawable_filter: drawable_filter.get_name()),
+  ('opacity', lambda drawable_filter: drawable_filter.get_opacity()),
+  ('operation_name', lambda drawable_filter: drawable_filter.get_operation_name()),
+  ('visible', lambda drawable_filter: drawable_filter.get_visible()),
+)
+
+
+def _iter_attributes(obj, getters, field_mask, path, included, obj_name=None):
+  """Yields ``(name, value)`` pairs for each of the ``getters`` not excluded by
+  ``field_mask``.
+
+  ``getters`` is a sequence of ``(name, getter)`` pairs, where ``getter`` takes
+  ``obj`` and returns the attribute value, or `_NO_VALUE` if the attribute
+  should be omitted.
+
+  If profiling is active, calls to getters are recorded as
+  ``<obj_name>.<name>``. ``obj_name`` defaults to the name of the type of
+  ``obj``.
+  """
+  profile = profiling.get_active()
+  if profile is not None:
+    obj_name = obj_name if obj_name is not None else obj.__class__.__name__
+    getters = [
+      (name, functools.partial(profile.call, f'{obj_name}.{name}', getter))
+      for name, getter in getters]
+
+  for name, getter in getters:
+    if field_mask.check(path + (name,), included)[0]:
+      value = getter(obj)
+      if value is not _NO_VALUE:
+        yield name, value
+
+
+def _iter_image_attributes(
+      image, field_mask, path, included, item_filter, item_cache, item_proxies):
+  yield from _iter_attributes(image, _IMAGE_ATTRIBUTES, field_mask, path, included)
+
+  if item_filter.root_layer is not None:
+    get_layers_func = lambda: [item_proxies.get(item_filter.root_layer)]
+  else:
+    get_layers_func = image.get_layers
+
+  for name, get_items_func, item_fields in [
+        ('layers', get_layers_func, _LAYER_FIELDS),
+        ('channels', image.get_channels, _CHANNEL_FIELDS),
+        ('paths', image.get_paths, _PATH_FIELDS),
+  ]:
+    items_path = path + (name,)
+    items_included, items_traversed = field_mask.check(
+      items_path, included, {_LIST_ENTRY: item_fields})
+    if items_traversed:
+      items = _omit_if_empty(
+        _iter_items_attributes(
+          get_items_func, f'Image.get_{name}', item_fields,
+          field_mask, items_path, items_included, item_filter, 0, item_cache, item_proxies),
+        items_included)
+      if items is not _NO_VALUE:
+        yield name, items
+
+  profile = profiling.get_active()
+  if profile is not None and item_proxies.enabled:
+    profile.count('memoized call hits', item_proxies.hits)
+    profile.count('memoized call misses', item_proxies.misses)
+
+
+def _iter_items_attributes(
+      get_items_func, get_items_func_name, item_fields, field_mask, path, included, item_filter,
+      depth, item_cache, item_proxies):
+  for index, item in enumerate(_profiled_call(get_items_func_name, get_items_func)):
+    if not item_filter.matches(item):
+      continue
+
+    item_path = path + (str(index),)
+    item_included, item_traversed = field_mask.check(item_path, included, item_fields)
+    if item_traversed:
+      item_attributes = _omit_if_empty(
+        _LazyAttributes(
+          _iter_item_attributes,
+          item, field_mask, item_path, item_included, item_filter, depth, item_cache,
+          item_proxies),
+        item_included)
+      if item_attributes is not _NO_VALUE:
+        yield item_attributes
+
+
+def _iter_item_attributes(
+      item, field_mask, path, included, item_filter, depth, item_cache, item_proxies):
+  profile = profiling.get_active()
+  if profile is not None:
+    profile.count('items')
+
+  if item_cache is not None:
+    tattoo = item_cache.add_item(item, field_mask, path, included)
+    # Excluded items are written only if any of their descendants is included.
+    if included or not item_cache.items[tattoo].is_empty():
+      yield _CACHE_ITEM_KEY, tattoo
+  else:
+    yield from _iter_item_own_attributes(item, field_mask, path, included)
+
+  if item_filter.traverses_children(depth):
+    children_path = path + ('children',)
+    children_included, children_traversed = field_mask.check(
+      children_path, included, _LAYER_FIELDS['children'])
+    if children_traversed and item.is_group():
+      children = _omit_if_empty(
+        _iter_items_attributes(
+          item.get_children, 'GroupLayer.get_children', _LAYER_FIELDS,
+          field_mask, children_path, children_included, item_filter.children_filter, depth + 1,
+          item_cache, item_proxies),
+        children_included)
+      if children is not _NO_VALUE:
+        yield 'children', children
+
+  item_proxies.release(item)
+
+
+def _iter_item_own_attributes(item, field_mask, path, included):
+  """Yields attributes of ``item`` except for its children."""
+  yield from _iter_attributes(item, _ITEM_ATTRIBUTES, field_mask, path, included)
 
   if isinstance(item, Gimp.Drawable):
-    attributes_dict['bpp'] = item.get_bpp()
-    attributes_dict['width'] = item.get_width()
-    attributes_dict['height'] = item.get_height()
-    attributes_dict['offsets'] = list(item.get_offsets()[1:])
-    attributes_dict['has_alpha'] = item.has_alpha()
-    attributes_dict['image_type'] = item.type().name
-
-    attributes_dict['filters'] = []
-    for drawable_filter in item.get_filters():
-      attributes_dict['filters'].append({
-        'blend_mode': drawable_filter.get_blend_mode().name,
-        'name': drawable_filter.get_name(),
-        'opacity': drawable_filter.get_opacity(),
-        'operation_name': drawable_filter.get_operation_name(),
-        'visible': drawable_filter.get_visible(),
-        'parameters': {
-          prop.name: _process_config_property(drawable_filter.get_config().get_property(prop.name))
-          for prop in drawable_filter.get_config().list_properties()
-        },
-      })
+    yield from _iter_attributes(item, _DRAWABLE_ATTRIBUTES, field_mask, path, included)
+
+    filters_path = path + ('filters',)
+    filters_included, filters_traversed = field_mask.check(
+      filters_path, included, _DRAWABLE_FIELDS['filters'])
+    if filters_traversed:
+      filters = _omit_if_empty(
+        _iter_filters_attributes(item, field_mask, filters_path, filters_included),
+        filters_included)
+      if filters is not _NO_VALUE:
+        yield 'filters', filters
 
   if isinstance(item, Gimp.Layer):
-    attributes_dict['apply_mask'] = item.get_apply_mask()
-    attributes_dict['blend_space'] = item.get_blend_space().name
-    attributes_dict['composite_mode'] = item.get_composite_mode().name
-    attributes_dict['composite_space'] = item.get_composite_space().name
-    attributes_dict['edit_mask'] = item.get_edit_mask()
-    attributes_dict['is_floating_sel'] = item.is_floating_sel()
-    attributes_dict['lock_alpha'] = item.get_lock_alpha()
-    attributes_dict['mode'] = item.get_mode().name
-    attributes_dict['opacity'] = item.get_opacity()
-    attributes_dict['show_mask'] = item.get_show_mask()
-
-    if item.get_mask() is not None:
-      attributes_dict['mask'] = _get_item_attributes(item.get_mask())
+    yield from _iter_attributes(item, _LAYER_ATTRIBUTES, field_mask, path, included)
+
+    mask_path = path + ('mask',)
+    mask_included, mask_traversed = field_mask.check(mask_path, included, _CHANNEL_FIELDS)
+    if mask_traversed:
+      mask = _profiled_call('Layer.get_mask', item.get_mask)
+      if mask is not None:
+        mask_attributes = _omit_if_empty(
+          _LazyAttributes(_iter_item_own_attributes, mask, field_mask, mask_path, mask_included),
+          mask_included)
+        if mask_attributes is not _NO_VALUE:
+          yield 'mask', mask_attributes
 
   if isinstance(item, Gimp.Channel):
-    attributes_dict['color_rgba'] = list(item.get_color().get_rgba())
-    attributes_dict['opacity'] = item.get_opacity()
-    attributes_dict['show_masked'] = item.get_show_masked()
+    yield from _iter_attributes(item, _CHANNEL_ATTRIBUTES, field_mask, path, included)
 
   if isinstance(item, Gimp.Path):
-    attributes_dict['strokes'] = []
+    strokes_path = path + ('strokes',)
+    strokes_included, strokes_traversed = field_mask.check(
+      strokes_path, included, _PATH_FIELDS['strokes'])
+    if strokes_traversed:
+      strokes = _omit_if_empty(
+        _iter_strokes_attributes(item, field_mask, strokes_path, strokes_included),
+        strokes_included)
+      if strokes is not _NO_VALUE:
+        yield 'strokes', strokes
+
+
+def _iter_filters_attributes(drawable, field_mask, path, included):
+  for index, drawable_filter in enumerate(_profiled_call('Drawable.get_filters', drawable.get_filters)):
+    filter_path = path + (str(index),)
+    filter_included, filter_traversed = field_mask.check(filter_path, included, _FILTER_FIELDS)
+    if filter_traversed:
+      filter_attributes = _omit_if_empty(
+        _LazyAttributes(
+          _iter_filter_attributes, drawable_filter, field_mask, filter_path, filter_included),
+        filter_included)
+      if filter_attributes is not _NO_VALUE:
+        yield filter_attributes
+
+
+def _iter_filter_attributes(drawable_filter, field_mask, path, included):
+  profile = profiling.get_active()
+  if profile is not None:
+    profile.count('filters')
+
+  yield from _iter_attributes(drawable_filter, _FILTER_ATTRIBUTES, field_mask, path, included)
+
+  parameters_path = path + (_FILTER_PARAMETERS_FIELD,)
+  parameters_included, parameters_traversed = field_mask.check(parameters_path, included)
+  if parameters_traversed:
+    # Filter configs are GEGL operation properties, the only attributes
+    # requiring GEGL to be initialized.
+    procedure.init_gegl()
+
+    config = _profiled_call('DrawableFilter.get_config', drawable_filter.get_config)
+
+    parameters = _profiled_call(
+      'DrawableFilter.parameters',
+      _get_filter_parameters,
+      drawable_filter, config, field_mask, parameters_path, parameters_included)
+    if parameters_included or parameters:
+      yield 'parameters', parameters
+
+
+def _get_filter_parameters(drawable_filter, config, field_mask, path, included):
+  all_prop_names = _get_filter_property_names(drawable_filter, config)
 
-    stroke_ids = item.get_strokes()
-    for stroke_id in stroke_ids:
-      points = item.stroke_get_points(stroke_id)
-      attributes_dict['strokes'].append({
-        'id': stroke_id,
-        'points_type': points[0].name,
-        'points': points[1],
-        'points_closed': points[2],
-      })
-  
-  return attributes_dict
+  prop_names = tuple(
+    prop_name for prop_name in all_prop_names
+    if field_mask.check(path + (prop_name,), included)[0])
+  if len(prop_names) == len(all_prop_names):
+    # Share the names with all filters of the same operation.
+    prop_names = all_prop_names
+
+  return _AttributeRecord(
+    prop_names,
+    tuple(_process_config_property(config.get_property(prop_name)) for prop_name in prop_names))
+
+
+def _get_filter_property_names(drawable_filter, config):
+  """Returns names of properties of the filter config.
+
+  Property names are cached per GEGL operation for the lifetime of the
+  plug-in, as all filters of the same operation share the same properties.
+  """
+  operation_name = drawable_filter.get_operation_name()
+
+  try:
+    return _FILTER_PROPERTY_NAMES_PER_OPERATION[operation_name]
+  except KeyError:
+    prop_names = tuple(prop.name for prop in config.list_properties())
+    _FILTER_PROPERTY_NAMES_PER_OPERATION[operation_name] = prop_names
+    return prop_names
+
+
+_STROKE_POINTS_ATTRIBUTES = (
+  ('points_type', lambda points: points[0].name),
+  ('points', lambda points: array.array('d', points[1])),
+  ('points_closed', lambda points: points[2]),
+)
+
+
+def _get_fields(*attributes_tables):
+  """Returns `_FieldMask` fields without descendants for the attribute names in
+  ``attributes_tables``.
+  """
+  return {name: {} for attributes in attributes_tables for name, _getter in attributes}
+
+
+# Possible descendants of attributes checked by `_FieldMask`, allowing to skip
+# attributes without any included descendants.
+_STROKE_FIELDS = {'id': {}, **_get_fields(_STROKE_POINTS_ATTRIBUTES)}
+_FILTER_FIELDS = {**_get_fields(_FILTER_ATTRIBUTES), _FILTER_PARAMETERS_FIELD: None}
+_DRAWABLE_FIELDS = {
+  **_get_fields(_ITEM_ATTRIBUTES, _DRAWABLE_ATTRIBUTES), 'filters': {_LIST_ENTRY: _FILTER_FIELDS}}
+_CHANNEL_FIELDS = {**_DRAWABLE_FIELDS, **_get_fields(_CHANNEL_ATTRIBUTES)}
+_LAYER_FIELDS = {**_DRAWABLE_FIELDS, **_get_fields(_LAYER_ATTRIBUTES), 'mask': _CHANNEL_FIELDS}
+_LAYER_FIELDS['children'] = {_LIST_ENTRY: _LAYER_FIELDS}
+_PATH_FIELDS = {**_get_fields(_ITEM_ATTRIBUTES), 'strokes': {_LIST_ENTRY: _STROKE_FIELDS}}
+
+
+def _iter_strokes_attributes(path_item, field_mask, path, included):
+  profile = profiling.get_active()
+  names_cache = {}
+
+  for index, stroke_id in enumerate(_profiled_call('Path.get_strokes', path_item.get_strokes)):
+    stroke_path = path + (str(index),)
+    stroke_included, stroke_traversed = field_mask.check(stroke_path, included, _STROKE_FIELDS)
+    if not stroke_traversed:
+      continue
+
+    if profile is not None:
+      profile.count('strokes')
+
+    stroke_attributes = []
+
+    if field_mask.check(stroke_path + ('id',), stroke_included)[0]:
+      stroke_attributes.append(('id', stroke_id))
+
+    if any(
+          field_mask.check(stroke_path + (name,), stroke_included)[0]
+          for name, _getter in _STROKE_POINTS_ATTRIBUTES):
+      points = _profiled_call('Path.stroke_get_points', path_item.stroke_get_points, stroke_id)
+      stroke_attributes.extend(
+        _iter_attributes(
+          points, _STROKE_POINTS_ATTRIBUTES, field_mask, stroke_path, stroke_included, 'Stroke'))
+
+    yield _AttributeRecord.from_items(stroke_attributes, names_cache)
+
+
+def _omit_if_empty(value, included):
+  """Returns ``value`` (`_LazyAttributes` or an iterator of list entries), or
+  `_NO_VALUE` if ``value`` is empty and not ``included``.
+
+  Attributes excluded by a field mask and traversed only for their descendants
+  are hence omitted rather than written empty if no descendant is present. The
+  first entry of ``value`` is obtained immediately, and the returned value can
+  be iterated over only once.
+  """
+  if included:
+    return value
+
+  if isinstance(value, _LazyAttributes):
+    entries = iter(value.items())
+  else:
+    entries = iter(value)
+
+  first_entry = next(entries, _NO_VALUE)
+  if first_entry is _NO_VALUE:
+    return _NO_VALUE
+
+  entries = itertools.chain((first_entry,), entries)
+
+  if isinstance(value, _LazyAttributes):
+    return _LazyAttributes(iter, entries)
+  else:
+    return entries
+
+
+def _profiled_call(name, func, *args):
+  """Calls ``func`` with ``args``, recording the call under ``name`` if
+  profiling is active.
+  """
+  profile = profiling.get_active()
+  if profile is None:
+    return func(*args)
+  else:
+    return profile.call(name, func, *args)
 
 
 def _get_item_names(items):
@@ -266,18 +3188,214 @@ def _get_item_names(items):
 
 
 def _process_config_property(prop):
-  if isinstance(prop, Gegl.Color):
-    return list(prop.get_rgba())
-  elif isinstance(prop, GObject.GEnum):
-    return prop.name
-  elif isinstance(prop, (str, int, float, bool, type(None))):
-    return prop
+  try:
+    process_func = _CONFIG_PROPERTY_PROCESSORS[type(prop)]
+  except KeyError:
+    process_func = _get_config_property_processor(type(prop))
+    _CONFIG_PROPERTY_PROCESSORS[type(prop)] = process_func
+
+  return process_func(prop)
+
+
+def _get_config_property_processor(prop_type):
+  from gi.repository import Gegl
+
+  if issubclass(prop_type, Gegl.Color):
+    return _process_color_property
+  elif issubclass(prop_type, GObject.GEnum):
+    return _process_enum_property
+  elif issubclass(prop_type, (str, int, float, bool, type(None))):
+    return _process_builtin_property
   else:
-    return str(prop)
+    return str
+
+
+def _process_color_property(prop):
+  return list(prop.get_rgba())
+
+
+def _process_enum_property(prop):
+  return prop.name
+
+
+def _process_builtin_property(prop):
+  return prop
+
+
+_CONFIG_PROPERTY_PROCESSORS = {
+  str: _process_builtin_property,
+  int: _process_builtin_property,
+  float: _process_builtin_property,
+  bool: _process_builtin_property,
+  type(None): _process_builtin_property,
+}
+
+
+_EXPORT_ARGUMENTS = [
+  [
+    'string',
+    'field-mask',
+    'Field mask',
+    ('Comma-separated list of "field=true" or "field=false" rules determining which attributes'
+     ' to export, e.g. "layers.*.filters=false,strokes=false". Fields are dot-separated'
+     ' attribute paths supporting wildcards. Excluded attributes are not obtained from GIMP.'),
+    export_options.DEFAULTS['field-mask'],
+    GObject.ParamFlags.READWRITE,
+  ],
+  [
+    'int',
+    'max-depth',
+    'Maximum depth',
+    'Maximum depth of nested layers to export. 0 exports top-level items only, -1 means no limit.',
+    -1,
+    GLib.MAXINT,
+    export_options.DEFAULTS['max-depth'],
+    GObject.ParamFlags.READWRITE,
+  ],
+  [
+    'string',
+    'root-layer-path',
+    'Root layer path',
+    ('Path to a layer (e.g. "UI/Buttons") whose attributes and children are exported instead'
+     ' of all layers. Components are names of group layers separated by "/".'),
+    export_options.DEFAULTS['root-layer-path'],
+    GObject.ParamFlags.READWRITE,
+  ],
+  [
+    'boolean',
+    'visible-only',
+    'Visible items only',
+    'If checked, hidden items and their children are not exported.',
+    export_options.DEFAULTS['visible-only'],
+    GObject.ParamFlags.READWRITE,
+  ],
+  [
+    'string',
+    'color-tags',
+    'Color tags',
+    ('Comma-separated list of color tags (e.g. "RED,BLUE"). If not empty, only items with one of'
+     ' the color tags and their children are exported.'),
+    export_options.DEFAULTS['color-tags'],
+    GObject.ParamFlags.READWRITE,
+  ],
+  [
+    'string',
+    'name-pattern',
+    'Name pattern',
+    ('If not empty, only items whose name matches this pattern (supporting "*" and "?"'
+     ' wildcards) and their children are exported.'),
+    export_options.DEFAULTS['name-pattern'],
+    GObject.ParamFlags.READWRITE,
+  ],
+  [
+    'string',
+    'stroke-points-encoding',
+    'Stroke points encoding',
+    ('"list" writes path stroke points as a list of numbers. "base64-float64" or "base64-float32"'
+     ' writes them as a Base64-encoded string of little-endian 64-bit or 32-bit floats'
+     ' (CBOR: a typed array of the same floats).'),
+    export_options.DEFAULTS['stroke-points-encoding'],
+    GObject.ParamFlags.READWRITE,
+  ],
+  [
+    'string',
+    'float-precision',
+    'Float precision',
+    ('Comma-separated list of "class=digits" pairs rounding floats written as text to the given'
+     ' number of significant digits, e.g. "coordinates=6,colors=4,opacity=3,other=6".'
+     ' Classes: "coordinates" (stroke points), "colors" (channel colors), "opacity",'
+     ' "other" (all other floats). Empty means full precision.'),
+    export_options.DEFAULTS['float-precision'],
+    GObject.ParamFlags.READWRITE,
+  ],
+  [
+    'int',
+    'compression-level',
+    'Compression level',
+    ('Compression level (0-9) if the output file has a compressed file extension'
+     ' (e.g. ".json.gz", ".yaml.xz", ".xml.bz2"). -1 means the default level.'),
+    -1,
+    9,
+    export_options.DEFAULTS['compression-level'],
+    GObject.ParamFlags.READWRITE,
+  ],
+]
+
+
+_INCREMENTAL_EXPORT_ARGUMENTS = [
+  [
+    'string',
+    'incremental-mode',
+    'Incremental mode',
+    ('If not empty, attributes of items unchanged since the previous export are reused from'
+     ' a cache file saved next to the output file. "full" writes all attributes,'
+     ' "delta" writes only changes as a JSON Patch to a ".patch.json" file next to the output file,'
+     ' "full-and-delta" writes both.'),
+    '',
+    GObject.ParamFlags.READWRITE,
+  ],
+]
+
+_PIPELINE_ARGUMENTS = [
+  [
+    'boolean',
+    'pipelined',
+    'Pipelined',
+    ('If checked, attributes are written to the file in a background thread while the next'
+     ' attributes are obtained from GIMP. This speeds up exporting large images.'),
+    False,
+    GObject.ParamFlags.READWRITE,
+  ],
+]
+
+_PROFILE_ARGUMENTS = [
+  [
+    'boolean',
+    'profile',
+    'Profile',
+    ('If checked, durations of export phases, the number and duration of calls obtaining'
+     ' attributes, the number of visited items and written bytes are saved as JSON to a'
+     ' ".profile.json" file next to the output file.'),
+    False,
+    GObject.ParamFlags.READWRITE,
+  ],
+]
+
+_EXPORT_INDEX_ARGUMENTS = [
+  [
+    'string',
+    'export-index',
+    'Export index file',
+    ('If not empty, path to a file recording exports. If the image file and the export options'
+     ' did not change since a recorded export, the export is skipped and the previous output'
+     ' is reused (hard-linked if saved to a different path).'),
+    '',
+    GObject.ParamFlags.READWRITE,
+  ],
+]
+
+_WRITE_FUNCS = {
+  'xml': _write_xml,
+  'json': _write_json,
+  'yaml': _write_yaml,
+  'cbor': _write_cbor,
+  'ndjson': _write_ndjson,
+  'csv': _write_csv,
+}
+
+
+def _get_extensions(*extensions):
+  """Returns a comma-separated list of ``extensions``, each also combined with
+  each compressed file extension (e.g. ``json,json.gz,json.bz2,json.xz``).
+  """
+  return ','.join(
+    extension + compression_suffix
+    for extension in extensions
+    for compression_suffix in ['', *(f'.{compression}' for compression in _COMPRESSIONS)])
 
 
 def _set_up_xml_format(proc):
-  proc.set_extensions('xml')
+  proc.set_extensions(_get_extensions('xml'))
   proc.set_format_name('XML')
   proc.set_handles_remote(True)
 
@@ -285,6 +3403,10 @@ def _set_up_xml_format(proc):
 procedure.register_procedure(
   file_xml_export,
   procedure_type=Gimp.ExportProcedure,
+  arguments=(
+    _EXPORT_ARGUMENTS + _INCREMENTAL_EXPORT_ARGUMENTS + _EXPORT_INDEX_ARGUMENTS
+    + _PIPELINE_ARGUMENTS + _PROFILE_ARGUMENTS),
+  init_gegl=False,
   additional_init=_set_up_xml_format,
   menu_label='XML',
   documentation=(
@@ -296,7 +3418,7 @@ procedure.register_procedure(
 
 
 def _set_up_json_format(proc):
-  proc.set_extensions('json')
+  proc.set_extensions(_get_extensions('json'))
   proc.set_format_name('JSON')
   proc.set_handles_remote(True)
 
@@ -304,6 +3426,10 @@ def _set_up_json_format(proc):
 procedure.register_procedure(
   file_json_export,
   procedure_type=Gimp.ExportProcedure,
+  arguments=(
+    _EXPORT_ARGUMENTS + _INCREMENTAL_EXPORT_ARGUMENTS + _EXPORT_INDEX_ARGUMENTS
+    + _PIPELINE_ARGUMENTS + _PROFILE_ARGUMENTS),
+  init_gegl=False,
   additional_init=_set_up_json_format,
   menu_label='JSON',
   documentation=(
@@ -315,7 +3441,7 @@ procedure.register_procedure(
 
 
 def _set_up_yaml_format(proc):
-  proc.set_extensions('yaml')
+  proc.set_extensions(_get_extensions('yaml'))
   proc.set_format_name('YAML')
   proc.set_handles_remote(True)
 
@@ -323,6 +3449,10 @@ def _set_up_yaml_format(proc):
 procedure.register_procedure(
   file_yaml_export,
   procedure_type=Gimp.ExportProcedure,
+  arguments=(
+    _EXPORT_ARGUMENTS + _INCREMENTAL_EXPORT_ARGUMENTS + _EXPORT_INDEX_ARGUMENTS
+    + _PIPELINE_ARGUMENTS + _PROFILE_ARGUMENTS),
+  init_gegl=False,
   additional_init=_set_up_yaml_format,
   menu_label='YAML',
   documentation=(
@@ -333,4 +3463,193 @@ procedure.register_procedure(
 )
 
 
+def _set_up_cbor_format(proc):
+  proc.set_extensions(_get_extensions('cbor'))
+  proc.set_mime_types('application/cbor')
+  proc.set_format_name('CBOR')
+  proc.set_handles_remote(True)
+
+
+procedure.register_procedure(
+  file_cbor_export,
+  procedure_type=Gimp.ExportProcedure,
+  arguments=(
+    _EXPORT_ARGUMENTS + _INCREMENTAL_EXPORT_ARGUMENTS + _EXPORT_INDEX_ARGUMENTS
+    + _PIPELINE_ARGUMENTS + _PROFILE_ARGUMENTS),
+  init_gegl=False,
+  additional_init=_set_up_cbor_format,
+  menu_label='CBOR',
+  documentation=(
+    'Exports image attributes as CBOR (.cbor)',
+    ('Exports image attributes as CBOR (.cbor), a compact binary format (RFC 8949).'
+     ' Path stroke points are stored as little-endian float64 typed arrays (RFC 8746, tag 86),'
+     ' or float32 typed arrays (tag 85) if "stroke-points-encoding" is "base64-float32".'),
+  ),
+  attribution=('Kamil Burda', '', '2025'),
+)
+
+
+def _set_up_ndjson_format(proc):
+  proc.set_extensions(_get_extensions('ndjson', 'jsonl'))
+  proc.set_format_name('NDJSON')
+  proc.set_handles_remote(True)
+
+
+procedure.register_procedure(
+  file_ndjson_export,
+  procedure_type=Gimp.ExportProcedure,
+  arguments=(
+    _EXPORT_ARGUMENTS + _INCREMENTAL_EXPORT_ARGUMENTS + _EXPORT_INDEX_ARGUMENTS
+    + _PIPELINE_ARGUMENTS + _PROFILE_ARGUMENTS),
+  init_gegl=False,
+  additional_init=_set_up_ndjson_format,
+  menu_label='NDJSON',
+  documentation=(
+    'Exports image attributes as newline-delimited JSON (.ndjson)',
+    ('Exports image attributes as newline-delimited JSON (.ndjson), one line per layer, channel,'
+     ' path, layer mask and filter.'),
+  ),
+  attribution=('Kamil Burda', '', '2025'),
+)
+
+
+def _set_up_csv_format(proc):
+  proc.set_extensions(_get_extensions('csv'))
+  proc.set_mime_types('text/csv')
+  proc.set_format_name('CSV')
+  proc.set_handles_remote(True)
+
+
+procedure.register_procedure(
+  file_csv_export,
+  procedure_type=Gimp.ExportProcedure,
+  arguments=(
+    _EXPORT_ARGUMENTS + _INCREMENTAL_EXPORT_ARGUMENTS + _EXPORT_INDEX_ARGUMENTS
+    + _PIPELINE_ARGUMENTS + _PROFILE_ARGUMENTS),
+  init_gegl=False,
+  additional_init=_set_up_csv_format,
+  menu_label='CSV',
+  documentation=(
+    'Exports image attributes as CSV (.csv)',
+    ('Exports image attributes as CSV (.csv), one row per layer, channel, path, layer mask and'
+     ' filter.'),
+  ),
+  attribution=('Kamil Burda', '', '2025'),
+)
+
+
+procedure.register_procedure(
+  plug_in_image_attribute_export_batch,
+  procedure_type=Gimp.Procedure,
+  arguments=[
+    [
+      'enum',
+      'run-mode',
+      'Run mode',
+      'The run mode',
+      Gimp.RunMode,
+      Gimp.RunMode.NONINTERACTIVE,
+      GObject.ParamFlags.READWRITE,
+    ],
+    [
+      'core_object_array',
+      'images',
+      'Images',
+      'Images to export attributes of. If empty, all opened images are exported.',
+      Gimp.Image,
+      GObject.ParamFlags.READWRITE,
+    ],
+    [
+      'string',
+      'output-directory',
+      'Output directory',
+      'Directory to export image attributes to',
+      '',
+      GObject.ParamFlags.READWRITE,
+    ],
+    [
+      'string',
+      'file-format',
+      'File format',
+      ('File format of the exported attributes - "xml", "json", "yaml", "cbor", "ndjson" or "csv".'
+       ' Multiple comma-separated formats (e.g. "json,csv") export a file per format, obtaining'
+       ' attributes only once for all formats.'),
+      'json',
+      GObject.ParamFlags.READWRITE,
+    ],
+    [
+      'string',
+      'filename-pattern',
+      'Filename pattern',
+      ('Output filename without the file extension. "{name}" is replaced with the image name'
+       ' without the file extension and "{id}" with the image ID. If multiple images would be'
+       ' exported to the same file, "-" and the image ID are appended to the filename.'),
+      '{name}',
+      GObject.ParamFlags.READWRITE,
+    ],
+    [
+      'string',
+      'compression',
+      'Compression',
+      ('If not empty, output files are compressed - "gz", "bz2" or "xz". The compression is'
+       ' appended to the file extension, e.g. "image.json.gz".'),
+      '',
+      GObject.ParamFlags.READWRITE,
+    ],
+    *_EXPORT_ARGUMENTS,
+    *_EXPORT_INDEX_ARGUMENTS,
+    *_PIPELINE_ARGUMENTS,
+    *_PROFILE_ARGUMENTS,
+  ],
+  init_gegl=False,
+  documentation=(
+    'Exports attributes of multiple images',
+    ('Exports attributes of the specified images (or all opened images) to files in the output'
+     ' directory in a single plug-in run.'),
+  ),
+  attribution=('Kamil Burda', '', '2025'),
+)
+
+
+procedure.register_procedure(
+  plug_in_image_attribute_export_resident,
+  procedure_type=Gimp.Procedure,
+  arguments=[
+    [
+      'enum',
+      'run-mode',
+      'Run mode',
+      'The run mode',
+      Gimp.RunMode,
+      Gimp.RunMode.NONINTERACTIVE,
+      GObject.ParamFlags.READWRITE,
+    ],
+    [
+      'int',
+      'max-cache-memory',
+      'Maximum cache memory (MiB)',
+      ('Maximum memory occupied by incremental export caches kept in memory. Least recently used'
+       ' caches are evicted first. 0 disables caching.'),
+      0,
+      GLib.MAXINT,
+      256,
+      GObject.ParamFlags.READWRITE,
+    ],
+  ],
+  init_ui=False,
+  init_gegl=False,
+  pdb_procedure_type=Gimp.PDBProcType.PERSISTENT,
+  documentation=(
+    'Keeps the plug-in running to speed up repeated exports',
+    ('Starts a resident plug-in process installing temporary procedures with the "-resident"'
+     ' suffix (e.g. "file-json-export-resident", "plug-in-image-attribute-export-batch-resident")'
+     ' that behave like the regular export procedures. Calls to the temporary procedures are'
+     ' processed by the resident process without starting a new plug-in process, and caches'
+     ' (e.g. of incremental exports) are kept in memory between exports. The process runs until'
+     ' GIMP quits. Does nothing if the resident process is already running.'),
+  ),
+  attribution=('Kamil Burda', '', '2025'),
+)
+
+
 procedure.main()
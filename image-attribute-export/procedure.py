@@ -5,16 +5,15 @@ from collections.abc import Iterable
 import functools
 import inspect
 import sys
-from typing import Callable, List, Optional, Tuple, Type, Union
+import time
+from typing import Callable, Dict, List, Optional, Tuple, Type, Union
 
 import gi
 
 gi.require_version('Gegl', '0.4')
-from gi.repository import Gegl
 gi.require_version('Gimp', '3.0')
 from gi.repository import Gimp
 gi.require_version('GimpUi', '3.0')
-from gi.repository import GimpUi
 from gi.repository import GLib
 
 
@@ -23,6 +22,20 @@ _USE_LOCALE = False
 _INIT_PROCEDURES_FUNC: Optional[Callable] = None
 _QUIT_FUNC: Optional[Callable] = None
 
+_PLUG_IN_START_TIME = time.perf_counter()
+_PLUG_IN_INITIALIZED = False
+_GEGL_INITIALIZED = False
+_RUN_TIMINGS = {}
+
+# Procedure types whose run function receives the run mode as its second
+# argument.
+_PROCEDURE_TYPES_WITH_RUN_MODE_ARGUMENT = (
+  Gimp.ImageProcedure,
+  Gimp.ExportProcedure,
+  Gimp.LoadProcedure,
+  Gimp.BatchProcedure,
+)
+
 
 def register_procedure(
       procedure: Callable,
@@ -164,6 +177,8 @@ def register_procedure(
     init_gegl:
       If ``True``, GEGL (library providing layer effects) is initialized via
       `Gegl.init`. See `Gegl.init` for more information.
+      If ``False``, you may call `init_gegl` only in runs actually requiring
+      GEGL, which shortens the startup of the remaining runs.
     pdb_procedure_type: One of the values of the `Gimp.PDBProcType` enum.
     additional_init: Function allowing customization of procedure registration.
       The function accepts a single argument - a ``Gimp.Procedure`` instance
@@ -242,6 +257,7 @@ def register_procedure(
   proc_dict['procedure_type'] = procedure_type
   proc_dict['arguments'] = arguments
   proc_dict['return_values'] = return_values
+  proc_dict['parsed_parameters'] = {}
   proc_dict['menu_label'] = menu_label
   proc_dict['menu_path'] = menu_path
   proc_dict['image_types'] = image_types
@@ -336,6 +352,70 @@ def set_quit_func(func: Optional[Callable] = None):
   _QUIT_FUNC = func
 
 
+def get_run_timings() -> Dict[str, float]:
+  """Returns durations (in seconds) of initialization steps performed before
+  running the current procedure.
+
+  The returned dictionary may contain the following entries:
+  * ``'plug-in init'`` - time from loading this module until the first
+    procedure run in the plug-in process, including the registration of
+    procedures.
+  * ``'ui init'`` - duration of `GimpUi.init`.
+  * ``'gegl init'`` - duration of `Gegl.init`, including when called via
+    `init_gegl` during the run.
+  """
+  return dict(_RUN_TIMINGS)
+
+
+def init_gegl():
+  """Initializes GEGL via `Gegl.init` if not initialized yet in the plug-in
+  process.
+
+  Call this function before using GEGL in procedures registered with
+  ``init_gegl=False``.
+  """
+  global _GEGL_INITIALIZED
+
+  if _GEGL_INITIALIZED:
+    return
+
+  start_time = time.perf_counter()
+
+  from gi.repository import Gegl
+  Gegl.init()
+
+  _RUN_TIMINGS['gegl init'] = time.perf_counter() - start_time
+  _GEGL_INITIALIZED = True
+
+
+def install_temp_procedure(
+      plugin_instance: Gimp.PlugIn, proc_name: str, temp_proc_name: str) -> Gimp.Procedure:
+  """Installs a temporary procedure named ``temp_proc_name`` with the
+  function, arguments and other settings of the procedure ``proc_name``
+  registered via `register_procedure`.
+
+  Temporary procedures exist as long as the plug-in process runs. Calls to
+  them are processed by the running process instead of starting a new one,
+  which requires the plug-in to be persistent (see `Gimp.PDBProcType` and
+  `Gimp.PlugIn.persistent_process`).
+
+  Returns the installed procedure.
+  """
+  if proc_name not in _PROCEDURE_NAMES_AND_DATA:
+    raise ValueError(f'procedure "{proc_name}" is not registered')
+
+  temp_procedure = _create_procedure(
+    plugin_instance,
+    temp_proc_name,
+    _PROCEDURE_NAMES_AND_DATA[proc_name],
+    Gimp.PDBProcType.TEMPORARY,
+  )
+
+  plugin_instance.add_temp_procedure(temp_procedure)
+
+  return temp_procedure
+
+
 def main():
   """Initializes and runs the plug-in.
 
@@ -384,6 +464,10 @@ def _do_create_procedure(plugin_instance, proc_name):
   else:
     return None
 
+  return _create_procedure(plugin_instance, proc_name, proc_dict, proc_dict['pdb_procedure_type'])
+
+
+def _create_procedure(plugin_instance, proc_name, proc_dict, pdb_procedure_type):
   if not inspect.isclass(proc_dict['procedure_type']):
     raise TypeError(f"{proc_dict['procedure_type']} is not a valid class type")
 
@@ -398,7 +482,7 @@ def _do_create_procedure(plugin_instance, proc_name):
     procedure = proc_dict['procedure_type'].new(
       plugin_instance,
       proc_name,
-      proc_dict['pdb_procedure_type'],
+      pdb_procedure_type,
       proc_dict['export_metadata'],
       procedure_wrapper,
       proc_dict['run_data'],
@@ -408,7 +492,7 @@ def _do_create_procedure(plugin_instance, proc_name):
       plugin_instance,
       proc_name,
       proc_dict['interpreter_name'],
-      proc_dict['pdb_procedure_type'],
+      pdb_procedure_type,
       procedure_wrapper,
       proc_dict['run_data'],
     )
@@ -416,7 +500,7 @@ def _do_create_procedure(plugin_instance, proc_name):
     procedure = proc_dict['procedure_type'].new(
       plugin_instance,
       proc_name,
-      proc_dict['pdb_procedure_type'],
+      pdb_procedure_type,
       proc_dict['extract_func'],
       proc_dict['extract_data'],
       procedure_wrapper,
@@ -426,31 +510,18 @@ def _do_create_procedure(plugin_instance, proc_name):
     procedure = proc_dict['procedure_type'].new(
       plugin_instance,
       proc_name,
-      proc_dict['pdb_procedure_type'],
+      pdb_procedure_type,
       procedure_wrapper,
       proc_dict['run_data'],
     )
 
-  if proc_dict['arguments'] is not None:
-    parsed_arguments = _parse_and_check_parameters(proc_dict['arguments'])
-
-    for name, params in parsed_arguments.items():
-      param_type = params.pop(0)
-      _get_add_param_func(procedure, param_type, 'argument')(name, *params)
-
-  if proc_dict['return_values'] is not None:
-    parsed_return_values = _parse_and_check_parameters(proc_dict['return_values'])
-
-    for name, params in parsed_return_values.items():
-      param_type = params.pop(0)
-      _get_add_param_func(procedure, param_type, 'return_value')(name, *params)
-
-  if proc_dict['auxiliary_arguments'] is not None:
-    parsed_auxiliary_arguments = _parse_and_check_parameters(proc_dict['auxiliary_arguments'])
-
-    for name, params in parsed_auxiliary_arguments.items():
-      param_type = params.pop(0)
-      _get_add_param_func(procedure, param_type, 'aux_argument')(name, *params)
+  for param_group, key in [
+        ('argument', 'arguments'),
+        ('return_value', 'return_values'),
+        ('aux_argument', 'auxiliary_arguments')]:
+    if proc_dict[key] is not None:
+      for name, (param_type, *params) in _get_parsed_parameters(proc_dict, key).items():
+        _get_add_param_func(procedure, param_type, param_group)(name, *params)
 
   if proc_dict['menu_label'] is not None:
     procedure.set_menu_label(proc_dict['menu_label'])
@@ -488,6 +559,22 @@ def _do_create_procedure(plugin_instance, proc_name):
   return procedure
 
 
+def _get_parsed_parameters(proc_dict, key):
+  """Returns parameters of the procedure parsed via
+  `_parse_and_check_parameters`.
+
+  Parameters are parsed at most once per procedure, so that creating the same
+  procedure again in the plug-in process does not repeat the parsing.
+  """
+  parsed_parameters = proc_dict['parsed_parameters']
+
+  try:
+    return parsed_parameters[key]
+  except KeyError:
+    parsed_parameters[key] = _parse_and_check_parameters(proc_dict[key])
+    return parsed_parameters[key]
+
+
 def _get_add_param_func(procedure, param_type, param_group):
   try:
     return getattr(procedure, f'add_{param_type}_{param_group}')
@@ -495,25 +582,37 @@ def _get_add_param_func(procedure, param_type, param_group):
     raise ValueError(f'type "{param_type}" is not valid')
 
 
-def _get_procedure_wrapper(func, procedure_type, init_ui, init_gegl):
+def _get_procedure_wrapper(func, procedure_type, init_ui, gegl_required):
+  has_run_mode_argument = issubclass(procedure_type, _PROCEDURE_TYPES_WITH_RUN_MODE_ARGUMENT)
+
   @functools.wraps(func)
   def func_wrapper(*procedure_and_args):
+    global _PLUG_IN_INITIALIZED
+
+    start_time = time.perf_counter()
+
+    _RUN_TIMINGS.clear()
+    if not _PLUG_IN_INITIALIZED:
+      _RUN_TIMINGS['plug-in init'] = start_time - _PLUG_IN_START_TIME
+      _PLUG_IN_INITIALIZED = True
+
     procedure = procedure_and_args[0]
     config = procedure_and_args[-2]
 
-    if procedure_type == Gimp.ImageProcedure:
+    if has_run_mode_argument:
       run_mode = procedure_and_args[1]
     else:
-      run_mode = next(
-        (config.get_property(prop.name)
-         for prop in config.list_properties() if prop.name == 'run-mode'),
-        Gimp.RunMode.NONINTERACTIVE)
+      run_mode = getattr(config.props, 'run_mode', Gimp.RunMode.NONINTERACTIVE)
 
     if init_ui and run_mode == Gimp.RunMode.INTERACTIVE:
+      start_time = time.perf_counter()
+      # Importing `GimpUi` also loads GTK, which is only needed in interactive runs.
+      from gi.repository import GimpUi
       GimpUi.init(procedure.get_name())
+      _RUN_TIMINGS['ui init'] = time.perf_counter() - start_time
 
-    if init_gegl:
-      Gegl.init()
+    if gegl_required:
+      init_gegl()
 
     return_values = func(*procedure_and_args)
 
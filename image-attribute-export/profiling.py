@@ -0,0 +1,112 @@
+"""Opt-in profiling of procedure runs.
+
+A profile records wall time per phase, the number and duration of calls made
+to obtain attributes (e.g. ``Layer.opacity`` or ``Drawable.get_filters``) and
+arbitrary counters (e.g. the number of visited items or written bytes).
+
+Profiling is active between calls to `start()` and `stop()`. Instrumented code
+obtains the active profile via `get_active()` and takes no measurements if it
+returns ``None``, so that profiling costs (almost) nothing when not active.
+"""
+
+import contextlib
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+ENVIRONMENT_VARIABLE = 'IMAGE_ATTRIBUTE_EXPORT_PROFILE'
+
+
+class Profile:
+  """Measurements of a single procedure run named ``name``."""
+
+  def __init__(self, name: str):
+    self.name = name
+
+    self.phases = {}
+    self.calls = {}
+    self.counters = {}
+
+  @contextlib.contextmanager
+  def phase(self, name: str):
+    """Adds the wall time spent in the ``with`` block to the phase ``name``."""
+    start_time = time.perf_counter()
+    try:
+      yield
+    finally:
+      self.add_phase_time(name, time.perf_counter() - start_time)
+
+  def add_phase_time(self, name: str, seconds: float):
+    self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+  def call(self, name: str, func: Callable, *args) -> Any:
+    """Calls ``func`` with ``args``, recording the call and its duration under
+    ``name``, and returns the result of ``func``.
+    """
+    start_time = time.perf_counter()
+    try:
+      return func(*args)
+    finally:
+      seconds = time.perf_counter() - start_time
+
+      call_stats = self.calls.get(name)
+      if call_stats is None:
+        call_stats = self.calls[name] = [0, 0.0]
+
+      call_stats[0] += 1
+      call_stats[1] += seconds
+
+  def count(self, name: str, value: int = 1):
+    self.counters[name] = self.counters.get(name, 0) + value
+
+  def get_calls_seconds(self) -> float:
+    """Returns the total duration of all recorded calls."""
+    return sum(seconds for _count, seconds in self.calls.values())
+
+  def to_dict(self) -> Dict[str, Any]:
+    """Returns the profile as a JSON-serializable dictionary.
+
+    Calls are sorted by their total duration, longest first.
+    """
+    return {
+      'name': self.name,
+      'phases': dict(self.phases),
+      'calls': {
+        name: {'count': count, 'seconds': seconds}
+        for name, (count, seconds) in sorted(
+          self.calls.items(), key=lambda item: item[1][1], reverse=True)
+      },
+      'counters': dict(self.counters),
+    }
+
+
+_active_profile: Optional[Profile] = None
+
+
+def is_enabled_by_environment() -> bool:
+  """Returns ``True`` if the `ENVIRONMENT_VARIABLE` environment variable is
+  set to a non-empty value other than ``0``.
+  """
+  return os.environ.get(ENVIRONMENT_VARIABLE, '') not in ['', '0']
+
+
+def start(name: str) -> Profile:
+  """Creates a new profile and makes it active."""
+  global _active_profile
+  _active_profile = Profile(name)
+  return _active_profile
+
+
+def stop() -> Optional[Profile]:
+  """Deactivates and returns the active profile, or returns ``None`` if no
+  profile is active.
+  """
+  global _active_profile
+  profile = _active_profile
+  _active_profile = None
+  return profile
+
+
+def get_active() -> Optional[Profile]:
+  return _active_profile
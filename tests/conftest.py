@@ -0,0 +1,65 @@
+import json
+import os
+import sys
+
+import pytest
+
+
+_ROOT_DIRPATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+sys.path.insert(0, os.path.join(_ROOT_DIRPATH, 'tools'))
+sys.path.insert(0, os.path.join(_ROOT_DIRPATH, 'image-attribute-export'))
+
+# The plug-in is loaded with the stand-ins for GIMP objects from `tools/stand_ins.py`.
+import stand_ins
+
+
+@pytest.fixture(scope='session')
+def plug_in():
+  return stand_ins.load_plug_in()
+
+
+@pytest.fixture
+def export_config(plug_in):
+  """Returns a function creating a config with default export arguments
+  overridden by keyword arguments (with ``_`` replaced by ``-``).
+  """
+  defaults = stand_ins.get_default_arguments(plug_in)
+
+  def _create_config(**arguments):
+    return stand_ins.Config(
+      {**defaults, **{name.replace('_', '-'): value for name, value in arguments.items()}})
+
+  return _create_config
+
+
+@pytest.fixture
+def export_file(plug_in, export_config, tmp_path):
+  """Returns a function exporting an image to ``file_format`` via the export
+  procedure of that format and returning the path to the output file.
+  """
+
+  def _export_file(image, file_format, filename=None, **arguments):
+    filepath = str(tmp_path / (filename if filename is not None else f'image.{file_format}'))
+    export_func = getattr(plug_in, f'file_{file_format}_export')
+    return_values = export_func(
+      None, stand_ins.RunMode.NONINTERACTIVE, image, stand_ins.File(filepath), None, None,
+      export_config(**arguments), None)
+    assert return_values is None, return_values
+
+    return filepath
+
+  return _export_file
+
+
+@pytest.fixture
+def export_json(export_file):
+  """Returns a function exporting an image to JSON and returning the loaded
+  attributes.
+  """
+
+  def _export_json(image, filename='image.json', **arguments):
+    with open(export_file(image, 'json', filename, **arguments), 'r', encoding='utf-8') as f:
+      return json.load(f)
+
+  return _export_json
@@ -0,0 +1,88 @@
+import json
+import sys
+
+import pytest
+
+import stand_ins
+
+
+def test_record_is_read_only_mapping(plug_in):
+  record = plug_in._AttributeRecord(('name', 'opacity'), ('layer', 50.0))
+
+  assert record['opacity'] == 50.0
+  assert 'name' in record
+  assert 'visible' not in record
+  assert list(record) == ['name', 'opacity']
+  assert len(record) == 2
+  assert dict(record) == {'name': 'layer', 'opacity': 50.0}
+  assert record == {'name': 'layer', 'opacity': 50.0}
+  assert record.get('visible', True) is True
+  with pytest.raises(KeyError):
+    record['visible']
+  with pytest.raises(TypeError):
+    record['name'] = 'other'
+  with pytest.raises(AttributeError):
+    record.extra = None
+
+
+def test_records_take_less_memory_than_dicts(plug_in):
+  record = plug_in._AttributeRecord.from_items((f'name {index}', index) for index in range(20))
+
+  assert sys.getsizeof(record) < sys.getsizeof(dict(record))
+
+
+def test_names_are_shared_via_names_cache(plug_in):
+  names_cache = {}
+
+  first_record = plug_in._AttributeRecord.from_items([('name', 'a'), ('id', 1)], names_cache)
+  second_record = plug_in._AttributeRecord.from_items([('name', 'b'), ('id', 2)], names_cache)
+  other_record = plug_in._AttributeRecord.from_items([('id', 3), ('name', 'c')], names_cache)
+
+  assert first_record.keys() is second_record.keys()
+  assert list(other_record.keys()) == ['id', 'name']
+  assert len(names_cache) == 2
+
+
+def test_filter_parameters_of_same_operation_share_names(plug_in):
+  layer = stand_ins.Layer(
+    'layer',
+    filters=[
+      stand_ins.DrawableFilter(f'filter {index}', 'gegl:opacity', {'value': index / 10})
+      for index in range(3)])
+  image = stand_ins.Image('image', layers=[layer])
+
+  attributes = plug_in._get_image_attributes(image)['image'].to_dict()
+  parameters = [
+    plug_in._get_filter_parameters(
+      drawable_filter, drawable_filter.get_config(), plug_in._ALL_FIELDS, (), True)
+    for drawable_filter in layer.get_filters()]
+
+  assert [record['value'] for record in parameters] == [0.0, 0.1, 0.2]
+  assert parameters[0].keys() is parameters[1].keys() is parameters[2].keys()
+  assert attributes['layers'][0]['filters'][2]['parameters'] == {'value': 0.2}
+
+
+def test_cached_attributes_share_names(plug_in, export_config, tmp_path):
+  filepath = str(tmp_path / 'image.json')
+  image = stand_ins.Image('image', layers=[stand_ins.Layer(f'layer {index}') for index in range(3)])
+
+  return_values = plug_in.file_json_export(
+    None, stand_ins.RunMode.NONINTERACTIVE, image, stand_ins.File(filepath), None, None,
+    export_config(incremental_mode='full'), None)
+  assert return_values is None, return_values
+
+  cache_filepath = filepath + plug_in._CACHE_FILE_SUFFIX
+  with open(cache_filepath, 'r', encoding='utf-8') as f:
+    options = json.loads(f.readline())['options']
+
+  cache = plug_in._load_export_cache(cache_filepath, options)
+  names_cache = {}
+  item_attributes = [item.get_attributes(names_cache) for item in cache['items'].values()]
+  layer_attributes = [
+    attributes for attributes in item_attributes
+    if attributes.get('name', '').startswith('layer ')]
+
+  assert len(layer_attributes) == 3
+  assert all(
+    isinstance(attributes, plug_in._AttributeRecord) for attributes in layer_attributes)
+  assert layer_attributes[0].keys() is layer_attributes[1].keys() is layer_attributes[2].keys()
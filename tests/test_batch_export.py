@@ -0,0 +1,62 @@
+import os
+
+import stand_ins
+
+
+def _create_image(filepath):
+  image = stand_ins.Image('image', layers=[stand_ins.Layer(filepath)])
+  image.get_file = lambda: stand_ins.File(filepath)
+  return image
+
+
+def _export_batch(plug_in, export_config, images, output_dirpath, **arguments):
+  config = export_config(**{
+    'images': images,
+    'output_directory': str(output_dirpath),
+    'file_format': 'json',
+    'filename_pattern': '{name}',
+    'compression': '',
+    **arguments,
+  })
+
+  return plug_in.plug_in_image_attribute_export_batch(None, config, None)
+
+
+def test_images_with_same_name_are_exported_to_different_files(
+      plug_in, export_config, tmp_path):
+  images = [_create_image('/first/image.xcf'), _create_image('/second/image.xcf')]
+
+  assert _export_batch(plug_in, export_config, images, tmp_path) is None
+
+  second_filename = f'image-{images[1].get_id()}.json'
+  assert sorted(os.listdir(tmp_path)) == [second_filename, 'image.json']
+  assert '/first/image.xcf' in (tmp_path / 'image.json').read_text()
+  assert '/second/image.xcf' in (tmp_path / second_filename).read_text()
+
+
+def test_unique_output_names_are_kept(plug_in):
+  image = _create_image('/images/image.xcf')
+
+  assert plug_in._get_batch_output_name(image, '{name}') == 'image'
+  assert plug_in._get_batch_output_name(image, '{name}', {'image'}) == f'image-{image.get_id()}'
+  assert (
+    plug_in._get_batch_output_name(image, '{name}', {'image', f'image-{image.get_id()}'})
+    == f'image-{image.get_id()}-2')
+
+
+def test_empty_file_format_is_rejected(plug_in, export_config, tmp_path):
+  images = [_create_image('/images/image.xcf')]
+
+  return_values = _export_batch(plug_in, export_config, images, tmp_path, file_format='json,')
+
+  assert return_values[0] == stand_ins.PDBStatusType.CALLING_ERROR
+  assert not os.listdir(tmp_path)
+
+
+def test_output_directory_that_cannot_be_created_is_reported(plug_in, export_config, tmp_path):
+  (tmp_path / 'file').write_text('')
+  images = [_create_image('/images/image.xcf')]
+
+  return_values = _export_batch(plug_in, export_config, images, tmp_path / 'file' / 'output')
+
+  assert return_values[0] == stand_ins.PDBStatusType.EXECUTION_ERROR
@@ -0,0 +1,82 @@
+import json
+import sys
+
+import pytest
+
+import stand_ins
+import benchmark
+
+
+def _create_small_image():
+  return stand_ins.Image(
+    'small',
+    layers=[stand_ins.Layer(f'Layer {index}') for index in range(10)],
+    paths=[stand_ins.Path('Path', strokes=[[0.0, 1.0, 2.0, 3.0]])])
+
+
+@pytest.fixture
+def run_benchmark(monkeypatch, tmp_path):
+  """Returns a function running the benchmark of a small image and returning
+  the exit code and the saved baselines.
+  """
+  monkeypatch.setitem(benchmark._SCENARIOS, 'small', _create_small_image)
+  baselines_filepath = tmp_path / 'baselines.json'
+
+  def _run_benchmark(*args, baselines=None):
+    if baselines is not None:
+      baselines_filepath.write_text(json.dumps(baselines))
+
+    monkeypatch.setattr(
+      sys, 'argv',
+      ['benchmark.py', '--repeat', '1', '--no-startup', '--scenarios', 'small',
+       '--baselines', str(baselines_filepath), *args])
+
+    exit_code = benchmark.main()
+
+    return exit_code, json.loads(baselines_filepath.read_text())
+
+  return _run_benchmark
+
+
+def test_regressions_exceed_threshold():
+  baseline = {'seconds': 1.0, 'peak_memory_bytes': 1000, 'output_bytes': 10}
+
+  assert benchmark._get_regressions(
+    {'seconds': 1.2, 'peak_memory_bytes': 1250, 'output_bytes': 100}, baseline, 0.25) == []
+  assert benchmark._get_regressions(
+    {'seconds': 1.3, 'peak_memory_bytes': 1000}, baseline, 0.25) == [
+      'seconds 1.3 vs. baseline 1 (+30%)']
+  assert benchmark._get_regressions({'seconds': 100.0}, None, 0.25) == []
+
+
+def test_results_are_saved_as_baselines(run_benchmark):
+  exit_code, baselines = run_benchmark(
+    '--formats', *benchmark._FORMATS, '--save-baselines', baselines={'other': {}})
+
+  assert exit_code == 0
+  assert sorted(baselines) == ['other', 'small']
+  assert sorted(baselines['small']) == sorted(benchmark._FORMATS)
+  for result in baselines['small'].values():
+    assert result['seconds'] > 0
+    assert result['peak_memory_bytes'] > 0
+    assert result['output_bytes'] > 0
+
+
+def test_regression_fails_run(run_benchmark):
+  baselines = {'small': {'json': {'seconds': 1e-9, 'peak_memory_bytes': 1e9}}}
+
+  assert run_benchmark('--formats', 'json', baselines=baselines)[0] == 2
+  assert run_benchmark('--formats', 'json', '--threshold', '1e12', baselines=baselines)[0] == 0
+
+
+def test_edited_image_is_exported_incrementally(plug_in, tmp_path):
+  image = _create_small_image()
+  config = stand_ins.Config(
+    {**stand_ins.get_default_arguments(plug_in), 'incremental-mode': 'delta'})
+
+  result = benchmark._benchmark_export(
+    plug_in, image, config, 'json', str(tmp_path), 2, False, benchmark._edit_first_layer)
+
+  assert (tmp_path / f'small.json{plug_in._PATCH_FILE_SUFFIX}').exists()
+  assert result['output_bytes'] > 0
+  assert 'peak_memory_bytes' not in result
@@ -0,0 +1,112 @@
+import array
+import struct
+import sys
+
+import pytest
+
+import stand_ins
+
+
+def _decode_cbor(data):
+  value, position = _decode_cbor_item(data, 0)
+  assert position == len(data)
+  return value
+
+
+def _decode_cbor_item(data, position):
+  initial_byte = data[position]
+  position += 1
+  major_type, additional_info = initial_byte >> 5, initial_byte & 0x1f
+
+  if major_type == 7:
+    if additional_info == 27:
+      return struct.unpack_from('>d', data, position)[0], position + 8
+    else:
+      return {20: False, 21: True, 22: None}[additional_info], position
+
+  if additional_info == 31:
+    assert major_type in (4, 5)
+    items = []
+    while data[position] != 0xff:
+      item, position = _decode_cbor_item(data, position)
+      items.append(item)
+    position += 1
+    return (dict(zip(items[::2], items[1::2])) if major_type == 5 else items), position
+
+  if additional_info < 24:
+    argument = additional_info
+  else:
+    size = 1 << (additional_info - 24)
+    argument = int.from_bytes(data[position:position + size], 'big')
+    position += size
+
+  if major_type == 0:
+    return argument, position
+  elif major_type == 1:
+    return -1 - argument, position
+  elif major_type == 2:
+    return data[position:position + argument], position + argument
+  elif major_type == 3:
+    return data[position:position + argument].decode('utf-8'), position + argument
+  elif major_type in (4, 5):
+    items = []
+    for _unused in range(argument * (2 if major_type == 5 else 1)):
+      item, position = _decode_cbor_item(data, position)
+      items.append(item)
+    return (dict(zip(items[::2], items[1::2])) if major_type == 5 else items), position
+  elif major_type == 6:
+    tagged_value, position = _decode_cbor_item(data, position)
+    return (argument, tagged_value), position
+
+
+def _decode_float_arrays(value):
+  if isinstance(value, dict):
+    return {key: _decode_float_arrays(item) for key, item in value.items()}
+  elif isinstance(value, list):
+    return [_decode_float_arrays(item) for item in value]
+  elif isinstance(value, tuple):
+    tag, data = value
+    float_array = array.array({85: 'f', 86: 'd'}[tag], data)
+    if sys.byteorder == 'big':
+      float_array.byteswap()
+    return float_array.tolist()
+  else:
+    return value
+
+
+def _create_image():
+  return stand_ins.Image(
+    'image é',
+    layers=[
+      stand_ins.GroupLayer(
+        'group',
+        children=[
+          stand_ins.Layer(
+            'layer',
+            offsets=(-300, 70000),
+            filters=[stand_ins.DrawableFilter('filter', 'gegl:opacity', {'value': 0.5})]),
+        ]),
+    ],
+    paths=[stand_ins.Path('path', strokes=[[0.0, 1.5, -2.25, 3.0], []])])
+
+
+def _export_cbor(export_file, **arguments):
+  with open(export_file(_create_image(), 'cbor', **arguments), 'rb') as f:
+    return _decode_cbor(f.read())
+
+
+def test_cbor_matches_json(export_file, export_json):
+  attributes = _export_cbor(export_file)
+
+  assert _decode_float_arrays(attributes) == export_json(_create_image())
+
+
+@pytest.mark.parametrize(
+  'stroke_points_encoding, tag', [('list', 86), ('base64-float64', 86), ('base64-float32', 85)])
+def test_stroke_points_are_typed_arrays(export_file, stroke_points_encoding, tag):
+  attributes = _export_cbor(export_file, stroke_points_encoding=stroke_points_encoding)
+
+  points_tag, _data = attributes['image']['paths'][0]['strokes'][0]['points']
+  assert points_tag == tag
+  assert _decode_float_arrays(attributes)['image']['paths'][0]['strokes'][0]['points'] == [
+    0.0, 1.5, -2.25, 3.0]
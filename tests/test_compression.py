@@ -0,0 +1,71 @@
+import bz2
+import gzip
+import lzma
+
+import pytest
+
+import stand_ins
+
+
+_DECOMPRESSORS = {
+  'gz': gzip.decompress,
+  'bz2': bz2.decompress,
+  'xz': lzma.decompress,
+}
+
+
+def _create_image(filepath='/images/image.xcf'):
+  image = stand_ins.Image(
+    'image', layers=[stand_ins.Layer(f'layer {index}') for index in range(20)])
+  image.get_file = lambda: stand_ins.File(filepath)
+  return image
+
+
+def _read_bytes(filepath):
+  with open(filepath, 'rb') as f:
+    return f.read()
+
+
+@pytest.mark.parametrize('compression', ['gz', 'bz2', 'xz'])
+@pytest.mark.parametrize('file_format', ['json', 'yaml', 'xml', 'cbor', 'csv'])
+def test_compressed_output_matches_uncompressed_output(export_file, compression, file_format):
+  uncompressed_data = _read_bytes(export_file(_create_image(), file_format))
+  compressed_data = _read_bytes(
+    export_file(_create_image(), file_format, f'image.{file_format}.{compression}'))
+
+  assert compressed_data != uncompressed_data
+  assert _DECOMPRESSORS[compression](compressed_data) == uncompressed_data
+
+
+def test_gzip_output_is_reproducible(export_file):
+  first_data = _read_bytes(export_file(_create_image(), 'json', 'first.json.gz'))
+  second_data = _read_bytes(export_file(_create_image(), 'json', 'second.json.gz'))
+
+  assert first_data == second_data
+
+
+@pytest.mark.parametrize('compression', ['gz', 'bz2', 'xz'])
+def test_compression_level_is_applied(export_file, compression):
+  filename = f'image.json.{compression}'
+
+  fast_data = _read_bytes(export_file(_create_image(), 'json', filename, compression_level=0))
+  default_data = _read_bytes(export_file(_create_image(), 'json', filename))
+
+  assert fast_data != default_data
+  assert _DECOMPRESSORS[compression](fast_data) == _DECOMPRESSORS[compression](default_data)
+
+
+def test_batch_export_appends_compression_extension(
+      plug_in, export_config, export_file, tmp_path):
+  output_dirpath = tmp_path / 'batch'
+  config = export_config(
+    images=[_create_image()],
+    output_directory=str(output_dirpath),
+    file_format='json',
+    filename_pattern='{name}',
+    compression='xz')
+
+  assert plug_in.plug_in_image_attribute_export_batch(None, config, None) is None
+
+  assert lzma.decompress(_read_bytes(output_dirpath / 'image.json.xz')) == _read_bytes(
+    export_file(_create_image(), 'json'))
@@ -0,0 +1,93 @@
+import os
+
+import stand_ins
+
+
+def _export_incrementally(plug_in, export_config, image, filepath):
+  return_values = plug_in.file_json_export(
+    None, stand_ins.RunMode.NONINTERACTIVE, image, stand_ins.File(filepath), None, None,
+    export_config(incremental_mode='full'), None)
+  assert return_values is None, return_values
+
+
+def _create_image(index):
+  return stand_ins.Image(
+    f'image-{index}', layers=[stand_ins.Layer(f'Layer {layer_index}') for layer_index in range(50)])
+
+
+def test_memory_of_loaded_caches_is_measured(plug_in, export_config, tmp_path, monkeypatch):
+  monkeypatch.setattr(plug_in, '_EXPORT_CACHES', plug_in._ExportCaches(1024 * 1024 * 1024))
+  filepath = str(tmp_path / 'image.json')
+
+  _export_incrementally(plug_in, export_config, _create_image(0), filepath)
+
+  # Parsed attributes and their JSON occupy more memory than the cache file.
+  assert plug_in._EXPORT_CACHES.memory > os.path.getsize(filepath + plug_in._CACHE_FILE_SUFFIX)
+
+
+def test_least_recently_used_caches_are_evicted_under_limit(
+      plug_in, export_config, tmp_path, monkeypatch):
+  monkeypatch.setattr(plug_in, '_EXPORT_CACHES', plug_in._ExportCaches(1024 * 1024 * 1024))
+  _export_incrementally(plug_in, export_config, _create_image(0), str(tmp_path / 'image.json'))
+  cache_memory = plug_in._EXPORT_CACHES.memory
+
+  caches = plug_in._ExportCaches(int(cache_memory * 2.5))
+  monkeypatch.setattr(plug_in, '_EXPORT_CACHES', caches)
+
+  cache_filepaths = []
+  for index in range(4):
+    filepath = str(tmp_path / f'image-{index}.json')
+    _export_incrementally(plug_in, export_config, _create_image(index), filepath)
+    cache_filepaths.append(filepath + plug_in._CACHE_FILE_SUFFIX)
+
+    assert caches.memory <= caches.max_memory
+
+  assert [caches.get(cache_filepath) is not None for cache_filepath in cache_filepaths] == [
+    False, False, True, True]
+
+
+def test_caches_exceeding_limit_are_not_kept(plug_in, export_config, tmp_path, monkeypatch):
+  caches = plug_in._ExportCaches(1024)
+  monkeypatch.setattr(plug_in, '_EXPORT_CACHES', caches)
+  filepath = str(tmp_path / 'image.json')
+
+  _export_incrementally(plug_in, export_config, _create_image(0), filepath)
+
+  assert caches.memory == 0
+  assert caches.get(filepath + plug_in._CACHE_FILE_SUFFIX) is None
+
+
+def test_cache_is_taken_from_memory_while_cache_file_is_unchanged(
+      plug_in, export_config, tmp_path, monkeypatch):
+  caches = plug_in._ExportCaches(1024 * 1024 * 1024)
+  monkeypatch.setattr(plug_in, '_EXPORT_CACHES', caches)
+  filepath = str(tmp_path / 'image.json')
+  cache_filepath = filepath + plug_in._CACHE_FILE_SUFFIX
+
+  _export_incrementally(plug_in, export_config, _create_image(0), filepath)
+  cache = caches.get(cache_filepath)
+
+  assert cache is not None
+  assert plug_in._load_export_cache(cache_filepath, cache['options']) is cache
+
+  with open(cache_filepath, 'a', encoding='utf-8') as f:
+    f.write('\n')
+
+  assert caches.get(cache_filepath) is None
+  assert caches.memory == 0
+
+  _export_incrementally(plug_in, export_config, _create_image(0), filepath)
+
+  assert caches.get(cache_filepath) is not None
+
+
+def test_cache_with_different_options_is_not_used(plug_in, export_config, tmp_path, monkeypatch):
+  caches = plug_in._ExportCaches(1024 * 1024 * 1024)
+  monkeypatch.setattr(plug_in, '_EXPORT_CACHES', caches)
+  filepath = str(tmp_path / 'image.json')
+  cache_filepath = filepath + plug_in._CACHE_FILE_SUFFIX
+
+  _export_incrementally(plug_in, export_config, _create_image(0), filepath)
+  options = caches.get(cache_filepath)['options']
+
+  assert plug_in._load_export_cache(cache_filepath, {**options, 'max-depth': 1}) is None
@@ -0,0 +1,130 @@
+import gzip
+import json
+import os
+
+import stand_ins
+import export_index
+
+
+def _create_source_file(tmp_path, name='image.xcf', contents=b'source'):
+  filepath = tmp_path / name
+  filepath.write_bytes(contents)
+  return str(filepath)
+
+
+def _count_lines(filepath):
+  with open(filepath, 'r', encoding='utf-8') as f:
+    return sum(1 for _line in f)
+
+
+def _create_output_file(tmp_path, name):
+  filepath = tmp_path / name
+  filepath.write_text('{}')
+  return str(filepath)
+
+
+def test_index_is_compacted_on_load(tmp_path):
+  index_filepath = str(tmp_path / 'index.jsonl')
+  source_filepath = _create_source_file(tmp_path)
+  json_output_filepath = _create_output_file(tmp_path, 'image.json')
+  yaml_output_filepath = _create_output_file(tmp_path, 'image.yaml')
+
+  index = export_index.ExportIndex(index_filepath)
+  for _unused in range(10):
+    index.add(source_filepath, {'file-format': 'json'}, json_output_filepath)
+  index.add(source_filepath, {'file-format': 'yaml'}, yaml_output_filepath)
+
+  assert _count_lines(index_filepath) == 11
+
+  index = export_index.ExportIndex(index_filepath)
+
+  assert _count_lines(index_filepath) == 2
+  assert index.find_output(source_filepath, {'file-format': 'json'}) == json_output_filepath
+  assert index.find_output(source_filepath, {'file-format': 'yaml'}) == yaml_output_filepath
+
+
+def test_index_is_not_compacted_while_outdated_entries_do_not_prevail(tmp_path):
+  index_filepath = str(tmp_path / 'index.jsonl')
+
+  index = export_index.ExportIndex(index_filepath)
+  for name in ['a', 'b', 'a']:
+    index.add(
+      _create_source_file(tmp_path, f'{name}.xcf'),
+      {'file-format': 'json'},
+      _create_output_file(tmp_path, f'{name}.json'))
+
+  export_index.ExportIndex(index_filepath)
+
+  assert _count_lines(index_filepath) == 3
+
+
+def test_overwritten_output_is_not_found(tmp_path):
+  index_filepath = str(tmp_path / 'index.jsonl')
+  source_filepath = _create_source_file(tmp_path)
+  output_filepath = _create_output_file(tmp_path, 'image.json')
+
+  index = export_index.ExportIndex(index_filepath)
+  index.add(source_filepath, {'file-format': 'json'}, output_filepath)
+
+  with open(output_filepath, 'w', encoding='utf-8') as f:
+    f.write('{"image": {}}')
+
+  assert index.find_output(source_filepath, {'file-format': 'json'}) is None
+
+
+def _create_image(source_filepath):
+  image = stand_ins.Image('image', layers=[stand_ins.Layer('layer')])
+  image.get_file = lambda: stand_ins.File(source_filepath)
+  image.is_dirty = lambda: False
+  return image
+
+
+def test_outputs_with_different_compression_are_not_reused(plug_in, export_config, tmp_path):
+  image = _create_image(_create_source_file(tmp_path))
+  config = export_config(export_index=str(tmp_path / 'index.jsonl'))
+
+  for filename in ['a.json', 'b.json.gz']:
+    return_values = plug_in.file_json_export(
+      None, stand_ins.RunMode.NONINTERACTIVE, image, stand_ins.File(str(tmp_path / filename)),
+      None, None, config, None)
+    assert return_values is None, return_values
+
+  with gzip.open(tmp_path / 'b.json.gz', 'rt', encoding='utf-8') as f:
+    assert json.load(f) == json.loads((tmp_path / 'a.json').read_text())
+
+  assert not os.path.samefile(tmp_path / 'a.json', tmp_path / 'b.json.gz')
+
+
+def test_outputs_with_same_options_are_reused(plug_in, export_config, tmp_path):
+  image = _create_image(_create_source_file(tmp_path))
+  config = export_config(export_index=str(tmp_path / 'index.jsonl'))
+
+  for filename in ['a.json.gz', 'b.json.gz']:
+    return_values = plug_in.file_json_export(
+      None, stand_ins.RunMode.NONINTERACTIVE, image, stand_ins.File(str(tmp_path / filename)),
+      None, None, config, None)
+    assert return_values is None, return_values
+
+  assert os.path.samefile(tmp_path / 'a.json.gz', tmp_path / 'b.json.gz')
+
+
+def test_output_overwritten_with_different_options_is_exported_again(
+      plug_in, export_config, tmp_path):
+  image = _create_image(_create_source_file(tmp_path))
+  output_filepath = str(tmp_path / 'out.json')
+  index_filepath = str(tmp_path / 'index.jsonl')
+
+  def _export(**arguments):
+    return_values = plug_in.file_json_export(
+      None, stand_ins.RunMode.NONINTERACTIVE, image, stand_ins.File(output_filepath),
+      None, None, export_config(export_index=index_filepath, **arguments), None)
+    assert return_values is None, return_values
+
+    with open(output_filepath, 'r', encoding='utf-8') as f:
+      return json.load(f)
+
+  attributes = _export()
+  attributes_without_layers = _export(field_mask='layers=false')
+
+  assert attributes_without_layers != attributes
+  assert _export() == attributes
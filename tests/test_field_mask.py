@@ -0,0 +1,100 @@
+import pytest
+
+import stand_ins
+
+
+def _create_image():
+  return stand_ins.Image(
+    'image',
+    layers=[
+      stand_ins.GroupLayer(
+        'group',
+        children=[
+          stand_ins.Layer(
+            'child',
+            filters=[stand_ins.DrawableFilter('filter', 'gegl:opacity', {'value': 0.5})]),
+        ]),
+      stand_ins.GroupLayer('empty-group'),
+      stand_ins.Layer('layer', mask=stand_ins.LayerMask('layer-mask')),
+    ],
+    channels=[stand_ins.Channel('channel')],
+    paths=[stand_ins.Path('path', strokes=[[0.0, 0.0, 1.0, 1.0]])])
+
+
+@pytest.fixture
+def get_config_calls(monkeypatch):
+  calls = []
+  get_config = stand_ins.DrawableFilter.get_config
+
+  def _get_config(self):
+    calls.append(self)
+    return get_config(self)
+
+  monkeypatch.setattr(stand_ins.DrawableFilter, 'get_config', _get_config)
+
+  return calls
+
+
+def test_excluded_containers_without_included_descendants_are_omitted(
+      export_json, get_config_calls):
+  attributes = export_json(_create_image(), field_mask='*=false,name')
+
+  assert attributes == {
+    'image': {
+      'name': 'image',
+      'layers': [
+        {'name': 'group', 'children': [{'name': 'child', 'filters': [{'name': 'filter'}]}]},
+        {'name': 'empty-group'},
+        {'name': 'layer', 'mask': {'name': 'layer-mask'}},
+      ],
+      'channels': [{'name': 'channel'}],
+      'paths': [{'name': 'path'}],
+    },
+  }
+  assert not get_config_calls
+
+
+def test_filter_parameters_are_matched_only_explicitly(export_json, get_config_calls):
+  attributes = export_json(_create_image(), field_mask='*=false,**.parameters.value')
+
+  assert attributes == {
+    'image': {
+      'layers': [{'children': [{'filters': [{'parameters': {'value': 0.5}}]}]}],
+    },
+  }
+  assert len(get_config_calls) == 1
+
+
+def test_included_empty_containers_are_exported(export_json):
+  attributes = export_json(_create_image(), field_mask='*=false,children')
+
+  assert attributes == {'image': {'layers': [{'children': []}, {'children': []}]}}
+
+
+def test_excluded_attributes_are_exported_without_their_descendants(export_json):
+  attributes = export_json(_create_image(), field_mask='layers.**.filters=false,strokes=false')
+
+  group, _empty_group, layer = attributes['image']['layers']
+
+  assert 'filters' not in group['children'][0]
+  assert 'filters' not in layer
+  assert 'filters' not in layer['mask']
+  assert 'strokes' not in attributes['image']['paths'][0]
+  assert attributes['image']['channels'][0]['filters'] == []
+
+
+def test_last_matching_rule_applies(export_json):
+  attributes = export_json(_create_image(), field_mask='*=false,name,layers.*.name=false')
+
+  assert attributes['image']['channels'] == [{'name': 'channel'}]
+  assert attributes['image']['layers'][0] == {
+    'children': [{'name': 'child', 'filters': [{'name': 'filter'}]}]}
+
+
+@pytest.mark.parametrize('field_mask', ['name=maybe', '=false'])
+def test_invalid_field_mask_is_rejected(plug_in, export_config, field_mask):
+  return_values = plug_in.file_json_export(
+    None, stand_ins.RunMode.NONINTERACTIVE, _create_image(), stand_ins.File('unused.json'),
+    None, None, export_config(field_mask=field_mask), None)
+
+  assert return_values[0] == stand_ins.PDBStatusType.CALLING_ERROR
@@ -0,0 +1,62 @@
+import pytest
+
+import stand_ins
+
+
+@pytest.fixture
+def list_properties_calls(monkeypatch):
+  calls = []
+  list_properties = stand_ins._FilterConfig.list_properties
+
+  def _list_properties(self):
+    calls.append(self)
+    return list_properties(self)
+
+  monkeypatch.setattr(stand_ins._FilterConfig, 'list_properties', _list_properties)
+
+  return calls
+
+
+def _create_image(*filters):
+  return stand_ins.Image('image', layers=[stand_ins.Layer('layer', filters=filters)])
+
+
+def test_parameters_are_converted_by_type(export_json):
+  attributes = export_json(_create_image(
+    stand_ins.DrawableFilter(
+      'filter',
+      'gegl:gaussian-blur-test-conversion',
+      {
+        'std-dev-x': 1.5,
+        'clip-extent': True,
+        'name': 'blur',
+        'abyss-policy': None,
+        'filter': stand_ins.GaussianBlurFilter.AUTO,
+        'color': stand_ins.Color((1.0, 0.5, 0.0, 1.0)),
+        'offsets': (1, 2),
+      })))
+
+  assert attributes['image']['layers'][0]['filters'][0]['parameters'] == {
+    'std-dev-x': 1.5,
+    'clip-extent': True,
+    'name': 'blur',
+    'abyss-policy': None,
+    'filter': 'AUTO',
+    'color': [1.0, 0.5, 0.0, 1.0],
+    'offsets': '(1, 2)',
+  }
+
+
+def test_property_names_are_listed_once_per_operation(
+      plug_in, export_json, list_properties_calls, monkeypatch):
+  monkeypatch.setattr(plug_in, '_FILTER_PROPERTY_NAMES_PER_OPERATION', {})
+
+  attributes = export_json(_create_image(
+    stand_ins.DrawableFilter('first', 'gegl:opacity-test-cache', {'value': 0.5}),
+    stand_ins.DrawableFilter('second', 'gegl:opacity-test-cache', {'value': 0.25}),
+    stand_ins.DrawableFilter('third', 'gegl:invert-test-cache', {'srgb': False})))
+
+  assert [
+    drawable_filter['parameters'] for drawable_filter in attributes['image']['layers'][0]['filters']
+  ] == [{'value': 0.5}, {'value': 0.25}, {'srgb': False}]
+  assert len(list_properties_calls) == 2
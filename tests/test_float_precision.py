@@ -0,0 +1,57 @@
+import pytest
+
+import stand_ins
+
+
+def _create_image():
+  return stand_ins.Image(
+    'image',
+    layers=[
+      stand_ins.Layer(
+        'layer',
+        opacity=33.333333,
+        filters=[stand_ins.DrawableFilter('filter', 'gegl:opacity', {'value': 0.123456789})]),
+    ],
+    channels=[stand_ins.Channel('channel', color=(0.123456789, 1.0, 0.5, 1.0), opacity=12.5)],
+    paths=[stand_ins.Path('path', strokes=[[123.456789, 0.000123456789, 300.0]])])
+
+
+def test_floats_are_rounded_per_class(export_json):
+  attributes = export_json(
+    _create_image(), float_precision='coordinates=4,colors=2,opacity=3,other=5')['image']
+
+  assert attributes['layers'][0]['opacity'] == 33.3
+  assert attributes['layers'][0]['filters'][0]['parameters'] == {'value': 0.12346}
+  assert attributes['channels'][0]['color_rgba'] == [0.12, 1.0, 0.5, 1.0]
+  assert attributes['channels'][0]['opacity'] == 12.5
+  assert attributes['paths'][0]['strokes'][0]['points'] == [123.5, 0.0001235, 300.0]
+
+
+def test_classes_not_specified_keep_full_precision(export_json):
+  attributes = export_json(_create_image(), float_precision='coordinates=2')['image']
+
+  assert attributes['layers'][0]['opacity'] == 33.333333
+  assert attributes['channels'][0]['color_rgba'] == [0.123456789, 1.0, 0.5, 1.0]
+  assert attributes['paths'][0]['strokes'][0]['points'] == [120.0, 0.00012, 300.0]
+
+
+@pytest.mark.parametrize('file_format', ['json', 'yaml', 'xml'])
+def test_rounded_floats_keep_float_notation(export_file, file_format):
+  with open(
+        export_file(_create_image(), file_format, float_precision='coordinates=1'),
+        'r', encoding='utf-8') as f:
+    text = f.read()
+
+  for value_text in ['100.0', '0.0001', '300.0']:
+    assert value_text in text
+  assert '1e+02' not in text
+  assert '3e+02' not in text
+
+
+@pytest.mark.parametrize('float_precision', ['size=3', 'coordinates=0', 'opacity=18', 'colors'])
+def test_invalid_float_precision_is_rejected(plug_in, export_config, float_precision):
+  return_values = plug_in.file_json_export(
+    None, stand_ins.RunMode.NONINTERACTIVE, _create_image(), stand_ins.File('unused.json'),
+    None, None, export_config(float_precision=float_precision), None)
+
+  assert return_values[0] == stand_ins.PDBStatusType.CALLING_ERROR
@@ -0,0 +1,153 @@
+import copy
+import json
+
+import pytest
+
+import stand_ins
+
+
+@pytest.fixture
+def export_incrementally(plug_in, export_config, tmp_path):
+  """Returns a function exporting an image to JSON incrementally and returning
+  the loaded full attributes and the patch.
+  """
+  filepath = str(tmp_path / 'image.json')
+
+  def _export_incrementally(image):
+    return_values = plug_in.file_json_export(
+      None, stand_ins.RunMode.NONINTERACTIVE, image, stand_ins.File(filepath), None, None,
+      export_config(incremental_mode='full-and-delta'), None)
+    assert return_values is None, return_values
+
+    with open(filepath, 'r', encoding='utf-8') as f:
+      attributes = json.load(f)
+
+    with open(filepath + plug_in._PATCH_FILE_SUFFIX, 'r', encoding='utf-8') as f:
+      patch = json.load(f)
+
+    return attributes, patch
+
+  _export_incrementally.cache_filepath = filepath + plug_in._CACHE_FILE_SUFFIX
+
+  return _export_incrementally
+
+
+def _create_image():
+  return stand_ins.Image(
+    'image',
+    layers=[
+      stand_ins.GroupLayer(
+        'group',
+        children=[
+          stand_ins.Layer(
+            'nan-layer',
+            filters=[stand_ins.DrawableFilter('filter', 'gegl:opacity', {'value': float('nan')})]),
+          stand_ins.Layer('child'),
+        ]),
+      stand_ins.Layer('layer', mask=stand_ins.LayerMask('layer-mask')),
+    ],
+    channels=[stand_ins.Channel('channel-1')],
+    paths=[stand_ins.Path('path', strokes=[[0.0, 0.0, 10.0, 0.0, 10.0, 10.0]])])
+
+
+def _apply_patch(value, patch):
+  value = copy.deepcopy(value)
+
+  for operation in patch:
+    *parent_keys, key = operation['path'].split('/')[1:]
+    parent = value
+    for parent_key in parent_keys:
+      parent = parent[int(parent_key) if isinstance(parent, list) else parent_key]
+
+    if isinstance(parent, list):
+      key = int(key)
+
+    if operation['op'] == 'remove':
+      del parent[key]
+    elif operation['op'] == 'add' and isinstance(parent, list):
+      parent.insert(key, operation['value'])
+    else:
+      parent[key] = operation['value']
+
+  return value
+
+
+def test_patch_transforms_previous_attributes(export_incrementally):
+  image = _create_image()
+  previous_attributes, _patch = export_incrementally(image)
+
+  group = image._layers[0]
+  group._children[1]._name = 'renamed-child'
+  group._children.append(stand_ins.Layer('new-child'))
+  image._layers.pop()
+
+  attributes, patch = export_incrementally(image)
+
+  assert attributes['image']['layers'][0]['children'][1]['name'] == 'renamed-child'
+  assert _apply_patch(previous_attributes, patch) == attributes
+
+
+def test_patch_is_empty_for_unchanged_image(export_incrementally):
+  image = _create_image()
+  export_incrementally(image)
+
+  _attributes, patch = export_incrementally(image)
+
+  assert patch == []
+
+
+def test_nan_values_are_equal_in_patch(export_incrementally):
+  image = _create_image()
+  export_incrementally(image)
+
+  # Modifying the opacity forces attributes of the layer to be obtained again.
+  image._layers[0]._children[0]._opacity = 50.0
+
+  _attributes, patch = export_incrementally(image)
+
+  assert patch == [
+    {'op': 'replace', 'path': '/image/layers/0/children/0/opacity', 'value': 50.0}]
+
+
+def test_moved_path_anchor_is_detected(export_incrementally):
+  image = _create_image()
+  export_incrementally(image)
+
+  image._paths[0]._strokes[1][4:6] = [20.0, 10.0]
+
+  _attributes, patch = export_incrementally(image)
+
+  assert [operation['path'] for operation in patch] == [
+    '/image/paths/0/strokes/0/points']
+
+
+def test_changed_color_tag_and_channel_color_are_detected(export_incrementally):
+  image = _create_image()
+  export_incrementally(image)
+
+  image._layers[1]._color_tag = stand_ins.ColorTag.RED
+  image._channels[0]._color = stand_ins.Color((1.0, 0.0, 0.0, 1.0))
+
+  _attributes, patch = export_incrementally(image)
+
+  assert sorted(operation['path'] for operation in patch) == [
+    '/image/channels/0/color_rgba/0',
+    '/image/layers/1/color_tag',
+  ]
+
+
+def test_cache_stores_item_attributes_once(export_incrementally):
+  image = _create_image()
+  export_incrementally(image)
+
+  with open(export_incrementally.cache_filepath, 'r', encoding='utf-8') as f:
+    contents = f.read()
+
+  header, *item_lines = contents.splitlines()
+  item_attributes = [line.split('\t')[3] for line in item_lines]
+
+  assert len(item_attributes) == 6
+
+  for name in ['nan-layer', 'child', 'layer-mask', 'channel-1', 'path']:
+    assert f'"{name}"' not in header
+    assert sum(attributes.count(f'"{name}"') for attributes in item_attributes) == 1
@@ -0,0 +1,92 @@
+import stand_ins
+
+
+def _create_image():
+  return stand_ins.Image(
+    'image',
+    layers=[
+      stand_ins.GroupLayer(
+        'tagged-group',
+        color_tag=stand_ins.ColorTag.RED,
+        children=[
+          stand_ins.Layer('untagged-child'),
+          stand_ins.Layer('hidden-child', visible=False),
+          stand_ins.GroupLayer('untagged-subgroup', children=[stand_ins.Layer('grandchild')]),
+        ]),
+      stand_ins.GroupLayer(
+        'untagged-group',
+        children=[stand_ins.Layer('tagged-child', color_tag=stand_ins.ColorTag.RED)]),
+      stand_ins.Layer('untagged-layer'),
+    ])
+
+
+def _get_names(layers):
+  return [
+    (layer['name'], _get_names(layer['children'])) if 'children' in layer else layer['name']
+    for layer in layers]
+
+
+def test_color_tags_export_all_children_of_matching_group(export_json):
+  attributes = export_json(_create_image(), color_tags='RED')
+
+  assert _get_names(attributes['image']['layers']) == [
+    ('tagged-group', [
+      'untagged-child', 'hidden-child', ('untagged-subgroup', ['grandchild'])]),
+  ]
+
+
+def test_name_pattern_exports_all_children_of_matching_group(export_json):
+  attributes = export_json(_create_image(), name_pattern='*-group')
+
+  assert _get_names(attributes['image']['layers']) == [
+    ('tagged-group', [
+      'untagged-child', 'hidden-child', ('untagged-subgroup', ['grandchild'])]),
+    ('untagged-group', ['tagged-child']),
+  ]
+
+
+def test_visible_only_applies_to_children_of_matching_group(export_json):
+  attributes = export_json(_create_image(), color_tags='RED', visible_only=True)
+
+  assert _get_names(attributes['image']['layers']) == [
+    ('tagged-group', ['untagged-child', ('untagged-subgroup', ['grandchild'])]),
+  ]
+
+
+def test_max_depth_limits_nested_layers(export_json):
+  attributes = export_json(_create_image(), max_depth=1)
+
+  assert _get_names(attributes['image']['layers']) == [
+    ('tagged-group', ['untagged-child', 'hidden-child', 'untagged-subgroup']),
+    ('untagged-group', ['tagged-child']),
+    'untagged-layer',
+  ]
+
+
+def test_root_layer_path_exports_only_the_root_layer(export_json):
+  attributes = export_json(_create_image(), root_layer_path='tagged-group/untagged-subgroup')
+
+  assert _get_names(attributes['image']['layers']) == [('untagged-subgroup', ['grandchild'])]
+
+
+def test_missing_root_layer_is_rejected(plug_in, export_config):
+  return_values = plug_in.file_json_export(
+    None, stand_ins.RunMode.NONINTERACTIVE, _create_image(), stand_ins.File('unused.json'),
+    None, None, export_config(root_layer_path='tagged-group/missing'), None)
+
+  assert return_values[0] == stand_ins.PDBStatusType.CALLING_ERROR
+
+
+def test_items_not_matching_predicates_are_not_visited(export_json, monkeypatch):
+  visited_layer_names = []
+  get_opacity = stand_ins.Layer.get_opacity
+
+  def _get_opacity(self):
+    visited_layer_names.append(self._name)
+    return get_opacity(self)
+
+  monkeypatch.setattr(stand_ins.Layer, 'get_opacity', _get_opacity)
+
+  export_json(_create_image(), name_pattern='untagged-group')
+
+  assert visited_layer_names == ['untagged-group', 'tagged-child']
@@ -0,0 +1,109 @@
+import json
+
+import pytest
+
+import stand_ins
+
+
+@pytest.fixture
+def get_visible_calls(monkeypatch):
+  calls = []
+  get_visible = stand_ins.Item.get_visible
+
+  def _get_visible(self):
+    calls.append(self._name)
+    return get_visible(self)
+
+  monkeypatch.setattr(stand_ins.Item, 'get_visible', _get_visible)
+
+  return calls
+
+
+def _create_image():
+  return stand_ins.Image(
+    'image',
+    layers=[
+      stand_ins.GroupLayer('group', children=[stand_ins.Layer('child')]),
+      stand_ins.Layer('layer', mask=stand_ins.LayerMask('layer-mask')),
+    ])
+
+
+def test_calls_are_memoized_per_object_and_arguments(plug_in):
+  path = stand_ins.Path('path', strokes=[[0.0, 0.0, 3.0, 4.0]])
+  proxies = plug_in._ItemProxies()
+
+  proxy = proxies.get(path)
+
+  assert proxies.get(path) is proxy
+  assert isinstance(proxy, stand_ins.Path)
+  assert proxy.get_name() == 'path'
+  assert proxy.get_name() == 'path'
+  assert proxy.stroke_get_length(1, 0.1) == proxy.stroke_get_length(1, 0.1) == 5.0
+  assert proxy.stroke_get_length(1, 1.0) == 5.0
+  assert (proxies.hits, proxies.misses) == (2, 3)
+
+  proxy.stroke_get_points(1)
+  proxy.stroke_get_points(1)
+  assert (proxies.hits, proxies.misses) == (2, 3)
+
+  with pytest.raises(AttributeError):
+    proxy.get_missing_attribute
+
+
+def test_returned_objects_are_proxied(plug_in):
+  mask = stand_ins.LayerMask('mask')
+  child = stand_ins.Layer('child', mask=mask)
+  group = stand_ins.GroupLayer('group', children=[child])
+  proxies = plug_in._ItemProxies()
+
+  children = proxies.get(group).get_children()
+
+  assert len(children) == 1
+  assert children[0] is proxies.get(child)
+  assert children[0].get_mask() is proxies.get(mask)
+
+
+def test_released_proxies_call_gimp_again(plug_in, get_visible_calls):
+  child = stand_ins.Layer('child', mask=stand_ins.LayerMask('mask'))
+  group = stand_ins.GroupLayer('group', children=[child])
+  proxies = plug_in._ItemProxies()
+
+  group_proxy = proxies.get(group)
+  child_proxy = group_proxy.get_children()[0]
+  child_proxy.get_mask().get_visible()
+  child_proxy.get_visible()
+
+  proxies.release(group_proxy)
+
+  assert proxies.get(group) is not group_proxy
+  assert proxies.get(child) is not child_proxy
+  proxies.get(child).get_visible()
+  proxies.get(child).get_mask().get_visible()
+  assert get_visible_calls == ['mask', 'child', 'child', 'mask']
+
+
+def test_disabled_proxies_return_objects(plug_in):
+  layer = stand_ins.Layer('layer')
+  proxies = plug_in._ItemProxies(enabled=False)
+
+  assert proxies.get(layer) is layer
+
+
+def test_item_filter_predicates_obtain_facts_once(export_json, get_visible_calls):
+  attributes = export_json(_create_image(), visible_only=True)
+
+  assert [layer['name'] for layer in attributes['image']['layers']] == ['group', 'layer']
+  assert sorted(get_visible_calls) == ['child', 'group', 'layer', 'layer-mask']
+
+
+@pytest.mark.parametrize(
+  'arguments, memoized', [({}, False), ({'visible_only': True}, True),
+                          ({'incremental_mode': 'full'}, True)])
+def test_calls_are_memoized_only_if_facts_are_needed_repeatedly(
+      export_file, arguments, memoized):
+  filepath = export_file(_create_image(), 'json', profile=True, **arguments)
+
+  with open(filepath + '.profile.json', 'r', encoding='utf-8') as f:
+    counters = json.load(f)['counters']
+
+  assert ('memoized call misses' in counters) == memoized
@@ -0,0 +1,40 @@
+import json
+
+import stand_ins
+
+
+def _create_image():
+  return stand_ins.Image(
+    'image "quoted" é中\n',
+    layers=[
+      stand_ins.GroupLayer(
+        'group',
+        children=[
+          stand_ins.Layer(
+            'layer',
+            opacity=float('nan'),
+            filters=[
+              stand_ins.DrawableFilter('filter', 'gegl:opacity', {'value': float('inf')})]),
+        ]),
+      stand_ins.GroupLayer('empty-group'),
+    ],
+    paths=[stand_ins.Path('path', strokes=[[0.0, 1.5], []])])
+
+
+def test_json_is_identical_to_json_dump(plug_in, export_file):
+  with open(export_file(_create_image(), 'json'), 'r', encoding='utf-8') as f:
+    text = f.read()
+
+  attributes = {
+    key: value.to_dict() for key, value in plug_in._get_image_attributes(_create_image()).items()}
+
+  assert text == json.dumps(attributes, indent=4, default=list)
+
+
+def test_json_contains_special_float_values(export_json):
+  attributes = export_json(_create_image())['image']
+
+  layer = attributes['layers'][0]['children'][0]
+  assert layer['opacity'] != layer['opacity']
+  assert layer['filters'][0]['parameters'] == {'value': float('inf')}
+  assert attributes['paths'][0]['strokes'][1]['points'] == []
@@ -0,0 +1,49 @@
+import pytest
+
+import stand_ins
+
+
+@pytest.fixture
+def layers_with_fetched_opacity(monkeypatch):
+  layer_names = []
+  get_opacity = stand_ins.Layer.get_opacity
+
+  def _get_opacity(self):
+    layer_names.append(self._name)
+    return get_opacity(self)
+
+  monkeypatch.setattr(stand_ins.Layer, 'get_opacity', _get_opacity)
+
+  return layer_names
+
+
+def _create_image():
+  return stand_ins.Image('image', layers=[stand_ins.Layer('first'), stand_ins.Layer('second')])
+
+
+def test_attributes_are_not_fetched_until_traversed(plug_in, layers_with_fetched_opacity):
+  attributes = plug_in._get_image_attributes(_create_image())
+
+  assert not layers_with_fetched_opacity
+
+  image_attributes = dict(attributes['image'].items())
+
+  assert not layers_with_fetched_opacity
+
+  layers = image_attributes['layers']
+  first_layer = dict(next(layers).items())
+
+  assert first_layer['name'] == 'first'
+  assert layers_with_fetched_opacity == ['first']
+
+  second_layer = dict(next(layers).items())
+
+  assert second_layer['name'] == 'second'
+  assert layers_with_fetched_opacity == ['first', 'second']
+
+
+def test_to_dict_fetches_all_attributes(plug_in):
+  attributes = plug_in._get_image_attributes(_create_image())['image'].to_dict()
+
+  assert [layer['name'] for layer in attributes['layers']] == ['first', 'second']
+  assert isinstance(attributes['layers'], list)
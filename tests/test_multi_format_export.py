@@ -0,0 +1,96 @@
+import os
+
+import pytest
+
+import stand_ins
+
+
+_FORMATS = ['xml', 'json', 'yaml', 'cbor', 'ndjson', 'csv']
+
+
+def _create_image():
+  return stand_ins.Image(
+    'image',
+    layers=[
+      stand_ins.GroupLayer('group', children=[stand_ins.Layer('child', opacity=50.0)]),
+      stand_ins.Layer(
+        'layer',
+        mask=stand_ins.LayerMask('layer-mask'),
+        filters=[stand_ins.DrawableFilter('filter', 'gegl:opacity', {'value': 0.5})]),
+    ],
+    channels=[stand_ins.Channel('channel')],
+    paths=[stand_ins.Path('path', strokes=[[0.0, 1.0, 2.0, 3.0]])])
+
+
+def _read_bytes(filepath):
+  with open(filepath, 'rb') as f:
+    return f.read()
+
+
+@pytest.fixture
+def get_opacity_calls(monkeypatch):
+  calls = []
+  get_opacity = stand_ins.Layer.get_opacity
+
+  def _get_opacity(self):
+    calls.append(self)
+    return get_opacity(self)
+
+  monkeypatch.setattr(stand_ins.Layer, 'get_opacity', _get_opacity)
+
+  return calls
+
+
+def test_all_formats_match_single_format_exports(
+      plug_in, export_file, tmp_path, get_opacity_calls):
+  files = {file_format: str(tmp_path / f'multi.{file_format}') for file_format in _FORMATS}
+
+  plug_in._write_formats(plug_in._get_image_attributes(_create_image()), files)
+
+  assert len(get_opacity_calls) == 3
+
+  for file_format, filepath in files.items():
+    assert _read_bytes(filepath) == _read_bytes(export_file(_create_image(), file_format))
+
+
+def test_batch_export_to_multiple_formats_matches_single_format_exports(
+      plug_in, export_config, export_file, tmp_path):
+  image = _create_image()
+  image.get_file = lambda: stand_ins.File('/images/image.xcf')
+  output_dirpath = tmp_path / 'batch'
+
+  config = export_config(
+    images=[image],
+    output_directory=str(output_dirpath),
+    file_format=','.join(_FORMATS),
+    filename_pattern='{name}',
+    compression='')
+
+  assert plug_in.plug_in_image_attribute_export_batch(None, config, None) is None
+
+  for file_format in _FORMATS:
+    assert _read_bytes(output_dirpath / f'image.{file_format}') == _read_bytes(
+      export_file(image, file_format))
+
+
+def test_no_file_is_replaced_if_attributes_cannot_be_obtained(plug_in, tmp_path, monkeypatch):
+  layer = stand_ins.Layer('layer')
+
+  def _get_opacity():
+    raise OSError('opacity unavailable')
+
+  monkeypatch.setattr(layer, 'get_opacity', _get_opacity)
+
+  files = {}
+  for file_format in _FORMATS:
+    filepath = tmp_path / f'image.{file_format}'
+    filepath.write_text('previous')
+    files[file_format] = str(filepath)
+
+  with pytest.raises(OSError):
+    plug_in._write_formats(
+      plug_in._get_image_attributes(stand_ins.Image('image', layers=[layer])), files)
+
+  assert sorted(os.listdir(tmp_path)) == sorted(f'image.{file_format}' for file_format in _FORMATS)
+  for filepath in files.values():
+    assert _read_bytes(filepath) == b'previous'
@@ -0,0 +1,63 @@
+import json
+import os
+
+import pytest
+
+import stand_ins
+
+
+class _RemoteFile(stand_ins.File):
+  """File without a local path, written only via `replace()`."""
+
+  def get_path(self):
+    return None
+
+
+def _create_image(layer=None):
+  return stand_ins.Image('image', layers=[layer or stand_ins.Layer('layer')])
+
+
+def _export(plug_in, export_config, image, file, **arguments):
+  return plug_in.file_json_export(
+    None, stand_ins.RunMode.NONINTERACTIVE, image, file, None, None,
+    export_config(**arguments), None)
+
+
+def test_file_without_local_path_is_written(plug_in, export_config, export_json, tmp_path):
+  filepath = str(tmp_path / 'remote.json')
+
+  assert _export(plug_in, export_config, _create_image(), _RemoteFile(filepath)) is None
+
+  with open(filepath, 'r', encoding='utf-8') as f:
+    assert json.load(f) == export_json(_create_image(), 'local.json')
+
+
+@pytest.mark.parametrize('pipelined', [False, True])
+def test_failed_export_leaves_existing_file_intact(
+      plug_in, export_config, tmp_path, monkeypatch, pipelined):
+  filepath = tmp_path / 'image.json'
+  filepath.write_text('previous')
+
+  layer = stand_ins.Layer('layer')
+
+  def _get_opacity():
+    raise OSError('opacity unavailable')
+
+  monkeypatch.setattr(layer, 'get_opacity', _get_opacity)
+
+  return_values = _export(
+    plug_in, export_config, _create_image(layer), stand_ins.File(str(filepath)),
+    pipelined=pipelined)
+
+  assert return_values == (stand_ins.PDBStatusType.EXECUTION_ERROR, 'opacity unavailable')
+  assert filepath.read_text() == 'previous'
+  assert os.listdir(tmp_path) == ['image.json']
+
+
+def test_file_in_missing_directory_is_reported(plug_in, export_config, tmp_path):
+  return_values = _export(
+    plug_in, export_config, _create_image(),
+    stand_ins.File(str(tmp_path / 'missing' / 'image.json')))
+
+  assert return_values[0] == stand_ins.PDBStatusType.EXECUTION_ERROR
+  assert not os.path.exists(tmp_path / 'missing')
@@ -0,0 +1,44 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+import export_options
+
+
+_PARALLEL_EXPORT_FILEPATH = os.path.join(
+  os.path.dirname(os.path.abspath(__file__)), '..', 'tools', 'parallel-export.py')
+
+
+@pytest.fixture(scope='module')
+def parallel_export():
+  spec = importlib.util.spec_from_file_location('parallel_export', _PARALLEL_EXPORT_FILEPATH)
+  module = importlib.util.module_from_spec(spec)
+  spec.loader.exec_module(module)
+  return module
+
+
+def _parse_args(parallel_export, monkeypatch, *args):
+  monkeypatch.setattr(sys, 'argv', ['parallel-export.py', 'input', 'output', *args])
+  return parallel_export._parse_args()
+
+
+def test_default_export_options_match_plug_in_arguments(plug_in):
+  assert {
+    argument[1]: argument[-2] for argument in plug_in._EXPORT_ARGUMENTS
+  } == export_options.DEFAULTS
+
+
+@pytest.mark.parametrize('args, arguments', [
+  ((), {}),
+  (('--compression', 'gz'), {}),
+  (('--format', 'yaml', '--field-mask', 'strokes=false', '--max-depth', '2'),
+   {'field_mask': 'strokes=false', 'max_depth': 2}),
+])
+def test_index_options_match_plug_in(
+      parallel_export, plug_in, export_config, monkeypatch, args, arguments):
+  parsed_args = _parse_args(parallel_export, monkeypatch, *args)
+
+  assert parallel_export._get_index_options(parsed_args) == plug_in._get_index_options(
+    export_config(**arguments), parsed_args.format, parsed_args.compression)
@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+
+import stand_ins
+
+
+_FORMATS = ['xml', 'json', 'yaml', 'cbor', 'ndjson', 'csv']
+
+
+def _create_image():
+  # Enough layers to fill the queue of event batches several times.
+  return stand_ins.Image(
+    'image',
+    layers=[
+      stand_ins.Layer(
+        f'layer {index}',
+        filters=[stand_ins.DrawableFilter('filter', 'gegl:opacity', {'value': index / 10})])
+      for index in range(1000)],
+    paths=[stand_ins.Path('path', strokes=[[0.0, 1.0, 2.0, 3.0]])])
+
+
+def _read_bytes(filepath):
+  with open(filepath, 'rb') as f:
+    return f.read()
+
+
+class _EventRecorder:
+
+  def __init__(self, fail_after=None):
+    self.events = []
+    self.thread_names = set()
+
+    self._fail_after = fail_after
+
+  def start_map(self, key, length):
+    self._add_event('start_map', key, length)
+
+  def end_map(self):
+    self._add_event('end_map')
+
+  def start_list(self, key, length):
+    self._add_event('start_list', key, length)
+
+  def end_list(self):
+    self._add_event('end_list')
+
+  def scalar(self, key, value):
+    self._add_event('scalar', key, value)
+
+  def _add_event(self, *event):
+    if self._fail_after is not None and len(self.events) >= self._fail_after:
+      raise ValueError('sink failed')
+
+    self.events.append(event)
+    self.thread_names.add(threading.current_thread().name)
+
+
+@pytest.mark.parametrize('file_format', _FORMATS)
+def test_pipelined_output_matches_output(export_file, file_format):
+  filepath = export_file(_create_image(), file_format)
+  pipelined_filepath = export_file(
+    _create_image(), file_format, f'pipelined.{file_format}', pipelined=True)
+
+  assert _read_bytes(pipelined_filepath) == _read_bytes(filepath)
+
+
+def test_events_are_forwarded_in_order_from_writer_thread(plug_in):
+  expected_sink = _EventRecorder()
+  plug_in._traverse(plug_in._get_image_attributes(_create_image()), expected_sink)
+
+  sink = _EventRecorder()
+  with plug_in._PipelinedSink(sink) as pipelined_sink:
+    plug_in._traverse(plug_in._get_image_attributes(_create_image()), pipelined_sink)
+
+  assert len(sink.events) > plug_in._PIPELINE_BATCH_SIZE * plug_in._PIPELINE_MAX_BATCHES
+  assert sink.events == expected_sink.events
+  assert sink.thread_names == {'writer'}
+
+
+@pytest.mark.parametrize('fail_after', [0, 10, 20000])
+def test_writer_error_is_raised_in_calling_thread(plug_in, fail_after):
+  sink = _EventRecorder(fail_after)
+
+  with pytest.raises(ValueError, match='sink failed'):
+    with plug_in._PipelinedSink(sink) as pipelined_sink:
+      plug_in._traverse(plug_in._get_image_attributes(_create_image()), pipelined_sink)
+
+  assert len(sink.events) == fail_after
+
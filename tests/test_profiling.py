@@ -0,0 +1,84 @@
+import json
+import os
+
+import stand_ins
+import profiling
+
+
+def _create_image():
+  return stand_ins.Image(
+    'image',
+    layers=[
+      stand_ins.GroupLayer(
+        'group',
+        children=[
+          stand_ins.Layer(
+            'layer',
+            filters=[stand_ins.DrawableFilter('filter', 'gegl:opacity', {'value': 0.5})]),
+        ]),
+    ],
+    paths=[stand_ins.Path('path', strokes=[[0.0, 1.0], [2.0, 3.0]])])
+
+
+def _read_profile(filepath):
+  with open(filepath, 'r', encoding='utf-8') as f:
+    return json.load(f)
+
+
+def test_profile_is_saved_next_to_output(export_file):
+  filepath = export_file(_create_image(), 'json', profile=True)
+
+  profile = _read_profile(filepath + '.profile.json')
+
+  assert profile['name'] == 'image.json'
+  assert {'export', 'attribute gathering', 'file write', 'serialization'} <= set(
+    profile['phases'])
+  assert profile['counters']['items'] == 3
+  assert profile['counters']['filters'] == 1
+  assert profile['counters']['strokes'] == 2
+  assert profile['counters']['bytes written'] == os.path.getsize(filepath)
+  assert profile['calls']['GroupLayer.opacity']['count'] == 1
+  assert profile['calls']['Layer.opacity']['count'] == 1
+
+
+def test_calls_are_sorted_by_duration():
+  profile = profiling.Profile('name')
+  profile.calls = {'short': [5, 1.0], 'long': [1, 2.0]}
+
+  assert list(profile.to_dict()['calls']) == ['long', 'short']
+
+
+def test_profile_is_not_saved_by_default(export_file):
+  filepath = export_file(_create_image(), 'json')
+
+  assert not os.path.exists(filepath + '.profile.json')
+  assert profiling.get_active() is None
+
+
+def test_profile_is_enabled_by_environment_variable(export_file, monkeypatch):
+  monkeypatch.setenv(profiling.ENVIRONMENT_VARIABLE, '1')
+
+  filepath = export_file(_create_image(), 'json')
+
+  assert os.path.exists(filepath + '.profile.json')
+  assert profiling.get_active() is None
+
+
+def test_batch_profile_is_saved_to_output_directory(plug_in, export_config, tmp_path):
+  image = _create_image()
+  image.get_file = lambda: stand_ins.File('/images/image.xcf')
+  config = export_config(
+    images=[image],
+    output_directory=str(tmp_path),
+    file_format='json,yaml',
+    filename_pattern='{name}',
+    compression='',
+    profile=True)
+
+  assert plug_in.plug_in_image_attribute_export_batch(None, config, None) is None
+
+  profile = _read_profile(tmp_path / 'image-attribute-export-profile.json')
+
+  assert profile['name'] == 'batch'
+  assert profile['counters']['bytes written'] == (
+    os.path.getsize(tmp_path / 'image.json') + os.path.getsize(tmp_path / 'image.yaml'))
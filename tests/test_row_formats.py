@@ -0,0 +1,59 @@
+import csv
+import json
+
+import pytest
+
+import stand_ins
+
+
+def _create_image():
+  return stand_ins.Image(
+    'image',
+    layers=[
+      stand_ins.GroupLayer('group', children=[stand_ins.Layer('child')]),
+      stand_ins.Layer(
+        'layer',
+        mask=stand_ins.LayerMask('layer-mask'),
+        filters=[stand_ins.DrawableFilter('filter', 'gegl:opacity', {'value': 0.5})]),
+    ],
+    channels=[stand_ins.Channel('channel')],
+    paths=[stand_ins.Path('path', strokes=[[0.0, 0.0, 1.0, 1.0]])])
+
+
+def test_ndjson_rows_follow_their_items_in_depth_first_order(export_file):
+  with open(export_file(_create_image(), 'ndjson'), 'r', encoding='utf-8') as f:
+    rows = [json.loads(line) for line in f]
+
+  assert [(row['kind'], row['path'], row['parent_path'], row['depth']) for row in rows] == [
+    ('layer', 'layers.0', '', 0),
+    ('layer', 'layers.0.children.0', 'layers.0', 1),
+    ('layer', 'layers.1', '', 0),
+    ('filter', 'layers.1.filters.0', 'layers.1', 1),
+    ('mask', 'layers.1.mask', 'layers.1', 1),
+    ('channel', 'channels.0', '', 0),
+    ('path', 'paths.0', '', 0),
+  ]
+  assert {row['image'] for row in rows} == {'image'}
+  assert rows[3]['parameters'] == {'value': 0.5}
+  assert rows[6]['strokes'] == [
+    {'id': 1, 'points_type': 'BEZIER', 'points': [0.0, 0.0, 1.0, 1.0], 'points_closed': False}]
+
+
+def test_csv_rows_have_the_same_columns(export_file):
+  with open(export_file(_create_image(), 'csv'), 'r', encoding='utf-8', newline='') as f:
+    header, *rows = csv.reader(f)
+
+  assert header[:6] == ['image', 'kind', 'path', 'parent_path', 'depth', 'index']
+  assert len(rows) == 7
+  assert all(len(row) == len(header) for row in rows)
+
+  rows = [dict(zip(header, row)) for row in rows]
+
+  assert [row['name'] for row in rows] == [
+    'group', 'child', 'layer', 'filter', 'layer-mask', 'channel', 'path']
+  assert json.loads(rows[3]['parameters']) == {'value': 0.5}
+
+
+def test_row_sink_requires_row_writer(plug_in):
+  with pytest.raises(TypeError):
+    plug_in._RowSink(None, plug_in._DEFAULT_FORMAT_OPTIONS)
@@ -0,0 +1,69 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import stand_ins
+
+
+_TOOLS_DIRPATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tools')
+
+_LOAD_PLUG_IN_CODE = """
+import json
+import sys
+
+sys.path.insert(0, {tools_dirpath!r})
+import stand_ins
+
+stand_ins.load_plug_in()
+
+print(json.dumps(sorted(sys.modules)))
+"""
+
+_LAZILY_IMPORTED_MODULES = ['bz2', 'csv', 'export_index', 'gzip', 'lzma', 'queue', 'threading']
+
+
+@pytest.fixture(scope='module')
+def modules_loaded_at_startup():
+  process = subprocess.run(
+    [sys.executable, '-c', _LOAD_PLUG_IN_CODE.format(tools_dirpath=_TOOLS_DIRPATH)],
+    stdout=subprocess.PIPE, check=True, encoding='utf-8')
+
+  return set(json.loads(process.stdout))
+
+
+@pytest.mark.parametrize('module_name', _LAZILY_IMPORTED_MODULES)
+def test_modules_are_not_imported_at_startup(modules_loaded_at_startup, module_name):
+  assert 'profiling' in modules_loaded_at_startup
+  assert module_name not in modules_loaded_at_startup
+
+
+def _create_image():
+  return stand_ins.Image(
+    'image',
+    layers=[
+      stand_ins.Layer(
+        'layer', filters=[stand_ins.DrawableFilter('filter', 'gegl:opacity', {'value': 0.5})]),
+    ])
+
+
+@pytest.fixture
+def init_gegl_calls(plug_in, monkeypatch):
+  calls = []
+  monkeypatch.setattr(plug_in.procedure, 'init_gegl', lambda: calls.append(None))
+  return calls
+
+
+def test_gegl_is_initialized_for_filter_parameters(export_json, init_gegl_calls):
+  export_json(_create_image())
+
+  assert init_gegl_calls
+
+
+def test_gegl_is_not_initialized_without_filter_parameters(export_json, init_gegl_calls):
+  export_json(_create_image(), field_mask='parameters=false')
+  export_json(stand_ins.Image('image', layers=[stand_ins.Layer('layer')]))
+
+  assert not init_gegl_calls
@@ -0,0 +1,57 @@
+import array
+import base64
+import re
+import sys
+
+import pytest
+
+import stand_ins
+
+
+_POINTS = [0.0, 1.5, -2.25, 0.1]
+
+
+def _create_image():
+  return stand_ins.Image('image', paths=[stand_ins.Path('path', strokes=[_POINTS])])
+
+
+def _decode(text, typecode):
+  values = array.array(typecode, base64.b64decode(text, validate=True))
+  if sys.byteorder == 'big':
+    values.byteswap()
+  return values.tolist()
+
+
+def _read_points_text(filepath, file_format):
+  with open(filepath, 'r', encoding='utf-8') as f:
+    text = f.read()
+
+  pattern = {
+    'json': r'"points": "([^"]*)"',
+    'yaml': r"points: '([^']*)'",
+    'xml': r'<points>([^<]*)</points>',
+  }[file_format]
+  return re.search(pattern, text).group(1)
+
+
+@pytest.mark.parametrize('file_format', ['json', 'yaml', 'xml'])
+def test_float64_points_are_decoded_exactly(export_file, file_format):
+  filepath = export_file(_create_image(), file_format, stroke_points_encoding='base64-float64')
+
+  assert _decode(_read_points_text(filepath, file_format), 'd') == _POINTS
+
+
+@pytest.mark.parametrize('file_format', ['json', 'yaml', 'xml'])
+def test_float32_points_are_decoded_as_float32(export_file, file_format):
+  filepath = export_file(_create_image(), file_format, stroke_points_encoding='base64-float32')
+
+  points = _decode(_read_points_text(filepath, file_format), 'f')
+
+  assert points == array.array('f', _POINTS).tolist()
+  assert points != _POINTS
+
+
+def test_list_encoding_writes_numbers(export_json):
+  attributes = export_json(_create_image())
+
+  assert attributes['image']['paths'][0]['strokes'][0]['points'] == _POINTS
@@ -0,0 +1,78 @@
+import xml.etree.ElementTree as ET
+
+import stand_ins
+
+
+def _create_image(layer_name='layer'):
+  return stand_ins.Image(
+    'image',
+    layers=[
+      stand_ins.GroupLayer('group', children=[stand_ins.Layer(layer_name)]),
+      stand_ins.GroupLayer('empty-group'),
+    ],
+    paths=[stand_ins.Path('path', strokes=[[0.0, 1.5]])])
+
+
+def _read(filepath):
+  with open(filepath, 'r', encoding='utf-8') as f:
+    return f.read()
+
+
+def test_nested_attributes_are_written_as_elements(export_file):
+  text = _read(
+    export_file(_create_image(), 'xml', field_mask='*=false,name,visible,children,points'))
+
+  assert text == """\
+<image>
+    <name>image</name>
+    <layers>
+        <item>
+            <name>group</name>
+            <visible>True</visible>
+            <children>
+                <item>
+                    <name>layer</name>
+                    <visible>True</visible>
+                </item>
+            </children>
+        </item>
+        <item>
+            <name>empty-group</name>
+            <visible>True</visible>
+            <children>
+            </children>
+        </item>
+    </layers>
+    <paths>
+        <item>
+            <name>path</name>
+            <visible>True</visible>
+            <strokes>
+                <item>
+                    <points>
+                        <item>0.0</item>
+                        <item>1.5</item>
+                    </points>
+                </item>
+            </strokes>
+        </item>
+    </paths>
+</image>"""
+
+
+def test_special_characters_are_escaped(export_file):
+  name = 'a < b & c > d "e" \'f\' é中'
+
+  root = ET.parse(export_file(_create_image(name), 'xml')).getroot()
+
+  assert root.find('layers/item/children/item/name').text == name
+
+
+def test_xml_contains_the_same_item_names_as_json(export_file, export_json):
+  root = ET.parse(export_file(_create_image(), 'xml')).getroot()
+  attributes = export_json(_create_image())['image']
+
+  assert [element.text for element in root.iterfind('layers/item/name')] == [
+    layer['name'] for layer in attributes['layers']]
+  assert [element.text for element in root.iterfind('layers/item/offsets/item')] == [
+    str(value) for layer in attributes['layers'] for value in layer['offsets']]
@@ -0,0 +1,82 @@
+import pytest
+
+import stand_ins
+
+
+def _create_image():
+  return stand_ins.Image(
+    'image',
+    layers=[
+      stand_ins.GroupLayer('group', children=[stand_ins.Layer('child')]),
+      stand_ins.GroupLayer('empty-group'),
+      stand_ins.Layer('layer', mask=stand_ins.LayerMask('layer-mask')),
+    ],
+    channels=[stand_ins.Channel('channel')],
+    paths=[stand_ins.Path('path', strokes=[[0.0, 1.5, 2.0, 3.25]])])
+
+
+def _read(filepath):
+  with open(filepath, 'r', encoding='utf-8') as f:
+    return f.read()
+
+
+def test_nested_attributes_are_written_depth_first(export_file):
+  text = _read(
+    export_file(_create_image(), 'yaml', field_mask='*=false,name,visible,children,points'))
+
+  assert text == """\
+name: 'image'
+layers:
+- item:
+    name: 'group'
+    visible: true
+    children:
+    - item:
+        name: 'child'
+        visible: true
+- item:
+    name: 'empty-group'
+    visible: true
+    children: []
+- item:
+    name: 'layer'
+    visible: true
+    mask:
+        name: 'layer-mask'
+        visible: true
+channels:
+- item:
+    name: 'channel'
+    visible: true
+paths:
+- item:
+    name: 'path'
+    visible: true
+    strokes:
+    - item:
+        points:
+        - 0.0
+        - 1.5
+        - 2.0
+        - 3.25
+"""
+
+
+def _unwrap_list_items(value):
+  if isinstance(value, dict):
+    return {key: _unwrap_list_items(element) for key, element in value.items()}
+  elif isinstance(value, list):
+    return [
+      _unwrap_list_items(element['item'] if isinstance(element, dict) else element)
+      for element in value]
+  else:
+    return value
+
+
+def test_yaml_contains_the_same_attributes_as_json(export_file, export_json):
+  yaml = pytest.importorskip('yaml')
+
+  with open(export_file(_create_image(), 'yaml'), 'r', encoding='utf-8') as f:
+    attributes = yaml.safe_load(f)
+
+  assert _unwrap_list_items(attributes) == export_json(_create_image())['image']
@@ -0,0 +1,454 @@
+#!/usr/bin/env python
+
+"""Benchmarks exports of the Image Attribute Export plug-in outside GIMP.
+
+GIMP objects are replaced with lightweight stand-ins implementing the methods
+called by the plug-in when obtaining attributes. Synthetic images of several
+kinds (scenarios) are exported via the export procedures of the plug-in, each
+export is timed (the best of several runs is taken) and its peak memory usage
+is measured via `tracemalloc` in a separate run.
+
+The results are compared with stored baselines. If the duration or the peak
+memory usage of any export exceeds its baseline by more than the specified
+threshold, the script exits with a non-zero code.
+
+As the stand-ins return attribute values immediately, the durations include
+only the overhead of the plug-in itself (traversal, serialization, compression
+and writing), not the cost of calls to GIMP.
+
+The startup of the plug-in is benchmarked as well by loading the plug-in in
+fresh Python processes (the best of several runs is taken). The startup
+duration includes importing modules and registering procedures, not the
+loading of GObject introspection data or initializing GIMP libraries.
+
+Example:
+
+  python benchmark.py --formats json yaml --repeat 5
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import stand_ins
+
+
+_DEFAULT_BASELINES_FILEPATH = os.path.join(
+  os.path.dirname(os.path.abspath(__file__)), 'benchmark-baselines.json')
+
+_FORMATS = ['xml', 'json', 'yaml', 'cbor', 'ndjson', 'csv']
+_DEFAULT_FORMATS = ['xml', 'json', 'yaml']
+
+_METRICS = ['seconds', 'peak_memory_bytes']
+
+_STARTUP_CODE = """
+import json
+import sys
+import time
+
+initial_module_names = set(sys.modules)
+
+sys.path.insert(0, {tools_dirpath!r})
+import stand_ins
+
+stand_ins.install_modules()
+
+# Unload modules imported by the stand-ins module (except the stand-ins
+# lacking a module spec) so that importing them by the plug-in is measured.
+for module_name in set(sys.modules) - initial_module_names:
+  if getattr(sys.modules[module_name], '__spec__', None) is not None:
+    del sys.modules[module_name]
+
+module_names = set(sys.modules)
+
+start_time = time.perf_counter()
+stand_ins.import_plug_in()
+seconds = time.perf_counter() - start_time
+
+print(json.dumps({{'seconds': seconds, 'modules': len(set(sys.modules) - module_names)}}))
+"""
+
+
+# Synthetic images
+
+_FILTER_OPERATIONS = {
+  'gegl:gaussian-blur': lambda index: {
+    'std-dev-x': 1.5 + index / 3,
+    'std-dev-y': 1.5 + index / 3,
+    'filter': stand_ins.GaussianBlurFilter.AUTO,
+    'abyss-policy': 'clamp',
+    'clip-extent': True,
+  },
+  'gegl:dropshadow': lambda index: {
+    'x': 20.0 / (index + 1),
+    'y': 20.0 / (index + 1),
+    'radius': 10.0 + index,
+    'grow-shape': 'circle',
+    'grow-radius': index % 5,
+    'color': stand_ins.Color((0.0, 0.0, 0.0, 1.0)),
+    'opacity': 0.5 + index / 100,
+  },
+  'gegl:color-overlay': lambda index: {
+    'value': stand_ins.Color((index / 20, 0.25, 1 / 3, 1.0)),
+    'srgb': False,
+  },
+  'gegl:levels': lambda index: {
+    'in-low': 0.01 * index,
+    'in-high': 1.0 - 0.01 * index,
+    'out-low': 0.0,
+    'out-high': 1.0,
+  },
+  'gegl:unsharp-mask': lambda index: {
+    'std-dev': 3.0 + index / 7,
+    'scale': 0.5,
+    'threshold': 0.05,
+  },
+}
+
+
+def _create_flat_layers_image():
+  """10,000 top-level layers, every tenth layer having a mask."""
+  layers = [
+    stand_ins.Layer(
+      f'Layer {index}',
+      offsets=(index % 1920, index % 1080),
+      opacity=100.0 - (index % 100) / 3,
+      visible=index % 7 != 0,
+      color_tag=list(stand_ins.ColorTag)[index % len(stand_ins.ColorTag)],
+      mask=stand_ins.LayerMask(f'Layer {index} mask') if index % 10 == 0 else None,
+    )
+    for index in range(10000)]
+
+  return stand_ins.Image('flat-layers', layers=layers, channels=_create_channels())
+
+
+def _create_deep_groups_image():
+  """Group layers nested 50 levels deep, each level containing 20 layers."""
+  group = None
+
+  for depth in reversed(range(50)):
+    children = [stand_ins.Layer(f'Layer {depth}-{index}', offsets=(depth, index)) for index in range(20)]
+    if group is not None:
+      children.insert(0, group)
+
+    group = stand_ins.GroupLayer(f'Group {depth}', children=children)
+
+  return stand_ins.Image('deep-groups', layers=[group], channels=_create_channels())
+
+
+def _create_heavy_filters_image():
+  """500 layers, each having 20 filters with several parameters."""
+  operation_names = list(_FILTER_OPERATIONS)
+
+  layers = []
+  for layer_index in range(500):
+    filters = []
+    for filter_index in range(20):
+      operation_name = operation_names[(layer_index + filter_index) % len(operation_names)]
+      filters.append(
+        stand_ins.DrawableFilter(
+          f'Filter {filter_index}',
+          operation_name,
+          _FILTER_OPERATIONS[operation_name](filter_index),
+          opacity=1.0 - filter_index / 40,
+        ))
+
+    layers.append(stand_ins.Layer(f'Layer {layer_index}', filters=filters))
+
+  return stand_ins.Image('heavy-filters', layers=layers, channels=_create_channels())
+
+
+def _create_large_paths_image():
+  """10 paths with 1,000,000 points in total, split into strokes of 1,000
+  points.
+  """
+  random_ = random.Random(0)
+
+  paths = []
+  for path_index in range(10):
+    strokes = []
+    for _stroke_index in range(100):
+      strokes.append([random_.uniform(0.0, 4096.0) for _unused in range(2 * 1000)])
+
+    paths.append(stand_ins.Path(f'Path {path_index}', strokes=strokes))
+
+  return stand_ins.Image('large-paths', layers=[stand_ins.Layer('Background')], paths=paths)
+
+
+def _create_incremental_edit_image():
+  """The ``flat-layers`` image exported incrementally, renaming one layer
+  before each export.
+  """
+  image = _create_flat_layers_image()
+  image._name = 'incremental-edit'
+
+  return image
+
+
+def _edit_first_layer(image):
+  layer = image._layers[0]
+  layer._name = 'Layer 0' if layer._name != 'Layer 0' else 'Layer 0 (edited)'
+
+
+def _create_channels():
+  return [
+    stand_ins.Channel(f'Channel {index}', color=(index / 5, 0.5, 1 - index / 5, 1.0)) for index in range(5)]
+
+
+_SCENARIOS = {
+  'flat-layers': _create_flat_layers_image,
+  'deep-groups': _create_deep_groups_image,
+  'heavy-filters': _create_heavy_filters_image,
+  'large-paths': _create_large_paths_image,
+  'incremental-edit': _create_incremental_edit_image,
+}
+
+# Export arguments overriding the defaults in specific scenarios.
+_SCENARIO_ARGUMENTS = {
+  'incremental-edit': {'incremental-mode': 'delta'},
+}
+
+# Functions modifying the image of specific scenarios before each export.
+# Such scenarios are exported once before the timed runs so that subsequent
+# exports can reuse the results of the previous export.
+_SCENARIO_EDIT_FUNCS = {
+  'incremental-edit': _edit_first_layer,
+}
+
+
+# Benchmark
+
+def main():
+  args = _parse_args()
+
+  plug_in = stand_ins.load_plug_in()
+
+  default_arguments = {**stand_ins.get_default_arguments(plug_in), 'pipelined': args.pipelined}
+
+  baselines = _load_baselines(args.baselines)
+
+  results = {}
+  regressions = []
+
+  if args.startup:
+    result = _benchmark_startup(args.repeat)
+    results['startup'] = result
+
+    baseline = baselines.get('startup')
+    result_regressions = _get_regressions(result, baseline, args.threshold)
+    regressions.extend(f'startup: {regression}' for regression in result_regressions)
+
+    _print_startup_result(result, baseline, bool(result_regressions))
+
+  with tempfile.TemporaryDirectory() as temp_dirpath:
+    for scenario in args.scenarios:
+      image = _SCENARIOS[scenario]()
+      config = stand_ins.Config({**default_arguments, **_SCENARIO_ARGUMENTS.get(scenario, {})})
+
+      for file_format in args.formats:
+        result = _benchmark_export(
+          plug_in, image, config, file_format, temp_dirpath, args.repeat, args.memory,
+          _SCENARIO_EDIT_FUNCS.get(scenario))
+        results.setdefault(scenario, {})[file_format] = result
+
+        baseline = baselines.get(scenario, {}).get(file_format)
+        result_regressions = _get_regressions(result, baseline, args.threshold)
+        regressions.extend(
+          f'{scenario}/{file_format}: {regression}' for regression in result_regressions)
+
+        _print_result(scenario, file_format, result, baseline, bool(result_regressions))
+
+  if args.save_baselines:
+    for scenario, scenario_results in results.items():
+      if scenario == 'startup':
+        baselines[scenario] = scenario_results
+      else:
+        baselines.setdefault(scenario, {}).update(scenario_results)
+
+    with open(args.baselines, 'w', encoding='utf-8') as f:
+      json.dump(baselines, f, indent=2, sort_keys=True)
+      f.write('\n')
+
+    print(f'Baselines saved to "{args.baselines}"')
+    return 0
+
+  if regressions:
+    print(
+      f'\n{len(regressions)} regression(s) exceeding {args.threshold:.0%}:\n'
+      + '\n'.join(regressions),
+      file=sys.stderr)
+    return 2
+
+  return 0
+
+
+def _parse_args():
+  parser = argparse.ArgumentParser(
+    description='Benchmark exports of synthetic images using stand-ins for GIMP objects.')
+
+  parser.add_argument(
+    '--scenarios', nargs='+', choices=list(_SCENARIOS), default=list(_SCENARIOS),
+    help='synthetic images to export (default: all)')
+  parser.add_argument(
+    '--formats', nargs='+', choices=_FORMATS, default=_DEFAULT_FORMATS,
+    help=f'file formats to export to (default: {" ".join(_DEFAULT_FORMATS)})')
+  parser.add_argument(
+    '--repeat', type=int, default=3,
+    help='number of timed runs per export, the fastest run is taken (default: 3)')
+  parser.add_argument(
+    '--no-memory', dest='memory', action='store_false',
+    help='do not measure peak memory usage')
+  parser.add_argument(
+    '--no-startup', dest='startup', action='store_false',
+    help='do not benchmark the plug-in startup')
+  parser.add_argument(
+    '--pipelined', action='store_true',
+    help='export with the "pipelined" export argument enabled')
+  parser.add_argument(
+    '--threshold', type=float, default=0.25,
+    help=('maximum allowed relative increase of duration or peak memory usage over the baseline'
+          ' (default: 0.25)'))
+  parser.add_argument(
+    '--baselines', default=_DEFAULT_BASELINES_FILEPATH,
+    help='path to the baselines file (default: benchmark-baselines.json next to this script)')
+  parser.add_argument(
+    '--save-baselines', action='store_true',
+    help='save the results as new baselines instead of comparing them with the baselines')
+
+  args = parser.parse_args()
+
+  if args.repeat < 1:
+    parser.error('--repeat must be at least 1')
+
+  if args.threshold < 0:
+    parser.error('--threshold must not be negative')
+
+  return args
+
+
+def _benchmark_export(
+      plug_in, image, config, file_format, output_dirpath, repeat, measure_memory,
+      edit_func=None):
+  output_filepath = os.path.join(output_dirpath, f'{image.get_name()}.{file_format}')
+  export_func = getattr(plug_in, f'file_{file_format}_export')
+
+  def _export():
+    if edit_func is not None:
+      edit_func(image)
+
+    return_values = export_func(
+      None, stand_ins.RunMode.NONINTERACTIVE, image, stand_ins.File(output_filepath), None, None, config, None)
+    if return_values is not None:
+      raise RuntimeError(f'export to {file_format} failed: {return_values[1]}')
+
+  if edit_func is not None:
+    _export()
+
+  seconds = []
+  for _unused in range(repeat):
+    start_time = time.perf_counter()
+    _export()
+    seconds.append(time.perf_counter() - start_time)
+
+  # Incremental exports may write a patch file instead of or besides the output.
+  output_filepaths = [output_filepath, output_filepath + plug_in._PATCH_FILE_SUFFIX]
+
+  result = {
+    'seconds': min(seconds),
+    'output_bytes': sum(
+      os.path.getsize(filepath) for filepath in output_filepaths if os.path.exists(filepath)),
+  }
+
+  if measure_memory:
+    tracemalloc.start()
+    try:
+      _export()
+      result['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+    finally:
+      tracemalloc.stop()
+
+  return result
+
+
+def _benchmark_startup(repeat):
+  """Loads the plug-in in ``repeat`` fresh Python processes and returns the
+  shortest duration and the number of modules imported by the plug-in.
+  """
+  code = _STARTUP_CODE.format(tools_dirpath=os.path.dirname(os.path.abspath(__file__)))
+
+  runs = []
+  for _unused in range(repeat):
+    process = subprocess.run(
+      [sys.executable, '-c', code], stdout=subprocess.PIPE, check=True, encoding='utf-8')
+    runs.append(json.loads(process.stdout))
+
+  return {
+    'seconds': min(run['seconds'] for run in runs),
+    'modules': runs[-1]['modules'],
+  }
+
+
+def _load_baselines(filepath):
+  try:
+    with open(filepath, 'r', encoding='utf-8') as f:
+      return json.load(f)
+  except FileNotFoundError:
+    return {}
+
+
+def _get_regressions(result, baseline, threshold):
+  if baseline is None:
+    return []
+
+  regressions = []
+
+  for metric in _METRICS:
+    if metric in result and metric in baseline and baseline[metric] > 0:
+      ratio = result[metric] / baseline[metric]
+      if ratio > 1 + threshold:
+        regressions.append(
+          f'{metric} {result[metric]:.6g} vs. baseline {baseline[metric]:.6g} ({ratio - 1:+.0%})')
+
+  return regressions
+
+
+def _print_result(scenario, file_format, result, baseline, has_regression):
+  line = f'{scenario:<14} {file_format:<7} {result["seconds"]:8.3f} s'
+
+  if 'peak_memory_bytes' in result:
+    line += f' {result["peak_memory_bytes"] / 1024 / 1024:9.2f} MiB peak'
+
+  line += f' {result["output_bytes"] / 1024 / 1024:9.2f} MiB output'
+
+  if baseline is not None and baseline.get('seconds'):
+    line += f'  ({result["seconds"] / baseline["seconds"] - 1:+.0%} time'
+    if 'peak_memory_bytes' in result and baseline.get('peak_memory_bytes'):
+      line += f', {result["peak_memory_bytes"] / baseline["peak_memory_bytes"] - 1:+.0%} memory'
+    line += ')'
+
+  if has_regression:
+    line += '  REGRESSION'
+
+  print(line, flush=True)
+
+
+def _print_startup_result(result, baseline, has_regression):
+  line = f'{"startup":<22} {result["seconds"]:8.3f} s {result["modules"]:9d} modules imported'
+
+  if baseline is not None and baseline.get('seconds'):
+    line += f'  ({result["seconds"] / baseline["seconds"] - 1:+.0%} time)'
+
+  if has_regression:
+    line += '  REGRESSION'
+
+  print(line, flush=True)
+
+
+if __name__ == '__main__':
+  sys.exit(main())
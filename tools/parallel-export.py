@@ -0,0 +1,365 @@
+#!/usr/bin/env python
+
+"""Exports attributes of image files in a directory using multiple headless GIMP
+processes running in parallel.
+
+Files are split into shards of roughly equal total size, one shard per GIMP
+process. Each process loads its files and exports their attributes via the
+export procedures of the Image Attribute Export plug-in. Once all processes
+finish, a manifest listing outputs, export durations and failures is written.
+
+If an export index file is specified, files unchanged since their previous
+export with the same options are skipped without starting GIMP.
+
+The plug-in must be installed in GIMP used to run this script.
+
+Example:
+
+  python parallel-export.py path/to/images path/to/output --format json --jobs 8
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(
+  0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'image-attribute-export'))
+
+import export_index
+import export_options
+
+
+_WORKER_CODE = """
+import json
+import time
+
+import gi
+gi.require_version('Gimp', '3.0')
+from gi.repository import Gimp
+from gi.repository import Gio
+
+with open({shard_filepath!r}, 'r', encoding='utf-8') as shard_file:
+  shard = json.load(shard_file)
+
+pdb = Gimp.get_pdb()
+procedure_name = shard['procedure_name']
+
+if shard['resident']:
+  resident_procedure = pdb.lookup_procedure('plug-in-image-attribute-export-resident')
+  resident_procedure.run(resident_procedure.create_config())
+  procedure_name += '-resident'
+
+export_procedure = pdb.lookup_procedure(procedure_name)
+
+with open(shard['results_filepath'], 'a', encoding='utf-8') as results_file:
+  for source_filepath, output_filepath in shard['files']:
+    start_time = time.perf_counter()
+    error = None
+
+    try:
+      image = Gimp.file_load(Gimp.RunMode.NONINTERACTIVE, Gio.File.new_for_path(source_filepath))
+
+      try:
+        config = export_procedure.create_config()
+        config.set_property('run-mode', Gimp.RunMode.NONINTERACTIVE)
+        config.set_property('image', image)
+        config.set_property('file', Gio.File.new_for_path(output_filepath))
+        for name, value in shard['options'].items():
+          config.set_property(name, value)
+
+        result = export_procedure.run(config)
+        status = result.index(0)
+        if status != Gimp.PDBStatusType.SUCCESS:
+          error = status.value_nick
+          if result.length() > 1 and result.index(1) is not None:
+            error += ': ' + str(result.index(1))
+      finally:
+        image.delete()
+    except Exception as e:
+      error = str(e)
+
+    results_file.write(json.dumps({{
+      'source': source_filepath,
+      'output': output_filepath if error is None else None,
+      'seconds': time.perf_counter() - start_time,
+      'error': error,
+    }}) + '\\n')
+    results_file.flush()
+"""
+
+
+def main():
+  args = _parse_args()
+
+  source_filepaths = _find_files(args.input_directory, args.pattern, args.recursive)
+  if not source_filepaths:
+    print(f'No files matching "{args.pattern}" found in "{args.input_directory}"', file=sys.stderr)
+    return 1
+
+  os.makedirs(args.output_directory, exist_ok=True)
+
+  files = [
+    (filepath, _get_output_filepath(
+      filepath, args.input_directory, args.output_directory, args.format, args.compression))
+    for filepath in source_filepaths]
+
+  start_time = time.perf_counter()
+
+  entries = []
+
+  if args.index is not None:
+    index = export_index.ExportIndex(args.index)
+    index_options = _get_index_options(args)
+
+    files_to_export = []
+    for source_filepath, output_filepath in files:
+      if index.reuse_output(source_filepath, index_options, output_filepath):
+        entries.append({
+          'source': os.path.abspath(source_filepath),
+          'output': output_filepath,
+          'seconds': 0.0,
+          'error': None,
+          'skipped': True,
+        })
+      else:
+        export_index.unlink_hard_link(output_filepath)
+        files_to_export.append((source_filepath, output_filepath))
+
+    files = files_to_export
+  else:
+    index = None
+    index_options = None
+
+  shards = _split_into_shards(files, args.jobs)
+
+  with tempfile.TemporaryDirectory() as temp_dirpath:
+    workers = [
+      _start_worker(shard, shard_index, temp_dirpath, args)
+      for shard_index, shard in enumerate(shards)]
+
+    for shard, (worker_process, results_filepath) in zip(shards, workers):
+      returncode = worker_process.wait()
+      worker_entries = _get_worker_results(shard, results_filepath, returncode)
+
+      if index is not None:
+        for entry in worker_entries:
+          if entry['error'] is None:
+            index.add(entry['source'], index_options, entry['output'])
+
+      entries.extend(worker_entries)
+
+  manifest = {
+    'format': args.format,
+    'num_files': len(entries),
+    'num_failed': sum(1 for entry in entries if entry['error'] is not None),
+    'num_skipped': sum(1 for entry in entries if entry.get('skipped')),
+    'num_workers': len(shards),
+    'seconds': time.perf_counter() - start_time,
+    'files': entries,
+  }
+
+  manifest_filepath = (
+    args.manifest if args.manifest is not None
+    else os.path.join(args.output_directory, 'manifest.json'))
+
+  with open(manifest_filepath, 'w', encoding='utf-8') as f:
+    json.dump(manifest, f, indent=2)
+
+  print(
+    f'Exported {manifest["num_files"] - manifest["num_failed"]} of {manifest["num_files"]} files'
+    f' ({manifest["num_skipped"]} unchanged) in {manifest["seconds"]:.2f} s,'
+    f' manifest saved to "{manifest_filepath}"')
+
+  return 0 if manifest['num_failed'] == 0 else 2
+
+
+def _parse_args():
+  parser = argparse.ArgumentParser(
+    description='Export image attributes of files in a directory using parallel GIMP processes.')
+
+  parser.add_argument('input_directory', help='directory containing image files')
+  parser.add_argument('output_directory', help='directory to save exported files to')
+  parser.add_argument(
+    '--format', choices=['xml', 'json', 'yaml', 'cbor', 'ndjson', 'csv'], default='json', help='output file format')
+  parser.add_argument(
+    '--compression', choices=['gz', 'bz2', 'xz'], default=None,
+    help='compress output files, appending the compression to the file extension (e.g. ".json.gz")')
+  parser.add_argument(
+    '--jobs', '-j', type=int, default=os.cpu_count() or 1,
+    help='number of GIMP processes to run in parallel (default: number of CPUs)')
+  parser.add_argument(
+    '--pattern', default='*.xcf', help='pattern of filenames to export (default: *.xcf)')
+  parser.add_argument(
+    '--recursive', '-r', action='store_true', help='search for files in subdirectories')
+  parser.add_argument(
+    '--gimp', default='gimp', help='GIMP executable to run (default: gimp)')
+  parser.add_argument(
+    '--index', default=None,
+    help=('path to an export index file; files unchanged since their previous export'
+          ' with the same options are skipped'))
+  parser.add_argument(
+    '--manifest', default=None,
+    help='path to the manifest file (default: manifest.json in the output directory)')
+
+  parser.add_argument('--field-mask', default=None, help='see the "field-mask" export argument')
+  parser.add_argument('--max-depth', type=int, default=None, help='see the "max-depth" export argument')
+  parser.add_argument(
+    '--root-layer-path', default=None, help='see the "root-layer-path" export argument')
+  parser.add_argument(
+    '--visible-only', action='store_true', default=None, help='see the "visible-only" export argument')
+  parser.add_argument('--color-tags', default=None, help='see the "color-tags" export argument')
+  parser.add_argument('--name-pattern', default=None, help='see the "name-pattern" export argument')
+  parser.add_argument(
+    '--stroke-points-encoding', choices=['list', 'base64-float64', 'base64-float32'], default=None,
+    help='see the "stroke-points-encoding" export argument')
+  parser.add_argument(
+    '--float-precision', default=None, help='see the "float-precision" export argument')
+  parser.add_argument(
+    '--compression-level', type=int, default=None, help='see the "compression-level" export argument')
+  parser.add_argument(
+    '--pipelined', action='store_true', help='see the "pipelined" export argument')
+  parser.add_argument(
+    '--resident', action='store_true',
+    help=('export all files of each GIMP process via a single resident plug-in process'
+          ' (see "plug-in-image-attribute-export-resident")'))
+  parser.add_argument(
+    '--profile', action='store_true',
+    help='save a profile of each export next to the output file (see the "profile" export argument)')
+
+  args = parser.parse_args()
+
+  if args.jobs < 1:
+    parser.error('--jobs must be at least 1')
+
+  return args
+
+
+def _get_export_options(args):
+  return {
+    option_name: getattr(args, option_name.replace('-', '_'))
+    for option_name in export_options.DEFAULTS
+    if getattr(args, option_name.replace('-', '_')) is not None
+  }
+
+
+def _get_index_options(args):
+  return export_options.get_index_options(
+    {**export_options.DEFAULTS, **_get_export_options(args)}, args.format, args.compression)
+
+
+def _find_files(input_dirpath, pattern, recursive):
+  filepaths = []
+
+  for dirpath, dirnames, filenames in os.walk(input_dirpath):
+    filepaths.extend(
+      os.path.join(dirpath, filename) for filename in fnmatch.filter(filenames, pattern))
+
+    if not recursive:
+      break
+
+  return sorted(filepaths)
+
+
+def _get_output_filepath(source_filepath, input_dirpath, output_dirpath, file_format, compression):
+  relative_filepath = os.path.relpath(source_filepath, input_dirpath)
+  extension = file_format if compression is None else f'{file_format}.{compression}'
+  output_filepath = os.path.join(
+    output_dirpath, os.path.splitext(relative_filepath)[0] + '.' + extension)
+
+  os.makedirs(os.path.dirname(output_filepath), exist_ok=True)
+
+  return os.path.abspath(output_filepath)
+
+
+def _split_into_shards(files, num_shards):
+  """Splits ``files`` into at most ``num_shards`` lists of roughly equal total
+  file size.
+
+  The largest files are assigned first, each to the shard with the smallest
+  total size so far.
+  """
+  shards = [[] for _unused in range(min(num_shards, len(files)))]
+  shard_sizes = [0] * len(shards)
+
+  for source_filepath, output_filepath in sorted(
+        files, key=lambda file_: os.path.getsize(file_[0]), reverse=True):
+    shard_index = shard_sizes.index(min(shard_sizes))
+    shards[shard_index].append((os.path.abspath(source_filepath), output_filepath))
+    shard_sizes[shard_index] += os.path.getsize(source_filepath)
+
+  return shards
+
+
+def _start_worker(shard, shard_index, temp_dirpath, args):
+  shard_filepath = os.path.join(temp_dirpath, f'shard-{shard_index}.json')
+  results_filepath = os.path.join(temp_dirpath, f'results-{shard_index}.jsonl')
+
+  options = _get_export_options(args)
+  if args.pipelined:
+    options['pipelined'] = True
+  if args.profile:
+    options['profile'] = True
+
+  with open(shard_filepath, 'w', encoding='utf-8') as f:
+    json.dump(
+      {
+        'procedure_name': f'file-{args.format}-export',
+        'results_filepath': results_filepath,
+        'options': options,
+        'resident': args.resident,
+        'files': shard,
+      },
+      f)
+
+  worker_process = subprocess.Popen(
+    [
+      args.gimp,
+      '-i',
+      '--batch-interpreter=python-fu-eval',
+      '-b', _WORKER_CODE.format(shard_filepath=shard_filepath),
+      '--quit',
+    ],
+    stdin=subprocess.DEVNULL,
+  )
+
+  return worker_process, results_filepath
+
+
+def _get_worker_results(shard, results_filepath, returncode):
+  """Returns manifest entries for files in ``shard``.
+
+  Files without a result (e.g. if the GIMP process crashed) are reported as
+  failed.
+  """
+  results = {}
+
+  if os.path.isfile(results_filepath):
+    with open(results_filepath, 'r', encoding='utf-8') as f:
+      for line in f:
+        if line.strip():
+          result = json.loads(line)
+          results[result['source']] = result
+
+  entries = []
+
+  for source_filepath, _output_filepath in shard:
+    if source_filepath in results:
+      entries.append(results[source_filepath])
+    else:
+      entries.append({
+        'source': source_filepath,
+        'output': None,
+        'seconds': None,
+        'error': f'GIMP process exited with code {returncode} before exporting the file',
+      })
+
+  return entries
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,612 @@
+"""Stand-ins for GIMP objects and GObject introspection modules allowing to
+load and run the Image Attribute Export plug-in outside GIMP.
+
+The stand-ins implement the methods called by the plug-in when obtaining
+attributes and return attribute values immediately. They are used by the
+benchmark (``benchmark.py``) and the tests.
+"""
+
+import enum
+import importlib.util
+import math
+import os
+import sys
+import types
+
+
+_PLUG_IN_DIRPATH = os.path.join(
+  os.path.dirname(os.path.abspath(__file__)), '..', 'image-attribute-export')
+
+
+class _GEnum(enum.Enum):
+  pass
+
+
+class _ParamFlags(enum.IntFlag):
+  READABLE = 1
+  WRITABLE = 2
+  READWRITE = 3
+
+
+class _GLibError(Exception):
+
+  def __init__(self, message):
+    super().__init__(message)
+
+    self.message = message
+
+
+class _Cancellable:
+
+  def __init__(self):
+    self._cancelled = False
+
+  def cancel(self):
+    self._cancelled = True
+
+  def is_cancelled(self):
+    return self._cancelled
+
+
+class _FileOutputStream:
+  """Writes to a temporary file replacing the target file on `close()`."""
+
+  def __init__(self, filepath):
+    self._filepath = filepath
+    self._temp_filepath = f'{filepath}.~{os.getpid()}'
+
+    try:
+      self._file = open(self._temp_filepath, 'wb')
+    except OSError as e:
+      raise _GLibError(str(e)) from e
+
+  def write_all(self, data, cancellable):
+    if cancellable is not None and cancellable.is_cancelled():
+      raise _GLibError('Operation was cancelled')
+
+    self._file.write(data)
+
+  def close(self, cancellable):
+    if self._file.closed:
+      return
+
+    self._file.close()
+
+    if cancellable is not None and cancellable.is_cancelled():
+      os.remove(self._temp_filepath)
+      raise _GLibError('Operation was cancelled')
+
+    os.replace(self._temp_filepath, self._filepath)
+
+
+class File:
+
+  def __init__(self, filepath):
+    self._filepath = filepath
+
+  @classmethod
+  def new_for_path(cls, filepath):
+    return cls(filepath)
+
+  @classmethod
+  def new_for_uri(cls, uri):
+    return cls(uri[len('file://'):])
+
+  def get_path(self):
+    return self._filepath
+
+  def get_uri(self):
+    return f'file://{self._filepath}'
+
+  def get_basename(self):
+    return os.path.basename(self._filepath)
+
+  def get_parse_name(self):
+    return self._filepath
+
+  def replace(self, _etag, _make_backup, _flags, _cancellable):
+    return _FileOutputStream(self._filepath)
+
+
+class Color:
+
+  def __init__(self, rgba):
+    self._rgba = rgba
+
+  def get_rgba(self):
+    return self._rgba
+
+
+class ColorTag(_GEnum):
+  NONE = 0
+  BLUE = 1
+  GREEN = 2
+  YELLOW = 3
+  ORANGE = 4
+  BROWN = 5
+  RED = 6
+  VIOLET = 7
+  GRAY = 8
+
+
+class LayerMode(_GEnum):
+  NORMAL = 28
+  MULTIPLY = 30
+  SCREEN = 31
+  OVERLAY = 23
+
+
+class LayerColorSpace(_GEnum):
+  AUTO = 0
+  RGB_LINEAR = 1
+  RGB_PERCEPTUAL = 3
+
+
+class LayerCompositeMode(_GEnum):
+  AUTO = 0
+  UNION = 1
+
+
+class ImageType(_GEnum):
+  RGB_IMAGE = 0
+  RGBA_IMAGE = 1
+  GRAY_IMAGE = 2
+
+
+class ImageBaseType(_GEnum):
+  RGB = 0
+
+
+class Precision(_GEnum):
+  U8_NON_LINEAR = 150
+
+
+class PathStrokeType(_GEnum):
+  BEZIER = 0
+
+
+class GaussianBlurFilter(_GEnum):
+  AUTO = 0
+  FIR = 1
+  IIR = 2
+
+
+class PDBStatusType(_GEnum):
+  EXECUTION_ERROR = 0
+  CALLING_ERROR = 1
+  PASS_THROUGH = 2
+  SUCCESS = 3
+  CANCEL = 4
+
+
+class RunMode(_GEnum):
+  INTERACTIVE = 0
+  NONINTERACTIVE = 1
+  WITH_LAST_VALS = 2
+
+
+class PDBProcType(_GEnum):
+  INTERNAL = 0
+  PLUGIN = 1
+  PERSISTENT = 2
+  TEMPORARY = 3
+
+
+class _Unit:
+
+  def __init__(self, name):
+    self._name = name
+
+  def get_name(self):
+    return self._name
+
+
+class Item:
+
+  _next_id = 1
+
+  def __init__(self, name, visible=True, color_tag=ColorTag.NONE):
+    self._id = Item._next_id
+    Item._next_id += 1
+
+    self._name = name
+    self._visible = visible
+    self._color_tag = color_tag
+
+  def get_id(self):
+    return self._id
+
+  def get_tattoo(self):
+    return self._id
+
+  def get_name(self):
+    return self._name
+
+  def get_visible(self):
+    return self._visible
+
+  def get_color_tag(self):
+    return self._color_tag
+
+  def get_expanded(self):
+    return False
+
+  def is_group(self):
+    return False
+
+  def get_lock_content(self):
+    return False
+
+  def get_lock_position(self):
+    return False
+
+  def get_lock_visibility(self):
+    return False
+
+
+class Drawable(Item):
+
+  def __init__(self, name, width=256, height=256, offsets=(0, 0), filters=(), **kwargs):
+    super().__init__(name, **kwargs)
+
+    self._width = width
+    self._height = height
+    self._offsets = offsets
+    self._filters = list(filters)
+
+  def get_bpp(self):
+    return 4
+
+  def get_width(self):
+    return self._width
+
+  def get_height(self):
+    return self._height
+
+  def get_offsets(self):
+    return True, *self._offsets
+
+  def has_alpha(self):
+    return True
+
+  def type(self):
+    return ImageType.RGBA_IMAGE
+
+  def get_filters(self):
+    return list(self._filters)
+
+
+class Layer(Drawable):
+
+  def __init__(self, name, opacity=100.0, mode=LayerMode.NORMAL, mask=None, **kwargs):
+    super().__init__(name, **kwargs)
+
+    self._opacity = opacity
+    self._mode = mode
+    self._mask = mask
+
+  def get_apply_mask(self):
+    return self._mask is not None
+
+  def get_blend_space(self):
+    return LayerColorSpace.AUTO
+
+  def get_composite_mode(self):
+    return LayerCompositeMode.AUTO
+
+  def get_composite_space(self):
+    return LayerColorSpace.AUTO
+
+  def get_edit_mask(self):
+    return False
+
+  def is_floating_sel(self):
+    return False
+
+  def get_lock_alpha(self):
+    return False
+
+  def get_mode(self):
+    return self._mode
+
+  def get_opacity(self):
+    return self._opacity
+
+  def get_show_mask(self):
+    return False
+
+  def get_mask(self):
+    return self._mask
+
+
+class GroupLayer(Layer):
+
+  def __init__(self, name, children=(), **kwargs):
+    super().__init__(name, **kwargs)
+
+    self._children = list(children)
+
+  def is_group(self):
+    return True
+
+  def get_expanded(self):
+    return True
+
+  def get_children(self):
+    return list(self._children)
+
+
+class Channel(Drawable):
+
+  def __init__(self, name, color=(0.0, 0.0, 0.0, 1.0), opacity=50.0, **kwargs):
+    super().__init__(name, **kwargs)
+
+    self._color = Color(color)
+    self._opacity = opacity
+
+  def get_color(self):
+    return self._color
+
+  def get_opacity(self):
+    return self._opacity
+
+  def get_show_masked(self):
+    return False
+
+
+class LayerMask(Channel):
+  pass
+
+
+class Path(Item):
+
+  def __init__(self, name, strokes=(), **kwargs):
+    super().__init__(name, **kwargs)
+
+    self._strokes = {stroke_id: points for stroke_id, points in enumerate(strokes, start=1)}
+
+  def get_strokes(self):
+    return list(self._strokes)
+
+  def stroke_get_points(self, stroke_id):
+    return PathStrokeType.BEZIER, self._strokes[stroke_id], False
+
+  def stroke_get_length(self, stroke_id, _precision):
+    points = self._get_stroke_points(stroke_id)
+    return sum(math.dist(point, next_point) for point, next_point in zip(points, points[1:]))
+
+  def stroke_get_point_at_dist(self, stroke_id, dist, _precision):
+    points = self._get_stroke_points(stroke_id)
+
+    for point, next_point in zip(points, points[1:]):
+      segment_length = math.dist(point, next_point)
+      if dist <= segment_length:
+        ratio = dist / segment_length if segment_length else 0.0
+        x = point[0] + (next_point[0] - point[0]) * ratio
+        y = point[1] + (next_point[1] - point[1]) * ratio
+        dx, dy = next_point[0] - point[0], next_point[1] - point[1]
+        return x, y, dy / dx if dx else 0.0, True
+      dist -= segment_length
+
+    return 0.0, 0.0, 0.0, False
+
+  def _get_stroke_points(self, stroke_id):
+    # Control points are approximated with a polyline through all points.
+    coordinates = self._strokes[stroke_id]
+    return list(zip(coordinates[::2], coordinates[1::2]))
+
+
+class _ParamSpec:
+
+  def __init__(self, name):
+    self.name = name
+
+
+class _FilterConfig:
+
+  def __init__(self, properties):
+    self._properties = properties
+
+  def list_properties(self):
+    return [_ParamSpec(name) for name in self._properties]
+
+  def get_property(self, name):
+    return self._properties[name]
+
+
+class DrawableFilter:
+
+  def __init__(self, name, operation_name, properties, opacity=1.0, visible=True):
+    self._name = name
+    self._operation_name = operation_name
+    self._config = _FilterConfig(properties)
+    self._opacity = opacity
+    self._visible = visible
+
+  def get_name(self):
+    return self._name
+
+  def get_operation_name(self):
+    return self._operation_name
+
+  def get_blend_mode(self):
+    return LayerMode.NORMAL
+
+  def get_opacity(self):
+    return self._opacity
+
+  def get_visible(self):
+    return self._visible
+
+  def get_config(self):
+    return self._config
+
+
+class Image:
+
+  _next_id = 1
+
+  def __init__(self, name, width=1920, height=1080, layers=(), channels=(), paths=()):
+    self._id = Image._next_id
+    Image._next_id += 1
+
+    self._name = name
+    self._width = width
+    self._height = height
+    self._layers = list(layers)
+    self._channels = list(channels)
+    self._paths = list(paths)
+
+  def get_id(self):
+    return self._id
+
+  def get_name(self):
+    return self._name
+
+  def get_width(self):
+    return self._width
+
+  def get_height(self):
+    return self._height
+
+  def get_base_type(self):
+    return ImageBaseType.RGB
+
+  def get_precision(self):
+    return Precision.U8_NON_LINEAR
+
+  def get_resolution(self):
+    return True, 72.0, 72.0
+
+  def get_unit(self):
+    return _Unit('pixels')
+
+  def get_palette(self):
+    return None
+
+  def get_selected_channels(self):
+    return []
+
+  def get_selected_drawables(self):
+    return self._layers[:1]
+
+  def get_selected_layers(self):
+    return self._layers[:1]
+
+  def get_selected_paths(self):
+    return []
+
+  def get_layers(self):
+    return list(self._layers)
+
+  def get_channels(self):
+    return list(self._channels)
+
+  def get_paths(self):
+    return list(self._paths)
+
+  def is_dirty(self):
+    return True
+
+  def get_file(self):
+    return None
+
+
+class Config:
+  """Stand-in for the procedure config holding argument values."""
+
+  def __init__(self, values):
+    self._values = values
+
+  def get_property(self, name):
+    return self._values[name]
+
+
+def install_modules():
+  gi = types.ModuleType('gi')
+  gi.require_version = lambda _namespace, _version: None
+
+  repository = types.ModuleType('gi.repository')
+  gi.repository = repository
+
+  babl = types.ModuleType('gi.repository.Babl')
+  babl.format = lambda format_name: format_name
+
+  gegl = types.ModuleType('gi.repository.Gegl')
+  gegl.Color = Color
+  gegl.init = lambda *_args: None
+
+  gimp = types.ModuleType('gi.repository.Gimp')
+  for obj in [
+        ColorTag, LayerMode, LayerColorSpace, LayerCompositeMode, ImageType, ImageBaseType,
+        Precision, PathStrokeType, PDBProcType, PDBStatusType, RunMode,
+        Item, Drawable, Layer, GroupLayer, Channel, LayerMask, Path, DrawableFilter, Image]:
+    setattr(gimp, obj.__name__, obj)
+  gimp.Procedure = type('Procedure', (), {})
+  gimp.ExportProcedure = type('ExportProcedure', (gimp.Procedure,), {})
+  gimp.get_images = lambda: []
+  gimp.message = lambda message: print(message, file=sys.stderr)
+
+  gio = types.ModuleType('gi.repository.Gio')
+  gio.File = File
+  gio.Cancellable = _Cancellable
+  gio.FileCreateFlags = types.SimpleNamespace(NONE=0, REPLACE_DESTINATION=2)
+
+  glib = types.ModuleType('gi.repository.GLib')
+  glib.Error = _GLibError
+  glib.MAXINT = 2 ** 31 - 1
+
+  gobject = types.ModuleType('gi.repository.GObject')
+  gobject.GEnum = _GEnum
+  gobject.ParamFlags = _ParamFlags
+
+  sys.modules['gi'] = gi
+  sys.modules['gi.repository'] = repository
+
+  for module in [babl, gegl, gimp, gio, glib, gobject]:
+    module_name = module.__name__.rsplit('.', 1)[-1]
+    setattr(repository, module_name, module)
+    sys.modules[module.__name__] = module
+
+  procedure = types.ModuleType('procedure')
+  for func_name in ['register_procedure', 'main', 'set_use_locale', 'set_init_procedures_func',
+                    'set_quit_func']:
+    setattr(procedure, func_name, lambda *_args, **_kwargs: None)
+  procedure.get_run_timings = lambda: {}
+  procedure.init_gegl = lambda: None
+
+  sys.modules['procedure'] = procedure
+
+
+def load_plug_in():
+  install_modules()
+
+  return import_plug_in()
+
+
+def import_plug_in():
+  sys.path.insert(0, _PLUG_IN_DIRPATH)
+
+  spec = importlib.util.spec_from_file_location(
+    'image_attribute_export', os.path.join(_PLUG_IN_DIRPATH, 'image-attribute-export.py'))
+  plug_in = importlib.util.module_from_spec(spec)
+  spec.loader.exec_module(plug_in)
+
+  return plug_in
+
+
+def get_default_arguments(plug_in):
+  """Returns default values of the export procedure arguments.
+
+  The default value is the second to last element of each argument
+  definition, preceding the parameter flags.
+  """
+  return {
+    argument[1]: argument[-2]
+    for argument in (
+      plug_in._EXPORT_ARGUMENTS
+      + plug_in._INCREMENTAL_EXPORT_ARGUMENTS
+      + plug_in._EXPORT_INDEX_ARGUMENTS
+      + plug_in._PIPELINE_ARGUMENTS
+      + plug_in._PROFILE_ARGUMENTS)
+  }